@@ -1,13 +1,10 @@
-from mace.calculators import mace_mp
-from ase import build
-from ase.units import GPa
-import matgl
-from matgl.ext.ase import M3GNetCalculator
-from chgnet.model.model import CHGNet
-from chgnet.model.dynamics import CHGNetCalculator
-from sevenn.calculator import SevenNetCalculator
-
-def sevenn():    
+# backends are imported inside each loader so that picking one
+# calculator does not pull in the others
+
+
+def sevenn():
+    from sevenn.calculator import SevenNetCalculator
+
     calc = SevenNetCalculator(
         model="/path/to/7net-omni",
         modal='mpa',
@@ -17,15 +14,24 @@ def sevenn():
     return calc
 
 def mace():
+    from mace.calculators import mace_mp
+
     calc = mace_mp(model="medium", dispersion=False, default_dtype="float32", device='cpu')
     return calc
 
 def m3gnet():
+    import matgl
+    from ase.units import GPa
+    from matgl.ext.ase import M3GNetCalculator
+
     matglpot = matgl.load_model("M3GNet-MP-2021.2.8-PES")
     calc = M3GNetCalculator(potential=matglpot, stress_weight=GPa)
     return calc
 
 def chgnet():
+    from chgnet.model.model import CHGNet
+    from chgnet.model.dynamics import CHGNetCalculator
+
     chgnet = CHGNet.load()
     calc = CHGNetCalculator(chgnet)
-    return calc
\ No newline at end of file
+    return calc
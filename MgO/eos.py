@@ -45,7 +45,8 @@ from scipy.interpolate import bisplev, InterpolatedUnivariateSpline, RectBivaria
 from scipy.optimize import minimize, minimize_scalar
 import math
 import matplotlib
-matplotlib.use('TkAgg')
+# Tk only where there is a display; compute nodes render headless
+matplotlib.use('TkAgg' if os.environ.get('DISPLAY') else 'Agg')
 import matplotlib.pyplot as plt
 from matplotlib import rc, rcParams
 import matplotlib.gridspec as gridspec
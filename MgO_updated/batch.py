@@ -0,0 +1,349 @@
+import numpy as np
+
+from profiling import stage
+
+
+# ===============================
+# Helpers
+# ===============================
+
+def _chunks(items, size):
+    """Yield consecutive slices of at most `size` items."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# ===============================
+# Backend batched forward passes
+# ===============================
+#
+# Each function takes the ASE calculator returned by get_calculator, a
+# list of Atoms and the properties wanted, and returns {property:
+# values} from one batched pass; energy alone skips the force and stress
+# work where the model allows it. They reuse the model already loaded
+# inside the calculator, so no second checkpoint load happens. Graph /
+# neighbour-list construction and the forward pass are timed as
+# separate profiling stages.
+
+def _mace_properties(calc, atoms_list, batch_size, properties):
+    """Energy, forces and stress from one MACE forward/backward pass."""
+    from ase.stress import full_3x3_to_voigt_6_stress
+    from mace import data
+    from mace.tools import torch_geometric
+
+    model = calc.models[0]
+    heads = getattr(calc, "available_heads", None) or ["default"]
+    with stage("graph", len(atoms_list)):
+        dataset = [
+            data.AtomicData.from_config(
+                data.config_from_atoms(atoms),
+                z_table=calc.z_table,
+                cutoff=calc.r_max,
+                heads=heads,
+            )
+            for atoms in atoms_list
+        ]
+    loader = torch_geometric.dataloader.DataLoader(
+        dataset, batch_size=batch_size, shuffle=False, drop_last=False
+    )
+
+    e_unit = calc.energy_units_to_eV
+    l_unit = calc.length_units_to_A
+    out = {p: [] for p in properties}
+    for batch in loader:
+        with stage("forward", batch.num_graphs):
+            batch = batch.to(calc.device)
+            res = model(batch.to_dict(), compute_stress="stress" in properties,
+                        training=False)
+        if "energy" in properties:
+            out["energy"].append(res["energy"].detach().cpu().numpy() * e_unit)
+        if "stress" in properties:
+            stress = res["stress"].detach().cpu().numpy() * e_unit / l_unit**3
+            out["stress"].append(full_3x3_to_voigt_6_stress(stress))
+        if "forces" in properties:
+            forces = res["forces"].detach().cpu().numpy() * e_unit / l_unit
+            ptr = batch.ptr.cpu().numpy()
+            out["forces"].extend(forces[a:b] for a, b in zip(ptr[:-1], ptr[1:]))
+
+    for p in ("energy", "stress"):
+        if p in out:
+            out[p] = np.concatenate(out[p])
+    return out
+
+
+def _voigt(stress):
+    """(n, 6) Voigt stresses from (n, 6) or (n, 3, 3)."""
+    from ase.stress import full_3x3_to_voigt_6_stress
+
+    stress = np.asarray(stress, dtype=float)
+    if stress.shape[-2:] == (3, 3):
+        return full_3x3_to_voigt_6_stress(stress)
+    return stress.reshape(-1, 6)
+
+
+def _split(forces, atoms_list):
+    """Per-structure (natoms, 3) blocks of forces stacked over a batch."""
+    ends = np.cumsum([len(atoms) for atoms in atoms_list])
+    return np.split(np.asarray(forces, dtype=float), ends[:-1])
+
+
+def _stress_weight(calc):
+    """
+    Factor the ASE wrapper applies to the model's stress (GPa -> eV/Å^3
+    for CHGNet, MatterSim and matgl), 1 GPa in eV/Å^3 if not stored.
+    """
+    from ase.units import GPa
+
+    return getattr(calc, "stress_weight", GPa)
+
+
+def _chgnet_properties(calc, atoms_list, batch_size, properties):
+    """Energy, forces and stress from CHGNet's batched task="efs"."""
+    from pymatgen.io.ase import AseAtomsAdaptor
+
+    with stage("convert", len(atoms_list)):
+        structures = [AseAtomsAdaptor.get_structure(atoms) for atoms in atoms_list]
+    # CHGNet has no "es" task: stress comes with forces
+    task = "e" if set(properties) == {"energy"} else "ef" + "s" * ("stress" in properties)
+    with stage("forward", len(atoms_list)):
+        preds = calc.model.predict_structure(structures, task=task, batch_size=batch_size)
+    if isinstance(preds, dict):
+        preds = [preds]
+
+    out = {}
+    if "energy" in properties:
+        out["energy"] = np.array([float(p["e"]) * len(a) for p, a in zip(preds, atoms_list)])
+    if "forces" in properties:
+        out["forces"] = [np.asarray(p["f"], dtype=float) for p in preds]
+    if "stress" in properties:
+        out["stress"] = _voigt([p["s"] for p in preds]) * _stress_weight(calc)
+    return out
+
+
+def _mattersim_properties(calc, atoms_list, batch_size, properties):
+    """Energy, forces and stress from MatterSim's batched predict_properties."""
+    from mattersim.datasets.utils.build import build_dataloader
+
+    with stage("graph", len(atoms_list)):
+        loader = build_dataloader(
+            atoms_list,
+            only_inference=True,
+            batch_size=batch_size,
+            model_type=calc.potential.model_name,
+        )
+    with stage("forward", len(atoms_list)):
+        energies, forces, stresses = calc.potential.predict_properties(
+            loader,
+            include_forces="forces" in properties,
+            include_stresses="stress" in properties,
+        )
+
+    out = {}
+    if "energy" in properties:
+        out["energy"] = np.asarray(energies, dtype=float)
+    if "forces" in properties:
+        out["forces"] = [np.asarray(f, dtype=float) for f in forces]
+    if "stress" in properties:
+        out["stress"] = _voigt(stresses) * _stress_weight(calc)
+    return out
+
+
+def _orb_properties(calc, atoms_list, batch_size, properties):
+    """Energy, forces and stress (eV/Å^3, Voigt) from ORB's batched predict."""
+    from orb_models.forcefield.atomic_system import ase_atoms_to_atom_graphs
+    from orb_models.forcefield.base import batch_graphs
+
+    model = calc.model
+    out = {p: [] for p in properties}
+    for chunk in _chunks(atoms_list, batch_size):
+        with stage("graph", len(chunk)):
+            graphs = [
+                ase_atoms_to_atom_graphs(atoms, model.system_config, device=calc.device)
+                for atoms in chunk
+            ]
+        # conservative models take forces and stress as gradients,
+        # so no torch.no_grad() here
+        with stage("forward", len(chunk)):
+            res = model.predict(batch_graphs(graphs), split=False)
+        if "energy" in properties:
+            out["energy"].append(res["energy"].detach().cpu().numpy().reshape(-1))
+        if "forces" in properties:
+            key = "forces" if "forces" in res else "grad_forces"
+            out["forces"].extend(_split(res[key].detach().cpu().numpy(), chunk))
+        if "stress" in properties:
+            key = "stress" if "stress" in res else "grad_stress"
+            out["stress"].append(_voigt(res[key].detach().cpu().numpy()))
+
+    for p in ("energy", "stress"):
+        if p in out:
+            out[p] = np.concatenate(out[p])
+    return out
+
+
+def _sevenn_properties(calc, atoms_list, batch_size, properties):
+    """Energy, forces and stress from one batched SevenNet pass."""
+    import torch
+
+    if isinstance(calc.model, torch.jit.ScriptModule):
+        return serial_properties(calc, atoms_list, properties)
+
+    import sevenn._keys as KEY
+    from sevenn.atom_graph_data import AtomGraphData
+    from sevenn.train.dataload import unlabeled_atoms_to_graph
+    from torch_geometric.data import Batch
+
+    out = {p: [] for p in properties}
+    for chunk in _chunks(atoms_list, batch_size):
+        graphs = []
+        with stage("graph", len(chunk)):
+            for atoms in chunk:
+                graph = AtomGraphData.from_numpy_dict(
+                    unlabeled_atoms_to_graph(atoms, calc.cutoff)
+                )
+                if calc.modal:
+                    graph[KEY.DATA_MODALITY] = calc.modal
+                graphs.append(graph)
+
+        with stage("forward", len(chunk)):
+            batch = Batch.from_data_list(graphs).to(calc.device)
+            res = calc.model(batch)
+        if "energy" in properties:
+            out["energy"].append(res[KEY.PRED_TOTAL_ENERGY].detach().cpu().numpy().reshape(-1))
+        if "forces" in properties:
+            out["forces"].extend(_split(res[KEY.PRED_FORCE].detach().cpu().numpy(), chunk))
+        if "stress" in properties:
+            # same sign and xx yy zz xy yz zx -> Voigt reordering as SevenNetCalculator
+            stress = -res[KEY.PRED_STRESS].detach().cpu().numpy().reshape(-1, 6)
+            out["stress"].append(stress[:, [0, 1, 2, 4, 5, 3]])
+
+    for p in ("energy", "stress"):
+        if p in out:
+            out[p] = np.concatenate(out[p])
+    return out
+
+
+def _m3gnet_properties(calc, atoms_list, batch_size, properties):
+    """Energy, forces and stress from one batched matgl Potential call."""
+    import dgl
+    import torch
+    from matgl.ext.ase import Atoms2Graph
+
+    potential = calc.potential
+    model = potential.model
+    converter = Atoms2Graph(model.element_types, model.cutoff)
+
+    out = {p: [] for p in properties}
+    for chunk in _chunks(atoms_list, batch_size):
+        graphs, lattices, states = [], [], []
+        with stage("graph", len(chunk)):
+            for atoms in chunk:
+                g, lat, state = converter.get_graph(atoms)
+                graphs.append(g)
+                lattices.append(lat)
+                states.append(torch.tensor(state, dtype=lat.dtype))
+
+        with stage("forward", len(chunk)):
+            g = dgl.batch(graphs)
+            lat = torch.cat(lattices, dim=0)
+            state = torch.stack(states).reshape(len(chunk), -1)
+            energies, forces, stresses = potential(g, lat, state)[:3]
+        if "energy" in properties:
+            out["energy"].append(energies.detach().cpu().numpy().reshape(-1))
+        if "forces" in properties:
+            out["forces"].extend(_split(forces.detach().cpu().numpy(), chunk))
+        if "stress" in properties:
+            # GPa, (n, 3, 3) -> eV/Å^3 Voigt as in PESCalculator
+            stress = stresses.detach().cpu().numpy().reshape(-1, 3, 3)
+            out["stress"].append(_voigt(stress) * _stress_weight(calc))
+
+    for p in ("energy", "stress"):
+        if p in out:
+            out[p] = np.concatenate(out[p])
+    return out
+
+
+BATCHED_PROPERTIES = {
+    "mace": _mace_properties,
+    "chgnet": _chgnet_properties,
+    "mattersim": _mattersim_properties,
+    "orb": _orb_properties,
+    "sevenn": _sevenn_properties,
+    "m3gnet": _m3gnet_properties,
+}
+
+
+# ===============================
+# Public API
+# ===============================
+
+def atom_budget_chunks(atoms_list, batch_size, max_atoms):
+    """
+    Consecutive runs of at most `batch_size` structures and at most
+    `max_atoms` atoms in total. A structure larger than the budget goes
+    alone.
+    """
+    chunk, natoms = [], 0
+    for atoms in atoms_list:
+        if chunk and (len(chunk) >= batch_size or natoms + len(atoms) > max_atoms):
+            yield chunk
+            chunk, natoms = [], 0
+        chunk.append(atoms)
+        natoms += len(atoms)
+    if chunk:
+        yield chunk
+
+
+def serial_properties(calc, atoms_list, properties):
+    """
+    One calculator call per structure for all of `properties` together,
+    so energy, forces and stress come from the same forward pass.
+    """
+    out = {p: [] for p in properties}
+    for atoms in atoms_list:
+        atoms.calc = calc
+        with stage("forward", 1):
+            # the first property computes the rest along with it for
+            # calculators that fill all results in one calculate() call
+            for p in properties:
+                out[p].append(np.array(calc.get_property(p, atoms), dtype=float))
+    for p in ("energy", "stress"):
+        if p in out:
+            out[p] = np.array(out[p])
+    return out
+
+
+def batched_properties(calc, atoms_list, conda=None, batch_size=16,
+                       properties=("energy", "stress"), max_atoms=None):
+    """
+    {property: values} for a list of Atoms: "energy" (n,) in eV,
+    "stress" (n, 6) Voigt in eV/Å^3, "forces" a list of (natoms, 3).
+
+    The backends in BATCHED_PROPERTIES (all built-in ones) return every
+    property from one batched pass, `batch_size` structures at a time;
+    other calculators, and batch_size <= 1, loop serially with one
+    calculator call per structure for all properties. With `max_atoms`,
+    a batch also never holds more atoms than that, which bounds the
+    graph and activation memory for large supercells.
+    """
+    properties = tuple(properties)
+    atoms_list = list(atoms_list)
+    func = BATCHED_PROPERTIES.get(conda)
+    if func is None or batch_size is None or batch_size <= 1 or not atoms_list:
+        return serial_properties(calc, atoms_list, properties)
+
+    chunks = [atoms_list] if max_atoms is None else \
+        atom_budget_chunks(atoms_list, batch_size, max_atoms)
+    parts = [func(calc, chunk, batch_size, properties) for chunk in chunks]
+    out = {}
+    for p in properties:
+        if p == "forces":
+            out[p] = [f for part in parts for f in part[p]]
+        else:
+            out[p] = np.concatenate([part[p] for part in parts])
+    return out
+
+
+def batched_energies(calc, atoms_list, conda=None, batch_size=16, max_atoms=None):
+    """Total energies (eV) of a list of Atoms, see batched_properties."""
+    return batched_properties(calc, atoms_list, conda, batch_size,
+                              properties=("energy",), max_atoms=max_atoms)["energy"]
@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import subprocess
+from importlib.metadata import version, PackageNotFoundError
+
+import numpy as np
+from ase.build import bulk
+
+from run_all import CALCULATORS, HERE, worker_env
+from profiling import peak_rss_mb
+
+
+# supercell repeats of the 8-atom conventional MgO cell: 8 ... 4096 atoms
+SIZES = [1, 2, 3, 4, 6, 8]
+THREADS = [1, 4]
+A_MGO = 4.21
+
+
+# ===============================
+# Structures and measurements
+# ===============================
+
+def mgo(repeat=None):
+    """Primitive MgO (2 atoms) or the conventional cell repeated n x n x n."""
+    if repeat is None:
+        return bulk("MgO", "rocksalt", a=A_MGO)
+    return bulk("MgO", "rocksalt", a=A_MGO, cubic=True).repeat(repeat)
+
+
+def _timed_energy(atoms, calc):
+    atoms.calc = calc
+    t0 = time.perf_counter()
+    atoms.get_potential_energy()
+    return time.perf_counter() - t0
+
+
+def time_serial(calc, atoms, repeats):
+    """
+    Wall times of `repeats` single-point energies on `atoms`. Positions
+    are rattled between calls so the calculator cannot return a cached
+    result.
+    """
+    times = []
+    for r in range(repeats):
+        stru = atoms.copy()
+        stru.rattle(1e-4, seed=r)
+        times.append(_timed_energy(stru, calc))
+    return np.array(times)
+
+
+def bench_calculator(conda, dtype=None, sizes=SIZES, repeats=5, n_batch=32,
+                     batch_size=16, compiled=False):
+    """
+    Benchmark one calculator in this process. Returns one record with
+    load times, first-call latency, steady-state serial and batched
+    throughput on primitive MgO, supercell scaling and peak RSS.
+    """
+    from batch import batched_energies
+    from calculators import load_calculator, model_info, TIMINGS
+
+    model, default_dtype = model_info(conda)
+    rec = {
+        "calculator": conda,
+        "model": model,
+        "dtype": dtype or default_dtype,
+        "compiled": compiled,
+        "threads": _threads(),
+        "rss_start_mb": peak_rss_mb(),
+    }
+
+    calc = load_calculator(conda, dtype, compiled)
+    rec.update(TIMINGS[conda])
+    rec["rss_loaded_mb"] = peak_rss_mb()
+
+    # first call pays for lazy init / JIT / graph building
+    rec["first_call_s"] = _timed_energy(mgo(), calc)
+
+    t = time_serial(calc, mgo(), repeats)
+    rec["serial_s"] = float(np.median(t))
+    rec["serial_per_s"] = 1.0 / rec["serial_s"]
+
+    grid = [mgo() for _ in range(n_batch)]
+    for i, stru in enumerate(grid):
+        stru.set_cell(stru.cell * (0.95 + 0.1 * i / n_batch), scale_atoms=True)
+    batched_energies(calc, grid[:batch_size], conda, batch_size)   # warm-up
+    t0 = time.perf_counter()
+    batched_energies(calc, grid, conda, batch_size)
+    dt = time.perf_counter() - t0
+    rec["batch_size"] = batch_size
+    rec["batched_per_s"] = n_batch / dt
+
+    scaling = []
+    for n in sizes:
+        atoms = mgo(n)
+        _timed_energy(atoms, calc)                                  # warm-up
+        t = float(np.median(time_serial(calc, atoms, max(1, repeats // 2))))
+        scaling.append({
+            "repeat": n,
+            "natoms": len(atoms),
+            "seconds": t,
+            "us_per_atom": 1e6 * t / len(atoms),
+            "rss_mb": peak_rss_mb(),
+        })
+        print(f"  {conda} {len(atoms):6d} atoms {t:9.4f} s", file=sys.stderr)
+    rec["scaling"] = scaling
+    rec["rss_peak_mb"] = peak_rss_mb()
+    return rec
+
+
+def _threads():
+    try:
+        import torch
+        return torch.get_num_threads()
+    except ImportError:
+        return int(os.environ.get("OMP_NUM_THREADS", os.cpu_count() or 1))
+
+
+# ===============================
+# Environment
+# ===============================
+
+def versions(conda=None):
+    """Versions of the packages that set the speed of a run."""
+    from calculators import REGISTRY
+
+    packages = ["numpy", "ase", "torch"]
+    if conda in REGISTRY and REGISTRY[conda].get("package"):
+        packages.append(REGISTRY[conda]["package"])
+    out = {"python": platform.python_version()}
+    for pkg in packages:
+        try:
+            out[pkg] = version(pkg)
+        except PackageNotFoundError:
+            out[pkg] = None
+    return out
+
+
+def host_info():
+    return {
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+# ===============================
+# Driver
+# ===============================
+
+def parse_variant(spec):
+    """
+    'mace' -> ('mace', None, False), 'mace:float64' -> ('mace', 'float64', False),
+    'mace+compiled' -> ('mace', None, True).
+    """
+    spec, _, flag = spec.partition("+")
+    conda, _, dtype = spec.partition(":")
+    return conda, dtype or None, flag == "compiled"
+
+
+def run_worker(spec, threads, sizes, repeats, timeout=None):
+    """bench_calculator() in a fresh interpreter with pinned threads."""
+    conda, dtype, compiled = parse_variant(spec)
+    cmd = [sys.executable, os.path.join(HERE, "benchmark.py"), "--worker",
+           "--threads", str(threads), "--repeats", str(repeats),
+           "--sizes", *map(str, sizes), "--calculators", spec]
+    try:
+        proc = subprocess.run(cmd, cwd=HERE, env=worker_env(threads),
+                              stdout=subprocess.PIPE, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"calculator": conda, "dtype": dtype, "compiled": compiled,
+                "threads": threads, "error": f"timed out after {timeout} s"}
+    if proc.returncode != 0:
+        return {"calculator": conda, "dtype": dtype, "compiled": compiled,
+                "threads": threads, "error": f"worker exited with {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def benchmark(variants, threads=THREADS, sizes=SIZES, repeats=5, out=None,
+              timeout=None):
+    """
+    Benchmark every calculator variant at every thread count, each in
+    its own process so load time and peak RSS are not shared. Records
+    are appended to `out` as JSON lines.
+    """
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    host = host_info()
+    records = []
+    for spec in variants:
+        conda = parse_variant(spec)[0]
+        for n in threads:
+            rec = run_worker(spec, n, sizes, repeats, timeout)
+            rec.update({"timestamp": stamp, "threads_requested": n,
+                        "versions": versions(conda), **host})
+            records.append(rec)
+            print(format_record(rec))
+            if out:
+                with open(out, "a") as fh:
+                    fh.write(json.dumps(rec) + "\n")
+    return records
+
+
+def format_record(rec):
+    name = f"{rec['calculator']}[{rec.get('dtype')}]"
+    if rec.get("compiled"):
+        name += "+compiled"
+    name += f" x{rec.get('threads_requested')}"
+    if "error" in rec:
+        return f"{name:<28s} {rec['error']}"
+    big = rec["scaling"][-1] if rec["scaling"] else None
+    line = (f"{name:<28s} load {rec['load_s']:6.2f} s  first {rec['first_call_s']:7.3f} s"
+            f"  serial {rec['serial_per_s']:8.1f}/s  batched {rec['batched_per_s']:8.1f}/s"
+            f"  peak {rec['rss_peak_mb']:7.0f} MB")
+    if big:
+        line += f"  {big['natoms']} atoms {big['seconds']:.3f} s"
+    return line
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Throughput, latency and memory of each MLIP calculator."
+    )
+    parser.add_argument("--calculators", nargs="+", default=CALCULATORS,
+                        help="names, optionally with a dtype and/or compiled: "
+                             "mace:float64 orb:float32-high mace+compiled")
+    parser.add_argument("--threads", nargs="+", type=int, default=THREADS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES,
+                        help="n for n x n x n repeats of the 8-atom MgO cell")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="seconds before a worker is abandoned")
+    parser.add_argument("--out", default="benchmark.jsonl",
+                        help="JSON lines file, appended to")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        conda, dtype, compiled = parse_variant(args.calculators[0])
+        try:
+            import torch
+            torch.set_num_threads(args.threads[0])
+        except ImportError:
+            pass
+        rec = bench_calculator(conda, dtype, args.sizes, args.repeats,
+                               compiled=compiled)
+        print(json.dumps(rec))
+    else:
+        benchmark(args.calculators, args.threads, args.sizes, args.repeats,
+                  args.out, args.timeout)
@@ -0,0 +1,171 @@
+import json
+import time
+import sqlite3
+import hashlib
+import numpy as np
+
+
+# ===============================
+# Keys
+# ===============================
+
+def structure_hash(atoms, decimals=8):
+    """
+    Canonical hash of cell + positions + atomic numbers + pbc.
+
+    Coordinates are rounded to `decimals` Å so that float noise from
+    rebuilding the same structure does not produce a new key.
+    """
+    h = hashlib.sha256()
+    cell = np.round(np.asarray(atoms.cell, dtype=float), decimals) + 0.0
+    pos = np.round(atoms.get_positions(), decimals) + 0.0
+    h.update(cell.tobytes())
+    h.update(pos.tobytes())
+    h.update(np.asarray(atoms.numbers, dtype=np.int64).tobytes())
+    h.update(np.asarray(atoms.pbc, dtype=bool).tobytes())
+    return h.hexdigest()
+
+
+def cache_key(calculator, model, dtype, atoms):
+    return "|".join([calculator, model, dtype, structure_hash(atoms)])
+
+
+# ===============================
+# SQLite store
+# ===============================
+
+class ResultCache:
+    """
+    Persistent calculator results keyed by
+    (calculator, model version, dtype, structure hash).
+
+    Entries are evicted least-recently-used first once more than
+    `max_entries` rows are stored.
+    """
+
+    def __init__(self, path, max_entries=100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " results TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS results_lru ON results (last_used)"
+        )
+        self.db.commit()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+    def get(self, key):
+        res = self.get_many([key])[0]
+        self.db.commit()
+        return res
+
+    def get_many(self, keys, chunk=500):
+        """
+        Cached results for each of `keys`, None where missing: one SELECT
+        per `chunk` keys (SQLite caps the number of bound parameters) and
+        one executemany for the hits' LRU timestamps. Does not commit;
+        the caller commits once for the whole batch.
+        """
+        unique = list(dict.fromkeys(keys))
+        rows = {}
+        for i in range(0, len(unique), chunk):
+            part = unique[i:i + chunk]
+            rows.update(self.db.execute(
+                "SELECT key, results FROM results WHERE key IN "
+                f"({','.join('?' * len(part))})", part
+            ).fetchall())
+
+        if rows:
+            now = time.time()
+            self.db.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                [(now, key) for key in rows],
+            )
+        out = [json.loads(rows[key]) if key in rows else None for key in keys]
+        n_hits = sum(res is not None for res in out)
+        self.hits += n_hits
+        self.misses += len(keys) - n_hits
+        return out
+
+    def put_many(self, items):
+        """Store an iterable of (key, results dict) pairs."""
+        now = time.time()
+        self.db.executemany(
+            "INSERT OR REPLACE INTO results (key, results, last_used) "
+            "VALUES (?, ?, ?)",
+            [(key, json.dumps(res), now) for key, res in items],
+        )
+        self.evict()
+        self.db.commit()
+
+    def evict(self):
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self.db.execute(
+                "DELETE FROM results WHERE key IN ("
+                " SELECT key FROM results ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def properties(self, structures, evaluate, calculator, model, dtype,
+                   properties=("energy",)):
+        """
+        {property: values} for `structures`, calling
+        `evaluate(missing_structures)` (which returns such a dict) only
+        for the ones not already cached with every requested property.
+        """
+        keys = [cache_key(calculator, model, dtype, s) for s in structures]
+        found = {}
+        missing = []
+        for i, res in enumerate(self.get_many(keys)):
+            if res is not None and any(p not in res for p in properties):
+                # cached by a run that did not ask for all of them
+                self.hits -= 1
+                self.misses += 1
+                res = None
+            if res is None:
+                missing.append(i)
+            else:
+                found[i] = res
+
+        if missing:
+            new = evaluate([structures[i] for i in missing])
+            for j, i in enumerate(missing):
+                found[i] = {p: new[p][j] for p in properties}
+            self.put_many(
+                (keys[i], {p: np.asarray(found[i][p]).tolist() for p in properties})
+                for i in missing
+            )
+        else:
+            # put_many commits the timestamp updates otherwise
+            self.db.commit()
+
+        out = {p: [np.asarray(found[i][p], dtype=float) for i in range(len(keys))]
+               for p in properties}
+        for p in ("energy", "stress"):
+            if p in out:
+                out[p] = np.array(out[p])
+        return out
+
+    def energies(self, structures, evaluate, calculator, model, dtype):
+        """
+        Energies for `structures`, calling `evaluate(missing_structures)`
+        only for the ones not already in the cache.
+        """
+        return self.properties(
+            structures, lambda strus: {"energy": evaluate(strus)},
+            calculator, model, dtype,
+        )["energy"]
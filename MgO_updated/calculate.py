@@ -1,190 +1,815 @@
 import os
-import sys
+import time
+import argparse
+from functools import partial
+from itertools import islice
 import numpy as np
 import pandas as pd
 from ase.build import bulk
-from ase.eos import EquationOfState
-from ase.units import kJ
 from volumes import volumes_m3gnet
 from scipy.interpolate import InterpolatedUnivariateSpline
+from batch import batched_energies, batched_properties
+from cache import ResultCache, structure_hash
+from server import remote_evaluate, DEFAULT_URL
+from calculators import load_calculator, model_info, TIMINGS
+from results import (write_csv, write_columnar, read_table, find_results, mode_name,
+                     RecordLog, COLUMNAR_SUFFIX)
+from sampling import adaptive_volumes
+from relax import relaxed_energies
+from structures import iter_structures, volume_grid, DEFAULT_FRACTIONS
+from fit import fit_models, summarize, GPA_PER_EV_A3
+from symmetry import dedup_properties
+from phonons import phonon_scan, quasi_harmonic, stable, DEFAULT_TEMPERATURES
+from elastic import strained_cells, fit_stiffness, cubic_constants, born_stable, DEFAULT_STRAINS
+from profiling import TIMERS, stage, write_timings, profiled, rss_mb, peak_rss_mb
+
+EOS_MODELS = ["bm2", "bm3", "bm4", "bm5", "murnaghan", "sjeos"]
+SWEEP_MODELS = ["bm3", "murnaghan", "bm2"]
+# n for n x n x n repeats of the 8-atom cubic cell: 8 ... 32768 atoms
+SUPERCELL_REPEATS = [1, 2, 4, 8, 16, 32]
+
+def get_calculator(conda, compiled=False):
+    if compiled:
+        # checked against eager once, then warmed up every run
+        from compiled import compiled_calculator
+        calc, record = compiled_calculator(conda)
+        print(f"{conda}: compiled, parity {record['max_dE_eV_per_atom']:.1e} eV/atom, "
+              f"{record['speedup']:.2f}x eager")
+    else:
+        calc = load_calculator(conda)
+    t = TIMINGS[conda]
+    print(f"{conda}: import {t['import_s']:.2f} s, load {t['load_s']:.2f} s")
+    return calc
+
+
+def rocksalt(vol):
+    """MgO rocksalt primitive cell with volume `vol` (Å^3 per formula unit)."""
+    return bulk('MgO', crystalstructure='rocksalt', a=(4*vol)**(1/3))
+
+
+def rocksalt_supercell(vol, n):
+    """Cubic 8-atom MgO cell at `vol` Å^3 per formula unit, repeated n x n x n."""
+    return bulk('MgO', crystalstructure='rocksalt', a=(4*vol)**(1/3),
+                cubic=True).repeat(n)
+
+
+def make_evaluator(conda, log, batch_size=16, cache=None, server=None,
+                   resume=False, relax="none", relax_workers=1, fmax=0.01,
+                   dedup=False, symprec=1e-5, properties=("energy", "stress"),
+                   compiled=False):
+    """
+    Returns evaluate_structures(structures, volumes) -> {property: values},
+    which skips structures already in `log`, runs the rest in batch_size
+    chunks through the calculator (locally, via server.py, or relaxed)
+    and the cache, and appends every finished chunk to `log`.
+
+    All `properties` ("energy", "stress", "forces") come from the same
+    calculator call. With `dedup`, structures that are symmetry-equivalent
+    to one seen earlier in this run (or in the same chunk) reuse its
+    result instead of going through the model again.
+    """
+    if relax != "none" and server is not None:
+        raise ValueError("relaxed EOS needs forces, it cannot run through --server")
+    properties = tuple(properties)
+
+    calculator = None
+
+    def evaluate(strus):
+        nonlocal calculator
+        if server is not None:
+            # model stays loaded in server.py
+            return remote_evaluate(server, conda, strus, properties)
+        if relax != "none":
+            # with several workers each loads its own model
+            if calculator is None and relax_workers <= 1:
+                calculator = get_calculator(conda, compiled)
+            E, relaxed, steps = relaxed_energies(
+                strus, calc=calculator,
+                calc_factory=partial(load_calculator, conda, compiled=compiled),
+                workers=relax_workers, cell=(relax == "cell"), fmax=fmax,
+                properties=properties,
+            )
+            print(f"relaxed {len(strus)} volumes, {steps.sum()} optimizer steps")
+            out = {"energy": E}
+            for p in properties:
+                if p == "energy":
+                    continue
+                out[p] = [atoms.info[p] for atoms in relaxed]
+            return out
+        if calculator is None:
+            calculator = get_calculator(conda, compiled)
+        # backends without batching loop serially
+        return batched_properties(calculator, strus, conda, batch_size, properties)
+
+    if dedup:
+        # canonical key -> energy per atom (and stress), and exact hash ->
+        # canonical key, for the lifetime of the run
+        memo, keys = {}, {}
+        evaluate = partial(dedup_properties, evaluate=evaluate, memo=memo,
+                           symprec=symprec, properties=properties, keys=keys)
+
+    model, dtype = model_info(conda)
+    chunk_size = max(batch_size, 1)
+
+    # relaxed and single-point energies of the same start structure differ
+    mode = "" if relax == "none" else f":relax-{relax}"
+
+    def finished(key):
+        return key in log and all(p in log[key] for p in properties)
+
+    def evaluate_structures(structures, vols):
+        with stage("hash", len(structures)):
+            keys = [structure_hash(s) + mode for s in structures]
+        done = sum(finished(key) for key in keys)
+        if resume and done:
+            print(f"resume: {done} of {len(keys)} structures already done")
+        # identical structures (e.g. a repeated volume) are evaluated once
+        todo, queued = [], set()
+        for i, key in enumerate(keys):
+            if not finished(key) and key not in queued:
+                queued.add(key)
+                todo.append(i)
+
+        # relaxations go in one call so the warm-start chains and the
+        # worker pool span the whole grid
+        step = chunk_size if relax == "none" else max(len(todo), 1)
+        for start in range(0, len(todo), step):
+            chunk = todo[start:start + step]
+            strus = [structures[i] for i in chunk]
+            with stage("evaluate", len(strus)):
+                if cache is None:
+                    res = evaluate(strus)
+                else:
+                    res = cache.properties(strus, evaluate, conda + mode, model,
+                                           dtype, properties)
+            with stage("log", len(strus)):
+                log.append(
+                    {"key": keys[i], "volume": vols[i],
+                     **{p: np.asarray(res[p][j]).tolist() for p in properties}}
+                    for j, i in enumerate(chunk)
+                )
+
+        out = {p: [log[key][p] for key in keys] for p in properties}
+        for p in ("energy", "stress"):
+            if p in out:
+                out[p] = np.array(out[p], dtype=float)
+        return out
+
+    return evaluate_structures
+
+
+def pressures(stress):
+    """P = -trace(sigma)/3 in GPa from (n, 6) Voigt stresses in eV/Å^3."""
+    return -np.asarray(stress)[:, :3].mean(axis=1) * GPA_PER_EV_A3
+
+
+def max_forces(forces):
+    """Largest atomic force norm per structure, eV/Å."""
+    return np.array([np.linalg.norm(f, axis=1).max() for f in forces])
+
+
+def run_eos(fout, conda, batch_size=16, cache=None, server=None, fmt="both",
+            resume=False, adaptive=False, adaptive_tol=(1e-3, 1e-2), relax="none",
+            relax_workers=1, fmax=0.01, grid=None, dedup=False, symprec=1e-5,
+            properties=("energy", "stress"), compiled=False):
+
+    # per-stage wall times of this run go to <conda>.timing.json
+    TIMERS.reset()
+    t_run = time.perf_counter()
+
+    # every finished chunk is appended to <conda>.jsonl, so a killed run
+    # can pick up where it stopped with --resume
+    log = RecordLog(os.path.join(fout, f"{conda}.jsonl"), resume=resume)
+    evaluate_structures = make_evaluator(
+        conda, log, batch_size=batch_size, cache=cache, server=server,
+        resume=resume, relax=relax, relax_workers=relax_workers, fmax=fmax,
+        dedup=dedup, symprec=symprec, properties=properties, compiled=compiled,
+    )
 
-from eos import (
-    murnaghan_pressure,
-    birch_murnaghan_pressure_2nd,
-    birch_murnaghan_pressure_3rd,
-    birch_murnaghan_pressure_4th,
-    birch_murnaghan_pressure_5th,
-    sjeos_pressure,
-)
-
-def get_calculator(conda):
-    if conda == "m3gnet":
-        from calculators.m3gnetcalc import m3gnet
-        return m3gnet()
-
-    if conda == "mace":
-        from calculators.macecalc import mace
-        return mace()
-
-    if conda == "sevenn":
-        from calculators.sevenncalc import sevenn
-        return sevenn()
-
-    if conda == "mattersim":
-        from calculators.mattercalc import mattersim
-        return mattersim()
-
-    if conda == "orb":
-        from calculators.orbcalc import orb
-        return orb()
-
-    if conda == "chgnet":
-        from calculators.chgnetcalc import chgnet
-        return chgnet()
-
+    def evaluate_volumes(vols):
+        with stage("structures", len(vols)):
+            strus = [rocksalt(vol) for vol in vols]
+        return evaluate_structures(strus, vols)
 
-def run_eos(fout, conda):
+    def volume_energies(vols):
+        return evaluate_volumes(vols)["energy"]
 
-    calculator = get_calculator(conda)
     volumes = volumes_m3gnet
-    vfine = np.linspace(volumes.min(), volumes.max(), 500) # why we define Vfine?
-
-    rows = []
-    energies = []
+    if grid is not None:
+        # uniform grid of `grid` points over the same range
+        volumes = np.linspace(volumes_m3gnet.min(), volumes_m3gnet.max(), grid)
+
+    t0 = time.perf_counter()
+    if adaptive:
+        # coarse start, then volumes placed where they best pin down
+        # V0 and B0 of the BM3 fit to the relative std in adaptive_tol
+        volumes, _, _ = adaptive_volumes(
+            volume_energies, volumes.min(), volumes.max(),
+            targets=dict(zip(("V0", "B0"), adaptive_tol)), max_points=len(volumes),
+        )
+    # stress and forces came with the energies; for an adaptive grid
+    # they are looked up in the log, not recomputed
+    results = evaluate_volumes(volumes)
+    energies = results["energy"]
+    t_eval = time.perf_counter() - t0
+    log.close()
+
+    if cache is not None:
+        print(f"cache: {cache.hits} hits, {cache.misses} misses")
 
-    for vol in volumes:
-        stru = bulk('MgO', crystalstructure='rocksalt', a=(4*vol)**(1/3))
-        stru.calc = calculator
-
-        E = stru.get_potential_energy()
-        energies.append(E)
-
-        rows.append({
-            "Type": "Raw",
-            "Volume": vol,
-            "Energy": E,
-        })
+    vfine = np.linspace(volumes.min(), volumes.max(), 500) # why we define Vfine?
 
-    df = pd.DataFrame(rows)
+    df = pd.DataFrame({
+        "Volume": volumes,
+        "Energy": energies,
+    })
+    # direct P(V) from the stress of the same forward pass, GPa
+    if "stress" in results:
+        df["Pressure"] = pressures(results["stress"])
+    if "forces" in results:
+        df["Fmax"] = max_forces(results["forces"])
 
-    spline = InterpolatedUnivariateSpline(volumes, energies, k=3)
-    Einterp = spline(vfine) # why we define interpolated?
+    with stage("spline", len(vfine)):
+        spline = InterpolatedUnivariateSpline(volumes, energies, k=3)
+        Einterp = spline(vfine) # why we define interpolated?
 
     interp_df = pd.DataFrame({
-        "Type": "Interpolated",
         "Volume": vfine,
         "Energy": Einterp
     })
 
 
-    eos_models = [
-        ("birchmurnaghan",),
-        ("murnaghan",),
-        ("sjeos",),
-        ("taylor",),
-        ("birch",),
-    ]
+    # all EOS fitted together from one shared initial guess,
+    # every parameter (B0', B0'', ...) free
+    t0 = time.perf_counter()
+    with stage("fit", len(EOS_MODELS)):
+        fits = fit_models(volumes, energies, models=EOS_MODELS)
+    t_fit = time.perf_counter() - t0
 
     eos_rows = []
-
-    for (name,) in eos_models:
-        eos = EquationOfState(volumes, energies, eos=name)
-        v0, e0, B = eos.fit()
-
-        eos_rows.append({
-            "Type": "EOS",
-            "Model": name,
-            "v0": v0,
-            "e0": e0,
-            "Bulk_Modulus_GPa": B / kJ * 1e24
-        })
+    for name, (eos, info) in fits.items():
+        row = {
+            # bm3 keeps ase's name, plot.py / likelihoods.py look it up
+            "Model": "birchmurnaghan" if name == "bm3" else name,
+            "rms_eV": info["rms"],
+            "converged": bool(info["converged"]),
+            "n_iter": int(info["n_iter"]),
+        }
+        row.update(summarize(eos))
+        if "Pressure" in df:
+            # fitted vs stress-derived pressure at the computed volumes
+            dP = eos.pressure(volumes) * GPA_PER_EV_A3 - df["Pressure"].to_numpy()
+            row["P_rms_GPa"] = np.sqrt(np.mean(dP**2))
+        eos_rows.append(row)
 
     eos_df = pd.DataFrame(eos_rows)
 
-    pv_rows = []
-
-    # helper: get v0 and B0 from BM fit
-    bm_row = eos_df[eos_df["Model"] == "birchmurnaghan"].iloc[0]
-    v0 = bm_row["v0"]
-    B0 = bm_row["Bulk_Modulus_GPa"]
-
-    # Assume defaults for higher derivatives
-    B0p = 4.0
-    B0pp = 0.0
-    B0ppp = 0.0
+    # one array op per model over the whole fine grid, GPa
+    with stage("pv", len(fits) * len(vfine)):
+        pv_df = pd.concat([
+            pd.DataFrame({
+                "Model": name,
+                "Volume": vfine,
+                "Pressure": eos.pressure(vfine) * GPA_PER_EV_A3,
+            })
+            for name, (eos, _) in fits.items()
+        ], ignore_index=True)
 
-    for V in vfine:
-
-        # --- Murnaghan ---
-        P = murnaghan_pressure(V, v0, B0, B0p)
-        pv_rows.append({
-            "Type": "PV",
-            "Model": "murnaghan",
-            "Volume": V,
-            "Pressure": P,
-        })
-
-        # --- BM2 ---
-        P = birch_murnaghan_pressure_2nd(V, v0, B0)
-        pv_rows.append({
-            "Type": "PV",
-            "Model": "bm2",
-            "Volume": V,
-            "Pressure": P,
-        })
-
-        # --- BM3 ---
-        P = birch_murnaghan_pressure_3rd(V, v0, B0, B0p)
-        pv_rows.append({
-            "Type": "PV",
-            "Model": "bm3",
-            "Volume": V,
-            "Pressure": P,
-        })
+    # ===========================
+    # Write
+    # ===========================
+    tables = {
+        "raw": df,
+        "eos": eos_df,
+        "interpolated": interp_df,
+        "pv": pv_df,
+    }
+
+    if fmt in ("csv", "both"):
+        with stage("write_csv"):
+            write_csv(os.path.join(fout, f"{conda}.csv"), tables)
+
+    model, dtype = model_info(conda)
+    if fmt in ("columnar", "both"):
+        meta = {
+            "calculator": conda,
+            "model": model,
+            "dtype": dtype,
+            "structure": "MgO rocksalt",
+            "grid": {
+                "n": len(volumes),
+                "vmin": volumes.min(),
+                "vmax": volumes.max(),
+                "n_fine": len(vfine),
+            },
+            "timing_s": {
+                "load": TIMINGS.get(conda, {}).get("load_s"),
+                "evaluate": t_eval,
+                "fit": t_fit,
+            },
+            "stages": TIMERS.records(),
+        }
+        with stage("write_columnar"):
+            write_columnar(os.path.join(fout, conda + COLUMNAR_SUFFIX), tables, meta)
+
+    print(TIMERS.report())
+    write_timings(
+        os.path.join(fout, f"{conda}.timing.json"),
+        calculator=conda, model=model, dtype=dtype, n_volumes=len(volumes),
+        batch_size=batch_size, relax=relax, adaptive=adaptive,
+        load_s=TIMINGS.get(conda, {}).get("load_s"),
+        total_s=time.perf_counter() - t_run,
+    )
 
-        # --- BM4 ---
-        P = birch_murnaghan_pressure_4th(V, v0, B0, B0p, B0pp)
-        pv_rows.append({
-            "Type": "PV",
-            "Model": "bm4",
-            "Volume": V,
-            "Pressure": P,
-        })
 
-        # --- BM5 ---
-        P = birch_murnaghan_pressure_5th(V, v0, B0, B0p, B0pp, B0ppp)
-        pv_rows.append({
-            "Type": "PV",
-            "Model": "bm5",
-            "Volume": V,
-            "Pressure": P,
-        })
-
-        # --- SJEOS ---
-        # NOTE: just placeholder coeffs unless fitted separately
-        P = sjeos_pressure(V, 1.0, 1.0, 1.0, 0.0)
-        pv_rows.append({
-            "Type": "PV",
-            "Model": "sjeos",
-            "Volume": V,
-            "Pressure": P,
+def run_sweep(fout, conda, source, fractions=DEFAULT_FRACTIONS, batch_size=16,
+              cache=None, server=None, fmt="both", resume=False, relax="none",
+              relax_workers=1, fmax=0.01, chunk_structures=64, dedup=False,
+              symprec=1e-5, properties=("energy", "stress"), compiled=False):
+    """
+    E-V scan of every structure in `source` (file, directory or ASE db),
+    each on its own grid of `fractions` x its reference cell volume.
+
+    Structures are streamed `chunk_structures` at a time; the volume
+    grids of a whole chunk go through the calculator together, so batches
+    mix structures. All EOS fits run as one batched fit per model, on
+    per-atom volumes and energies. With `dedup`, structures equivalent
+    to any seen earlier in the sweep share one evaluation.
+    """
+    name = mode_name(conda, "sweep")
+    TIMERS.reset()
+    log = RecordLog(os.path.join(fout, f"{name}.jsonl"), resume=resume)
+    evaluate_structures = make_evaluator(
+        conda, log, batch_size=batch_size, cache=cache, server=server,
+        resume=resume, relax=relax, relax_workers=relax_workers, fmax=fmax,
+        dedup=dedup, symprec=symprec, properties=properties, compiled=compiled,
+    )
+    fractions = np.asarray(fractions, dtype=float)
+
+    raw = []
+    seen = {}
+    t0 = time.perf_counter()
+    stream = iter_structures(source)
+    while True:
+        group = list(islice(stream, chunk_structures))
+        if not group:
+            break
+
+        cells, rows = [], []
+        for label, ref in group:
+            # names must be unique, rows are grouped by them for fitting
+            seen[label] = seen.get(label, 0) + 1
+            if seen[label] > 1:
+                label = f"{label}#{seen[label]}"
+            for frac, atoms in zip(fractions, volume_grid(ref, fractions)):
+                cells.append(atoms)
+                rows.append({
+                    "Structure": label,
+                    "Formula": ref.get_chemical_formula(),
+                    "Natoms": len(ref),
+                    "Fraction": frac,
+                    "Volume": atoms.get_volume(),
+                })
+        res = evaluate_structures(cells, [r["Volume"] for r in rows])
+        for j, row in enumerate(rows):
+            row["Energy"] = res["energy"][j]
+        if "stress" in res:
+            for row, p in zip(rows, pressures(res["stress"])):
+                row["Pressure"] = p
+        if "forces" in res:
+            for row, f in zip(rows, max_forces(res["forces"])):
+                row["Fmax"] = f
+        raw.extend(rows)
+        print(f"{len(raw) // len(fractions)} structures done")
+    t_eval = time.perf_counter() - t0
+    log.close()
+    if dedup:
+        saved = TIMERS.stats.get("dedup_saved", {}).get("items", 0)
+        print(f"dedup: {saved} of {len(raw)} evaluations shared")
+
+    raw_df = pd.DataFrame(raw)
+    labels = raw_df["Structure"].unique()
+    natoms = raw_df.groupby("Structure", sort=False)["Natoms"].first().to_numpy()
+    V = raw_df["Volume"].to_numpy().reshape(len(labels), -1) / natoms[:, None]
+    E = raw_df["Energy"].to_numpy().reshape(len(labels), -1) / natoms[:, None]
+
+    t0 = time.perf_counter()
+    fits = fit_models(V, E, models=SWEEP_MODELS)
+    t_fit = time.perf_counter() - t0
+
+    eos_df = pd.concat([
+        pd.DataFrame({
+            "Structure": labels,
+            "Model": model,
+            **summarize(eos),
+            "rms_eV": info["rms"],
+            "converged": info["converged"],
+            "n_iter": info["n_iter"],
         })
+        for model, (eos, info) in fits.items()
+    ], ignore_index=True)
+
+    tables = {"raw": raw_df, "eos": eos_df}
+    if fmt in ("csv", "both"):
+        write_csv(os.path.join(fout, f"{name}.csv"), tables)
+    if fmt in ("columnar", "both"):
+        model, dtype = model_info(conda)
+        meta = {
+            "calculator": conda,
+            "model": model,
+            "dtype": dtype,
+            "structure": source,
+            "n_structures": len(labels),
+            "grid": {"fractions": fractions.tolist()},
+            "units": {"eos": "v0 in Å^3/atom, e0 in eV/atom"},
+            "timing_s": {"evaluate": t_eval, "fit": t_fit},
+        }
+        write_columnar(os.path.join(fout, name + COLUMNAR_SUFFIX), tables, meta)
+
+
+def run_supercell(fout, conda, repeats=SUPERCELL_REPEATS, volumes=None,
+                  batch_size=16, max_atoms=20_000, tol=1e-3, fmt="both",
+                  compiled=False):
+    """
+    Size-consistency check and scaling benchmark on large cells.
+
+    At each volume the energy per atom of every n x n x n supercell is
+    compared with the primitive cell (|difference| <= tol eV/atom), and
+    the wall time and resident memory per atom are recorded. Supercells
+    go through the model at most `max_atoms` atoms per batch, so peak
+    memory is set by the budget, not by the number of volumes.
+    """
+    if volumes is None:
+        volumes = np.linspace(volumes_m3gnet.min(), volumes_m3gnet.max(), 5)
+    volumes = np.asarray(volumes, dtype=float)
+    name = mode_name(conda, "supercell")
+    calc = get_calculator(conda, compiled)
+
+    prim = batched_energies(calc, [rocksalt(v) for v in volumes], conda, batch_size)
+    prim_per_atom = prim / 2
 
-    pv_df = pd.DataFrame(pv_rows)
-
-    # ===========================
-    # Combine all
-    # ===========================
-    out = pd.concat(
-        [df, eos_df, interp_df, pv_df],
-        ignore_index=True
-    )
+    rows = []
+    for n in repeats:
+        strus = [rocksalt_supercell(v, n) for v in volumes]
+        natoms = len(strus[0])
+        rss0 = rss_mb()
+        t0 = time.perf_counter()
+        E = batched_energies(calc, strus, conda, batch_size, max_atoms=max_atoms)
+        dt = (time.perf_counter() - t0) / len(strus)
+        rss1 = rss_mb()
+        del strus
+
+        delta = E / natoms - prim_per_atom
+        for v, e, d, ep in zip(volumes, E, delta, prim_per_atom):
+            rows.append({
+                "Volume": v,
+                "Repeat": n,
+                "Natoms": natoms,
+                "Energy": e,
+                "Energy_per_atom": e / natoms,
+                "Primitive_per_atom": ep,
+                "Delta_meV_per_atom": 1e3 * d,
+                "Consistent": bool(abs(d) <= tol),
+                "Seconds": dt,
+                "us_per_atom": 1e6 * dt / natoms,
+                "RSS_MB": rss1,
+                "RSS_delta_MB": rss1 - rss0,
+                "Peak_RSS_MB": peak_rss_mb(),
+            })
+        worst = np.abs(delta).max()
+        state = "ok" if worst <= tol else "SIZE-INCONSISTENT"
+        print(f"{natoms:7d} atoms  {dt:9.3f} s/structure  {1e6 * dt / natoms:8.2f} us/atom"
+              f"  peak {peak_rss_mb():8.0f} MB  max |dE| {1e3 * worst:.3f} meV/atom  {state}")
 
-    out.to_csv(os.path.join(fout, f"{conda}.csv"), index=False)
+    df = pd.DataFrame(rows)
+    tables = {"scaling": df}
+    if fmt in ("csv", "both"):
+        write_csv(os.path.join(fout, f"{name}.csv"), tables)
+    if fmt in ("columnar", "both"):
+        model, dtype = model_info(conda)
+        meta = {
+            "calculator": conda,
+            "model": model,
+            "dtype": dtype,
+            "structure": "MgO rocksalt, cubic cell repeated n x n x n",
+            "repeats": list(repeats),
+            "max_atoms": max_atoms,
+            "tol_eV_per_atom": tol,
+        }
+        write_columnar(os.path.join(fout, name + COLUMNAR_SUFFIX), tables, meta)
+    return df
+
+
+def run_qha(fout, conda, volumes=None, repeat=3, delta=0.01,
+            temperatures=DEFAULT_TEMPERATURES, model="bm3", batch_size=16,
+            workers=1, max_atoms=20_000, fmt="both", compiled=False):
+    """
+    Quasi-harmonic thermal EOS from finite-displacement phonons.
+
+    At each volume the primitive cell is repeated `repeat` times per axis
+    and each atom displaced by +-delta Å: 6 * 2 supercells of
+    2 * repeat**3 atoms per volume. They go through batched_properties
+    for forces (batched on the built-in backends, one call per cell for
+    other calculators), split over `workers` processes. F(V, T) = E(V) + F_vib(V, T) is
+    fitted at every temperature at once, giving V0(T), B0(T) and the
+    volumetric thermal expansion. Volumes with imaginary modes are left
+    out of the fits.
+    """
+    TIMERS.reset()
+    volumes = np.asarray(volumes_m3gnet if volumes is None else volumes, dtype=float)
+    temperatures = np.asarray(temperatures, dtype=float)
+    name = mode_name(conda, "qha")
+    calc = get_calculator(conda, compiled)
+    prims = [rocksalt(v) for v in volumes]
+
+    with stage("evaluate", len(prims)):
+        E = batched_energies(calc, prims, conda, batch_size)
+    energies = phonon_scan(prims, conda, calc=calc if workers <= 1 else None,
+                           calc_factory=partial(load_calculator, conda, compiled=compiled),
+                           repeat=repeat, delta=delta, workers=workers,
+                           batch_size=batch_size, max_atoms=max_atoms)
+    with stage("fit", len(temperatures)):
+        F, curves = quasi_harmonic(volumes, E, energies, temperatures, model)
+    ok = stable(energies)
+    if not ok.all():
+        print(f"{conda}: imaginary modes at V = {np.round(volumes[~ok], 3).tolist()}, "
+              "left out of the fits")
+    fitted = not np.isnan(curves["V0"]).all()
+    if not fitted:
+        print(f"WARNING {conda}: insufficient stable volumes ({ok.sum()} dynamically "
+              f"stable, too few for {model}); no thermal EOS")
+    else:
+        outside = temperatures[~curves["In_range"]]
+        if len(outside):
+            print(f"WARNING {conda}: V0(T) outside the sampled volumes at "
+                  f"T = {outside.min():.0f}-{outside.max():.0f} K (extrapolated, "
+                  "In_range False); extend the volume grid")
+
+    T, V = np.meshgrid(temperatures, volumes, indexing="ij")
+    tables = {
+        "free_energy": pd.DataFrame({
+            "Temperature": T.ravel(),
+            "Volume": V.ravel(),
+            "Energy": np.broadcast_to(E, F.shape).ravel(),
+            "F_vib": (F - E).ravel(),
+            "F": F.ravel(),
+            "Stable": np.broadcast_to(ok, F.shape).ravel(),
+        }),
+        "qha": pd.DataFrame({"Model": model, **curves}),
+        "phonons": pd.DataFrame({
+            "Volume": np.repeat(volumes, energies[0].size),
+            "Mode_energy_meV": 1e3 * energies.ravel(),
+        }),
+    }
+    if fitted:
+        for t in temperatures[np.linspace(0, len(temperatures) - 1, 4).astype(int)]:
+            row = tables["qha"][tables["qha"]["Temperature"] == t].iloc[0]
+            flag = "" if row["In_range"] else "  (extrapolated)"
+            print(f"T {t:7.1f} K  V0 {row['V0']:8.4f} Å^3  B0 {row['B0_GPa']:8.2f} GPa"
+                  f"  alpha {1e6 * row['alpha']:7.2f} 1e-6/K{flag}")
+    print(TIMERS.report())
+
+    if fmt in ("csv", "both"):
+        write_csv(os.path.join(fout, f"{name}.csv"), tables)
+    if fmt in ("columnar", "both"):
+        model_name, dtype = model_info(conda)
+        meta = {
+            "calculator": conda,
+            "model": model_name,
+            "dtype": dtype,
+            "structure": "MgO rocksalt primitive cell",
+            "supercell_repeat": repeat,
+            "displacement_A": delta,
+            "eos_model": model,
+            "stages": TIMERS.records(),
+        }
+        write_columnar(os.path.join(fout, name + COLUMNAR_SUFFIX), tables, meta)
+    return tables
+
+
+def equilibrium(fout, conda, calc, batch_size=16):
+    """
+    (V0, B0 in GPa, where from) of the BM3 fit: read from run_eos output
+    in `fout` when there is one, else fitted here on the volumes.py grid.
+    """
+    path = find_results(fout, conda)
+    if os.path.exists(path):
+        eos = read_table(path, "eos", ["Model", "v0", "Bulk_Modulus_GPa"])
+        row = eos[eos["Model"] == "birchmurnaghan"]
+        if len(row):
+            return float(row["v0"].iloc[0]), float(row["Bulk_Modulus_GPa"].iloc[0]), path
+    with stage("evaluate", len(volumes_m3gnet)):
+        E = batched_energies(calc, [rocksalt(v) for v in volumes_m3gnet], conda, batch_size)
+    s = summarize(fit_models(volumes_m3gnet, E, models=["bm3"])["bm3"][0])
+    return float(s["v0"]), float(s["Bulk_Modulus_GPa"]), "bm3 fit on volumes.py grid"
+
+
+def run_elastic(fout, conda, strains=DEFAULT_STRAINS, volume=None, batch_size=16,
+                tol=0.05, fmt="both", compiled=False):
+    """
+    Cubic elastic constants C11, C12, C44 from stress-strain.
+
+    The six Voigt strains at each magnitude in `strains` are applied to
+    the rocksalt cell at the EOS equilibrium volume (or `volume`), and
+    the strained cells go through batched_properties for stress:
+    batched on the built-in backends, one call per cell for other
+    calculators.
+    C_ij come from straight-line fits with standard errors, and
+    (C11 + 2 C12)/3 is checked against the EOS Bulk_Modulus_GPa within
+    relative `tol`.
+    """
+    TIMERS.reset()
+    name = mode_name(conda, "elastic")
+    calc = get_calculator(conda, compiled)
+    v0, B_eos, source = equilibrium(fout, conda, calc, batch_size)
+    volume = v0 if volume is None else volume
+
+    cells = strained_cells(rocksalt(volume), strains)
+    with stage("evaluate", len(cells)):
+        stress = batched_properties(calc, cells, conda, batch_size,
+                                    properties=("energy", "stress"))["stress"]
+    with stage("fit", 36):
+        C, err = fit_stiffness(stress, strains)
+    consts = cubic_constants(C, err)
+
+    B, B_err, _ = consts["B"]
+    rel = (B - B_eos) / B_eos
+    consistent = bool(abs(rel) <= tol)
+    elastic_df = pd.DataFrame([
+        {"Constant": k, "Value_GPa": v, "Fit_err_GPa": e, "Cubic_spread_GPa": s}
+        for k, (v, e, s) in consts.items()
+    ])
+    i, j = np.indices(C.shape)
+    stiffness_df = pd.DataFrame({
+        "i": i.ravel() + 1, "j": j.ravel() + 1,
+        "C_GPa": C.ravel(), "Err_GPa": err.ravel(),
+    })
+    check_df = pd.DataFrame([{
+        "Volume": volume,
+        "B_elastic_GPa": B,
+        "B_elastic_err_GPa": B_err,
+        "B_EOS_GPa": B_eos,
+        "Relative_diff": rel,
+        "Consistent": consistent,
+        "Born_stable": born_stable(consts["C11"][0], consts["C12"][0], consts["C44"][0]),
+        "EOS_source": source,
+    }])
+
+    print(elastic_df.to_string(index=False))
+    state = "ok" if consistent else "INCONSISTENT"
+    print(f"(C11+2C12)/3 = {B:.2f} +- {B_err:.2f} GPa vs EOS B0 {B_eos:.2f} GPa "
+          f"({100 * rel:+.1f} %, {source})  {state}")
+
+    tables = {"elastic": elastic_df, "stiffness": stiffness_df, "check": check_df}
+    if fmt in ("csv", "both"):
+        write_csv(os.path.join(fout, f"{name}.csv"), tables)
+    if fmt in ("columnar", "both"):
+        model, dtype = model_info(conda)
+        meta = {
+            "calculator": conda,
+            "model": model,
+            "dtype": dtype,
+            "structure": "MgO rocksalt primitive cell",
+            "strains": np.asarray(strains).tolist(),
+            "tol_relative": tol,
+            "stages": TIMERS.records(),
+        }
+        write_columnar(os.path.join(fout, name + COLUMNAR_SUFFIX), tables, meta)
+    return tables
 
 
 if __name__ == "__main__":
-    fout = sys.argv[1]
-    conda = sys.argv[2]
-    run_eos(fout, conda)
-
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fout", help="output directory")
+    parser.add_argument("conda", help="calculator name")
+    parser.add_argument("--batch-size", type=int, default=16,
+                        help="structures per forward pass (<=1: serial)")
+    parser.add_argument("--cache", default=None,
+                        help="SQLite result cache; only new structures are evaluated")
+    parser.add_argument("--cache-size", type=int, default=100_000,
+                        help="max cached results before LRU eviction")
+    parser.add_argument("--server", nargs="?", const=DEFAULT_URL,
+                        default=None,
+                        help="evaluate through a running server.py instead of loading the model")
+    parser.add_argument("--format", choices=["csv", "columnar", "both"],
+                        default="both",
+                        help="wide CSV, per-table .npy columns (<conda>.cols/), or both")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip volumes already recorded in <conda>.jsonl")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="place volumes adaptively instead of the fixed grid in volumes.py")
+    parser.add_argument("--adaptive-tol", type=float, nargs=2, metavar=("V0", "B0"),
+                        default=(1e-3, 1e-2),
+                        help="stop when the relative std of V0 and B0 are below these")
+    parser.add_argument("--relax", choices=["none", "positions", "cell"],
+                        default="none",
+                        help="relax positions (and cell shape) at each fixed volume")
+    parser.add_argument("--relax-workers", type=int, default=1,
+                        help="processes for the relaxations, each loads its own model")
+    parser.add_argument("--fmax", type=float, default=0.01,
+                        help="relaxation force threshold in eV/Å")
+    parser.add_argument("--structures", default=None,
+                        help="ASE-readable file, ASE .db or directory to sweep instead of MgO")
+    parser.add_argument("--fractions", type=float, nargs=3,
+                        metavar=("MIN", "MAX", "N"), default=None,
+                        help="volume grid as fractions of each reference cell")
+    parser.add_argument("--chunk-structures", type=int, default=64,
+                        help="structures read and evaluated together in a sweep")
+    parser.add_argument("--stress", action=argparse.BooleanOptionalAction,
+                        default=True,
+                        help="record stress with each energy for direct P(V)")
+    parser.add_argument("--forces", action="store_true",
+                        help="also record forces (kept in the .jsonl log, max |F| in raw)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="evaluate symmetry-equivalent structures once and share the result")
+    parser.add_argument("--symprec", type=float, default=1e-5,
+                        help="spglib tolerance for --dedup")
+    parser.add_argument("--grid", type=int, default=None,
+                        help="uniform grid of N volumes instead of the one in volumes.py")
+    parser.add_argument("--supercell", type=int, nargs="*", default=None,
+                        metavar="N",
+                        help="size-consistency / scaling run on N x N x N cubic supercells "
+                             f"(default N: {' '.join(map(str, SUPERCELL_REPEATS))})")
+    parser.add_argument("--max-atoms", type=int, default=20_000,
+                        help="atom budget per supercell batch")
+    parser.add_argument("--qha", action="store_true",
+                        help="quasi-harmonic F(V,T), V(T), B(T) from finite-displacement phonons")
+    parser.add_argument("--phonon-repeat", type=int, default=3,
+                        help="supercell repeat per axis for the phonons")
+    parser.add_argument("--displacement", type=float, default=0.01,
+                        help="finite displacement in Å")
+    parser.add_argument("--temperatures", type=float, nargs=3,
+                        metavar=("TMIN", "TMAX", "STEP"), default=None,
+                        help="temperature grid in K (default 0 1500 25)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for the displaced supercells, each loads its own model")
+    parser.add_argument("--elastic", action="store_true",
+                        help="cubic C11, C12, C44 from stress-strain, checked against the EOS B0")
+    parser.add_argument("--strains", type=float, nargs=2, metavar=("MAX", "N"),
+                        default=None,
+                        help="N strain magnitudes in [-MAX, MAX] (default 0.01 5)")
+    parser.add_argument("--compiled", action="store_true",
+                        help="compiled model (torch.compile / TorchScript), parity-checked against eager")
+    parser.add_argument("--profile", action="store_true",
+                        help="run under cProfile, stats in <fout>/<conda>.prof")
+    args = parser.parse_args()
+    if args.dedup and args.forces:
+        parser.error("--dedup cannot share forces between equivalent structures; "
+                     "drop --forces or --dedup")
+
+    cache = None
+    if args.cache is not None:
+        cache = ResultCache(args.cache, max_entries=args.cache_size)
+
+    prof = os.path.join(args.fout, f"{args.conda}.prof") if args.profile else None
+    properties = ["energy"] + ["stress"] * args.stress + ["forces"] * args.forces
+
+    if args.elastic:
+        strains = DEFAULT_STRAINS
+        if args.strains is not None:
+            smax, n = args.strains
+            strains = np.linspace(-smax, smax, int(n))
+        with profiled(prof):
+            run_elastic(args.fout, args.conda, strains=strains,
+                        batch_size=args.batch_size, fmt=args.format,
+                        compiled=args.compiled)
+    elif args.qha:
+        temperatures = DEFAULT_TEMPERATURES
+        if args.temperatures is not None:
+            lo, hi, step = args.temperatures
+            temperatures = np.arange(lo, hi + 0.5 * step, step)
+        volumes = None if args.grid is None else \
+            np.linspace(volumes_m3gnet.min(), volumes_m3gnet.max(), args.grid)
+        with profiled(prof):
+            run_qha(args.fout, args.conda, volumes=volumes, repeat=args.phonon_repeat,
+                    delta=args.displacement, temperatures=temperatures,
+                    batch_size=args.batch_size, workers=args.workers,
+                    max_atoms=args.max_atoms, fmt=args.format, compiled=args.compiled)
+    elif args.supercell is not None:
+        with profiled(prof):
+            run_supercell(args.fout, args.conda,
+                          repeats=args.supercell or SUPERCELL_REPEATS,
+                          batch_size=args.batch_size, max_atoms=args.max_atoms,
+                          fmt=args.format, compiled=args.compiled)
+    elif args.structures is not None:
+        fractions = DEFAULT_FRACTIONS
+        if args.fractions is not None:
+            lo, hi, n = args.fractions
+            fractions = np.linspace(lo, hi, int(n))
+        with profiled(prof):
+            run_sweep(args.fout, args.conda, args.structures, fractions=fractions,
+                      batch_size=args.batch_size, cache=cache, server=args.server,
+                      fmt=args.format, resume=args.resume, relax=args.relax,
+                      relax_workers=args.relax_workers, fmax=args.fmax,
+                      chunk_structures=args.chunk_structures,
+                      dedup=args.dedup, symprec=args.symprec,
+                      properties=properties, compiled=args.compiled)
+    else:
+        with profiled(prof):
+            run_eos(args.fout, args.conda, batch_size=args.batch_size, cache=cache,
+                    server=args.server, fmt=args.format, resume=args.resume,
+                    adaptive=args.adaptive, adaptive_tol=args.adaptive_tol,
+                    relax=args.relax, relax_workers=args.relax_workers,
+                    fmax=args.fmax, grid=args.grid, dedup=args.dedup,
+                    symprec=args.symprec, properties=properties,
+                    compiled=args.compiled)
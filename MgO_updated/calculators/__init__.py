@@ -0,0 +1,159 @@
+import os
+import time
+import importlib
+from importlib.metadata import entry_points
+
+
+# name -> where the loader lives, the pip package it needs, and which
+# model/dtype it loads. "compiled" marks loaders with a compiled
+# execution path (torch.compile or TorchScript).
+# Nothing here imports a backend; only load_calculator() does, and only
+# for the backend that was asked for.
+REGISTRY = {
+    "m3gnet": {
+        "module": "calculators.m3gnetcalc",
+        "package": "matgl",
+        "loader": "m3gnet",
+        "model": "M3GNet-MP-2021.2.8-PES",
+        "dtype": "float32",
+    },
+    "mace": {
+        "module": "calculators.macecalc",
+        "package": "mace-torch",
+        "loader": "mace",
+        "model": "mace-mp-medium",
+        "dtype": "float32",
+        "dtype_arg": "dtype",
+        "compiled": True,
+    },
+    "sevenn": {
+        "module": "calculators.sevencalc",
+        "package": "sevenn",
+        "loader": "sevenn",
+        "model": "7net-omni/mpa",
+        "dtype": "float32",
+        "compiled": True,
+    },
+    "mattersim": {
+        "module": "calculators.mattercalc",
+        "package": "mattersim",
+        "loader": "mattersim",
+        "model": "MatterSim-v1.0.0-5M",
+        "dtype": "float32",
+    },
+    "orb": {
+        "module": "calculators.orbcalc",
+        "package": "orb-models",
+        "loader": "orb",
+        "model": "orb-v3-conservative-inf-omat",
+        "dtype": "float32-high",
+        "dtype_arg": "precision",
+        "compiled": True,
+    },
+    "chgnet": {
+        "module": "calculators.chgnetcalc",
+        "package": "chgnet",
+        "loader": "chgnet",
+        "model": "CHGNet-default",
+        "dtype": "float32",
+    },
+}
+
+# third-party packages can add backends under this entry point group,
+# e.g. grace = "mypkg.gracecalc:grace"
+ENTRY_POINT_GROUP = "damproject.calculators"
+
+# name -> {"import_s": ..., "load_s": ...} for every backend loaded so far
+TIMINGS = {}
+
+# compiled artifacts: TorchScript files and the torch.compile (inductor)
+# cache, so compilation is paid once per machine, not once per run
+COMPILE_CACHE = os.environ.get(
+    "DAMPROJECT_COMPILE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "damproject", "compiled"),
+)
+
+
+def compile_cache(name):
+    """Directory for the compiled artifacts of one backend."""
+    path = os.path.join(COMPILE_CACHE, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def register(name, module, loader, model=None, dtype="unknown", package=None):
+    REGISTRY[name] = {
+        "module": module,
+        "package": package,
+        "loader": loader,
+        "model": model or name,
+        "dtype": dtype,
+    }
+
+
+def _register_entry_points():
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        if ep.name not in REGISTRY:
+            module, _, loader = ep.value.partition(":")
+            register(ep.name, module, loader)
+
+
+def available():
+    _register_entry_points()
+    return sorted(REGISTRY)
+
+
+def model_info(name):
+    """(model version, dtype) for a registered calculator."""
+    entry = REGISTRY.get(name)
+    if entry is None:
+        return name, "unknown"
+    return entry["model"], entry["dtype"]
+
+
+def load_calculator(name, dtype=None, compiled=False):
+    """
+    Import the backend for `name` and build its ASE calculator.
+
+    `dtype` overrides the default precision for backends that have one
+    (entries with a "dtype_arg"). `compiled` selects the backend's
+    compiled execution path; compiled.py checks it against eager.
+    Import and model-load wall times are recorded in TIMINGS[name].
+    """
+    if name not in REGISTRY:
+        _register_entry_points()
+    if name not in REGISTRY:
+        raise ValueError(
+            f"Unknown calculator {name}, choose from {', '.join(available())}"
+        )
+    entry = REGISTRY[name]
+
+    kwargs = {}
+    if dtype is not None and dtype != entry["dtype"]:
+        if "dtype_arg" not in entry:
+            raise ValueError(f"{name} has no dtype option, it runs {entry['dtype']}")
+        kwargs[entry["dtype_arg"]] = dtype
+    if compiled:
+        if not entry.get("compiled"):
+            raise ValueError(f"{name} has no compiled execution path")
+        kwargs["compiled"] = True
+        # must be set before torch is imported
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", compile_cache("inductor"))
+        os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+
+    t0 = time.perf_counter()
+    module = importlib.import_module(entry["module"])
+    t1 = time.perf_counter()
+    calc = getattr(module, entry["loader"])(**kwargs)
+    t2 = time.perf_counter()
+
+    TIMINGS[name] = {"import_s": t1 - t0, "load_s": t2 - t1, "compiled": compiled}
+    return calc
+
+
+def format_timings(timings=None):
+    timings = TIMINGS if timings is None else timings
+    lines = [f"{'calculator':<12s} {'import (s)':>10s} {'load (s)':>10s}"]
+    for name, t in timings.items():
+        lines.append(f"{name:<12s} {t['import_s']:10.2f} {t['load_s']:10.2f}")
+    return "\n".join(lines)
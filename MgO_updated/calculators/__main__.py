@@ -0,0 +1,41 @@
+import sys
+import json
+import argparse
+import subprocess
+
+from calculators import available, format_timings
+
+
+# each backend is timed in a fresh interpreter, otherwise torch & co.
+# are only paid for by whichever backend happens to load first
+PROBE = (
+    "import json, calculators; "
+    "calculators.load_calculator({name!r}); "
+    "print(json.dumps(calculators.TIMINGS[{name!r}]))"
+)
+
+
+def profile(names):
+    timings = {}
+    for name in names:
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(name=name)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            err = proc.stderr.strip().splitlines()
+            print(f"{name}: failed ({err[-1] if err else proc.returncode})")
+            continue
+        timings[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m calculators",
+        description="Cold-start import/load time per calculator backend.",
+    )
+    parser.add_argument("names", nargs="*", default=None)
+    args = parser.parse_args()
+
+    print(format_timings(profile(args.names or available())))
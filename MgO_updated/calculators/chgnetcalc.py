@@ -1,6 +1,3 @@
-from ase import build
-from ase.units import GPa
-import matgl
 from chgnet.model.model import CHGNet
 from chgnet.model.dynamics import CHGNetCalculator
 
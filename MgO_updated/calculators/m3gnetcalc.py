@@ -1,4 +1,3 @@
-from ase import build
 from ase.units import GPa
 import matgl
 from matgl.ext.ase import M3GNetCalculator
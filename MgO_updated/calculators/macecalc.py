@@ -1,7 +1,7 @@
 from mace.calculators import mace_mp
-from ase import build
-from ase.units import GPa
 
-def mace():
-    calc = mace_mp(model="medium", dispersion=False, default_dtype="float32", device='cpu')
+def mace(dtype="float32", compiled=False):
+    # compile_mode runs the model through torch.compile
+    calc = mace_mp(model="medium", dispersion=False, default_dtype=dtype, device='cpu',
+                   compile_mode="default" if compiled else None)
     return calc
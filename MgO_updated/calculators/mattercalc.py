@@ -1,7 +1,3 @@
-import torch
-from loguru import logger
-from ase.build import bulk
-from ase.units import GPa
 from mattersim.forcefield import MatterSimCalculator
 
 
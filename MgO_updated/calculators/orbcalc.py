@@ -1,13 +1,11 @@
-import ase
-from ase.build import bulk
-
 from orb_models.forcefield import pretrained
 from orb_models.forcefield.calculator import ORBCalculator
-def orb():
+def orb(precision="float32-high", compiled=False):
     device="cpu" 
     orbff = pretrained.orb_v3_conservative_inf_omat(
     device=device,
-    precision="float32-high",  
+    precision=precision,  
+    compile=compiled,
     )
     calc = ORBCalculator(orbff, device=device)
     return calc
\ No newline at end of file
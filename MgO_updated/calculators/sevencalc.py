@@ -1,6 +1,26 @@
+import os
 from sevenn.calculator import SevenNetCalculator
 
-def sevenn():
+from calculators import compile_cache
+
+
+def _deployed(model, modal):
+    """TorchScript export of a pretrained model, written once and reused."""
+    path = os.path.join(compile_cache("sevenn"), f"{model}-{modal}.pt")
+    if not os.path.exists(path):
+        from sevenn.scripts.deploy import deploy
+        from sevenn.util import pretrained_name_to_path
+
+        deploy(pretrained_name_to_path(model), path, modal=modal)
+    return path
+
+
+def sevenn(compiled=False):
+    if compiled:
+        # cueq / flash kernels are CUDA only; on CPU the TorchScript
+        # export is the compiled path
+        return SevenNetCalculator(model=_deployed("7net-omni", "mpa"),
+                                  file_type="torchscript")
     calc = SevenNetCalculator(
         model="7net-omni", 
         modal="mpa",        
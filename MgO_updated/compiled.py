@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from ase.build import bulk
+
+from batch import batched_energies
+from benchmark import versions
+from calculators import load_calculator, model_info, compile_cache, REGISTRY
+
+
+# eV/atom; float32 kernel reordering stays well below this
+PARITY_TOL = 1e-4
+
+
+# ===============================
+# Warm-up and timing
+# ===============================
+
+def parity_structures(n=8):
+    """Primitive MgO over +-10 % volume plus a 64-atom cell, all shapes a run sees."""
+    strus = []
+    for f in np.linspace(0.9, 1.1, n):
+        atoms = bulk("MgO", "rocksalt", a=4.21)
+        atoms.set_cell(atoms.cell * f**(1 / 3), scale_atoms=True)
+        strus.append(atoms)
+    strus.append(bulk("MgO", "rocksalt", a=4.21, cubic=True).repeat(2))
+    return strus
+
+
+def warm_up(calc, conda, structures, batch_size=16, rounds=2):
+    """
+    Run the structures through the calculator `rounds` times, serially
+    and batched, so compilation and autotuning happen here rather than
+    inside the timed scan. Returns the wall time of each round.
+    """
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        batched_energies(calc, structures, conda, 1)
+        batched_energies(calc, structures, conda, batch_size)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def _steady(calc, conda, structures, batch_size, repeats=3):
+    """Median seconds per structure of the batched path."""
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        E = batched_energies(calc, structures, conda, batch_size)
+        times.append(time.perf_counter() - t0)
+    return E, float(np.median(times)) / len(structures)
+
+
+# ===============================
+# Parity
+# ===============================
+
+def parity_path(conda, dtype=None):
+    dtype = dtype or model_info(conda)[1]
+    return os.path.join(compile_cache(conda), f"parity-{dtype}.json")
+
+
+def check_parity(conda, dtype=None, batch_size=16, tol=PARITY_TOL):
+    """
+    Energies of the eager and compiled calculator on parity_structures().
+    The record (max |dE| per atom, warm-up cost, steady-state speed-up)
+    is written next to the compiled artifacts. Returns (record, the
+    warmed-up compiled calculator).
+    """
+    strus = parity_structures()
+    natoms = np.array([len(a) for a in strus])
+
+    eager = load_calculator(conda, dtype)
+    warm_up(eager, conda, strus, batch_size, rounds=1)
+    E_ref, t_eager = _steady(eager, conda, strus, batch_size)
+    del eager
+
+    calc = load_calculator(conda, dtype, compiled=True)
+    warm = warm_up(calc, conda, strus, batch_size)
+    E, t_comp = _steady(calc, conda, strus, batch_size)
+
+    dE = float(np.max(np.abs(E - E_ref) / natoms))
+    record = {
+        "calculator": conda,
+        "dtype": dtype or model_info(conda)[1],
+        "max_dE_eV_per_atom": dE,
+        "tol_eV_per_atom": tol,
+        "passed": dE <= tol,
+        "warmup_s": warm,
+        "eager_s_per_structure": t_eager,
+        "compiled_s_per_structure": t_comp,
+        "speedup": t_eager / t_comp,
+        "versions": versions(conda),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(parity_path(conda, dtype), "w") as fh:
+        json.dump(record, fh, indent=2)
+    return record, calc
+
+
+def compiled_calculator(conda, dtype=None, batch_size=16, tol=PARITY_TOL,
+                        recheck=False):
+    """
+    (calculator, parity record) for a warmed-up compiled model. Parity
+    against eager is checked the first time (and again whenever the
+    package versions change) and cached; a failed check raises instead
+    of returning a calculator that disagrees with the eager model.
+    """
+    record = None
+    path = parity_path(conda, dtype)
+    if not recheck and os.path.exists(path):
+        with open(path) as fh:
+            record = json.load(fh)
+        if record.get("versions") != versions(conda) or record["tol_eV_per_atom"] > tol:
+            record = None
+
+    if record is None:
+        record, calc = check_parity(conda, dtype, batch_size, tol)
+    else:
+        calc = load_calculator(conda, dtype, compiled=True)
+        warm_up(calc, conda, parity_structures(), batch_size)
+
+    if not record["passed"]:
+        raise RuntimeError(
+            f"compiled {conda} differs from eager by {record['max_dE_eV_per_atom']:.2e} "
+            f"eV/atom (tol {tol:.0e}), see {path}"
+        )
+    return calc, record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check compiled calculators against eager and time both."
+    )
+    parser.add_argument("calculators", nargs="*",
+                        default=[n for n, e in REGISTRY.items() if e.get("compiled")])
+    parser.add_argument("--dtype", default=None)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--tol", type=float, default=PARITY_TOL,
+                        help="max energy difference in eV/atom")
+    args = parser.parse_args()
+
+    for conda in args.calculators:
+        rec, _ = check_parity(conda, args.dtype, args.batch_size, args.tol)
+        state = "ok" if rec["passed"] else "FAILED"
+        print(f"{conda:<10s} |dE| {rec['max_dE_eV_per_atom']:.2e} eV/atom  "
+              f"warm-up {sum(rec['warmup_s']):7.1f} s  "
+              f"eager {1e3 * rec['eager_s_per_structure']:8.2f} ms  "
+              f"compiled {1e3 * rec['compiled_s_per_structure']:8.2f} ms  "
+              f"{rec['speedup']:.2f}x  {state}")
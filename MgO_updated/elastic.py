@@ -0,0 +1,95 @@
+import numpy as np
+
+from fit import GPA_PER_EV_A3
+
+
+DEFAULT_STRAINS = np.linspace(-0.01, 0.01, 5)
+
+# Voigt index -> (i, j) of the symmetric tensor
+VOIGT = [(0, 0), (1, 1), (2, 2), (1, 2), (0, 2), (0, 1)]
+
+# equivalent entries of a cubic C_ij (Voigt, 0-based)
+CUBIC = {
+    "C11": [(0, 0), (1, 1), (2, 2)],
+    "C12": [(0, 1), (0, 2), (1, 2), (1, 0), (2, 0), (2, 1)],
+    "C44": [(3, 3), (4, 4), (5, 5)],
+}
+
+
+# ===============================
+# Strain sets
+# ===============================
+
+def strain_matrix(voigt, eps):
+    """Symmetric strain tensor for Voigt component `voigt` = eps (engineering shear)."""
+    e = np.zeros((3, 3))
+    i, j = VOIGT[voigt]
+    if i == j:
+        e[i, i] = eps
+    else:
+        e[i, j] = e[j, i] = eps / 2
+    return e
+
+
+def strained_cells(atoms, strains=DEFAULT_STRAINS):
+    """
+    Each of the six Voigt strains at every magnitude in `strains`:
+    6 * len(strains) cells ordered (component, magnitude), atoms moved
+    with the cell. Rocksalt atoms sit on inversion centres, so no
+    internal relaxation is needed.
+    """
+    cells = []
+    for k in range(6):
+        for eps in strains:
+            c = atoms.copy()
+            c.set_cell(atoms.cell @ (np.eye(3) + strain_matrix(k, eps)), scale_atoms=True)
+            cells.append(c)
+    return cells
+
+
+# ===============================
+# Fit
+# ===============================
+
+def fit_stiffness(stress, strains=DEFAULT_STRAINS):
+    """
+    C_ij in GPa and their standard errors from the Voigt stresses
+    (6 * n_strains, 6) of strained_cells(): one straight line per
+    (stress i, strain j) pair, all fitted in one least-squares call. The
+    intercept absorbs any residual stress of the reference cell.
+    """
+    eps = np.asarray(strains, dtype=float)
+    s = np.asarray(stress, dtype=float).reshape(6, len(eps), 6) * GPA_PER_EV_A3
+    A = np.stack([eps, np.ones_like(eps)], axis=1)                   # (n, 2)
+    y = s.transpose(1, 0, 2).reshape(len(eps), 36)                   # (n, j*6 + i)
+    coef, _, _, _ = np.linalg.lstsq(A, y, rcond=None)
+    resid = y - A @ coef
+    dof = max(len(eps) - 2, 1)
+    var = np.sum(resid**2, axis=0) / dof * np.linalg.inv(A.T @ A)[0, 0]
+
+    # row j of the fit is strain j, so transpose into C[i, j]
+    C = coef[0].reshape(6, 6).T
+    err = np.sqrt(var).reshape(6, 6).T
+    return C, err
+
+
+def cubic_constants(C, err):
+    """
+    C11, C12, C44 as the mean of their equivalent entries, with the
+    propagated fit error and the spread of the entries (a measure of
+    how far the model breaks cubic symmetry), plus B = (C11 + 2 C12)/3.
+    """
+    out = {}
+    for name, idx in CUBIC.items():
+        vals = np.array([C[i, j] for i, j in idx])
+        errs = np.array([err[i, j] for i, j in idx])
+        out[name] = (vals.mean(), np.sqrt(np.sum(errs**2)) / len(idx), vals.std())
+    B = (out["C11"][0] + 2 * out["C12"][0]) / 3
+    B_err = np.hypot(out["C11"][1], 2 * out["C12"][1]) / 3
+    out["B"] = (B, B_err, np.nan)
+    return out
+
+
+def born_stable(c11, c12, c44):
+    """Born stability criteria of a cubic crystal."""
+    return bool(c11 - c12 > 0 and c11 + 2 * c12 > 0 and c44 > 0)
@@ -10,157 +10,380 @@ def _eta(V, V0):
     return (V0 / V)**(2.0 / 3.0)
 
 
+def _stack(*cols):
+    """Stack per-parameter derivatives on a trailing axis."""
+    return np.stack(np.broadcast_arrays(*cols), axis=-1)
+
+
 # ===============================
-# Murnaghan EOS
+# Base class
 # ===============================
 
-def murnaghan_energy(V, V0, B0, B0p, E0):
-    """
-    Murnaghan EOS energy.
+class EOS:
     """
-    term = (B0 * V) / (B0p * (B0p - 1.0))
-    return E0 + term * (((V0 / V)**B0p) * (B0p - 1.0) + 1.0) - (B0 * V0)/(B0p - 1.0)
+    Equation of state with its parameters bound.
 
+    All methods take a NumPy array of volumes and broadcast against the
+    parameters, so parameters can themselves be arrays (e.g. shape
+    (n_fits, 1) against V of shape (n_volumes,)) to evaluate many
+    curves in one call.
 
-def murnaghan_pressure(V, V0, B0, B0p):
-    """
-    Murnaghan EOS pressure.
+    Units follow the inputs: with V in Å^3 and B0 in eV/Å^3 energies come
+    out in eV; pressures and bulk moduli come out in the units of B0.
     """
-    return (B0 / B0p) * ((V0 / V)**B0p - 1.0)
 
+    name = None
+    param_names = ()
+
+    def __init__(self, *args, **kwargs):
+        values = dict(zip(self.param_names, args))
+        values.update(kwargs)
+        missing = [p for p in self.param_names if p not in values]
+        if missing:
+            raise TypeError(f"{self.name}: missing parameters {missing}")
+        for p in self.param_names:
+            setattr(self, p, np.asarray(values[p], dtype=float))
+
+    @classmethod
+    def from_array(cls, params):
+        """Build from params[..., i] ordered as param_names."""
+        params = np.asarray(params, dtype=float)
+        return cls(*[params[..., i] for i in range(len(cls.param_names))])
+
+    @property
+    def params(self):
+        return _stack(*[getattr(self, p) for p in self.param_names])
+
+    def __repr__(self):
+        vals = ", ".join(f"{p}={getattr(self, p)}" for p in self.param_names)
+        return f"{type(self).__name__}({vals})"
+
+    def energy(self, V):
+        raise NotImplementedError
+
+    def pressure(self, V):
+        raise NotImplementedError
+
+    def bulk_modulus(self, V):
+        raise NotImplementedError
+
+    def dBdP(self, V):
+        raise NotImplementedError
+
+    def jacobian(self, V):
+        """dE/dparams, shape V.shape + (len(param_names),)."""
+        raise NotImplementedError
+
+
+# ===============================
+# Murnaghan EOS
+# ===============================
+
+class Murnaghan(EOS):
+    name = "murnaghan"
+    param_names = ("E0", "V0", "B0", "B0p")
+
+    def energy(self, V):
+        r = self.V0 / V
+        Bp = self.B0p
+        return (self.E0 + self.B0 * V / Bp * (r**Bp / (Bp - 1.0) + 1.0)
+                - self.B0 * self.V0 / (Bp - 1.0))
+
+    def pressure(self, V):
+        return (self.B0 / self.B0p) * ((self.V0 / V)**self.B0p - 1.0)
+
+    def bulk_modulus(self, V):
+        return self.B0 * (self.V0 / V)**self.B0p
+
+    def dBdP(self, V):
+        return np.broadcast_to(self.B0p, np.broadcast(V, self.B0p).shape)
+
+    def jacobian(self, V):
+        V0, B0, Bp = self.V0, self.B0, self.B0p
+        r = V0 / V
+        rB = r**Bp
+        a = Bp * (Bp - 1.0)
+
+        dE0 = np.ones_like(V * V0)
+        dV0 = B0 * (rB / r - 1.0) / (Bp - 1.0)
+        dB0 = V * (rB / a + 1.0 / Bp) - V0 / (Bp - 1.0)
+        dBp = B0 * V * (rB * np.log(r) / a - rB * (2.0 * Bp - 1.0) / a**2
+                        - 1.0 / Bp**2) + B0 * V0 / (Bp - 1.0)**2
+        return _stack(dE0, dV0, dB0, dBp)
 
 
 # ===============================
 # Birch–Murnaghan EOS (General)
 # ===============================
+#
+# E = E0 + 9 V0 B0 / 2 * (f^2 + a3 f^3 + a4 f^4 + a5 f^5)
+# with the Eulerian strain f = ((V0/V)^(2/3) - 1) / 2. The a_n follow
+# from B0', B0'' and B0''' by matching derivatives of B(P) at V0.
+
+class _BirchMurnaghan(EOS):
+
+    def _coeffs(self):
+        """(a3, a4, a5)."""
+        raise NotImplementedError
+
+    def _coeff_jacobian(self):
+        """{param: (da3, da4, da5)} for params other than E0 and V0."""
+        raise NotImplementedError
+
+    def _strain(self, V):
+        f = 0.5 * ((self.V0 / V)**(2.0 / 3.0) - 1.0)
+        return f, 1.0 + 2.0 * f
+
+    def _series(self, f):
+        """S(f) and its first three derivatives."""
+        a3, a4, a5 = self._coeffs()
+        S = f**2 + a3 * f**3 + a4 * f**4 + a5 * f**5
+        S1 = 2 * f + 3 * a3 * f**2 + 4 * a4 * f**3 + 5 * a5 * f**4
+        S2 = 2 + 6 * a3 * f + 12 * a4 * f**2 + 20 * a5 * f**3
+        S3 = 6 * a3 + 24 * a4 * f + 60 * a5 * f**2
+        return S, S1, S2, S3
+
+    def energy(self, V):
+        f, _ = self._strain(V)
+        S = self._series(f)[0]
+        return self.E0 + 4.5 * self.V0 * self.B0 * S
+
+    def pressure(self, V):
+        f, g = self._strain(V)
+        S1 = self._series(f)[1]
+        return 1.5 * self.B0 * g**2.5 * S1
+
+    def bulk_modulus(self, V):
+        f, g = self._strain(V)
+        _, S1, S2, _ = self._series(f)
+        return 0.5 * self.B0 * g**2.5 * (5 * S1 + g * S2)
+
+    def dBdP(self, V):
+        f, g = self._strain(V)
+        _, S1, S2, S3 = self._series(f)
+        return (25 * S1 + 12 * g * S2 + g**2 * S3) / (3 * (5 * S1 + g * S2))
+
+    def jacobian(self, V):
+        f, g = self._strain(V)
+        S, S1, _, _ = self._series(f)
+        pref = 4.5 * self.V0 * self.B0
+        powers = (f**3, f**4, f**5)
+
+        cols = {
+            "E0": np.ones_like(f),
+            "V0": 4.5 * self.B0 * S + 1.5 * self.B0 * g * S1,
+        }
+        for p, da in self._coeff_jacobian().items():
+            col = pref * sum(d * fk for d, fk in zip(da, powers))
+            if p == "B0":
+                col = col + 4.5 * self.V0 * S
+            cols[p] = col
+        return _stack(*[cols[p] for p in self.param_names])
+
+
+class BirchMurnaghan2(_BirchMurnaghan):
+    """2nd order, B0' fixed at 4."""
+
+    name = "bm2"
+    param_names = ("E0", "V0", "B0")
+
+    def _coeffs(self):
+        return 0.0, 0.0, 0.0
+
+    def _coeff_jacobian(self):
+        return {"B0": (0.0, 0.0, 0.0)}
+
+
+class BirchMurnaghan3(_BirchMurnaghan):
+    name = "bm3"
+    param_names = ("E0", "V0", "B0", "B0p")
+
+    def _coeffs(self):
+        return self.B0p - 4.0, 0.0, 0.0
+
+    def _coeff_jacobian(self):
+        return {"B0": (0.0, 0.0, 0.0), "B0p": (1.0, 0.0, 0.0)}
+
+
+class BirchMurnaghan4(_BirchMurnaghan):
+    name = "bm4"
+    param_names = ("E0", "V0", "B0", "B0p", "B0pp")
+
+    def _coeffs(self):
+        B0, Bp, Bpp = self.B0, self.B0p, self.B0pp
+        a4 = 0.75 * (B0 * Bpp + Bp * (Bp - 7.0) + 143.0 / 9.0)
+        return Bp - 4.0, a4, 0.0
+
+    def _coeff_jacobian(self):
+        B0, Bp, Bpp = self.B0, self.B0p, self.B0pp
+        return {
+            "B0": (0.0, 0.75 * Bpp, 0.0),
+            "B0p": (1.0, 1.5 * Bp - 5.25, 0.0),
+            "B0pp": (0.0, 0.75 * B0, 0.0),
+        }
+
+
+class BirchMurnaghan5(_BirchMurnaghan):
+    name = "bm5"
+    param_names = ("E0", "V0", "B0", "B0p", "B0pp", "B0ppp")
+
+    def _coeffs(self):
+        B0, Bp, Bpp, Bppp = self.B0, self.B0p, self.B0pp, self.B0ppp
+        a4 = 0.75 * (B0 * Bpp + Bp * (Bp - 7.0) + 143.0 / 9.0)
+        a5 = (9.0 / 20.0 * B0**2 * Bppp + 9.0 / 5.0 * B0 * Bp * Bpp
+              - 24.0 / 5.0 * B0 * Bpp + 9.0 / 20.0 * Bp**3
+              - 24.0 / 5.0 * Bp**2 + 187.0 / 10.0 * Bp - 472.0 / 15.0)
+        return Bp - 4.0, a4, a5
+
+    def _coeff_jacobian(self):
+        B0, Bp, Bpp, Bppp = self.B0, self.B0p, self.B0pp, self.B0ppp
+        return {
+            "B0": (0.0, 0.75 * Bpp,
+                   0.9 * B0 * Bppp + 1.8 * Bp * Bpp - 4.8 * Bpp),
+            "B0p": (1.0, 1.5 * Bp - 5.25,
+                    1.8 * B0 * Bpp + 1.35 * Bp**2 - 9.6 * Bp + 18.7),
+            "B0pp": (0.0, 0.75 * B0, 1.8 * B0 * Bp - 4.8 * B0),
+            "B0ppp": (0.0, 0.0, 0.45 * B0**2),
+        }
 
-def birch_murnaghan_energy_3rd(V, V0, B0, B0p, E0):
-    """
-    3rd-order Birch–Murnaghan EOS energy.
-    """
-    x = _eta(V, V0) - 1.0
-    pref = (9.0 * V0 * B0) / 16.0
-    return E0 + pref * (x**3 * B0p + x**2 * (6 - 4*_eta(V, V0)))
 
+# ===============================
+# SJEOS (Stabilized Jellium)
+# ===============================
 
-def birch_murnaghan_pressure_3rd(V, V0, B0, B0p):
+class SJEOS(EOS):
     """
-    3rd-order Birch–Murnaghan EOS pressure.
+    E = a + b t + c t^2 + d t^3 with t = V^(-1/3), the form fitted by
+    ase.eos ("sjeos"). Linear in its parameters.
     """
-    e = _eta(V, V0)
-    return (3.0/2.0)*B0*(e**(7.0/2.0) - e**(5.0/2.0)) * \
-           (1 + (3.0/4.0)*(B0p - 4.0)*(e - 1.0))
 
+    name = "sjeos"
+    param_names = ("a", "b", "c", "d")
+
+    def energy(self, V):
+        t = V**(-1.0 / 3.0)
+        return self.a + self.b * t + self.c * t**2 + self.d * t**3
+
+    def pressure(self, V):
+        t = V**(-1.0 / 3.0)
+        return t**4 * (self.b + 2 * self.c * t + 3 * self.d * t**2) / 3.0
+
+    def bulk_modulus(self, V):
+        t = V**(-1.0 / 3.0)
+        return t**4 * (4 * self.b + 10 * self.c * t + 18 * self.d * t**2) / 9.0
+
+    def dBdP(self, V):
+        t = V**(-1.0 / 3.0)
+        return ((16 * self.b + 50 * self.c * t + 108 * self.d * t**2)
+                / (3 * (4 * self.b + 10 * self.c * t + 18 * self.d * t**2)))
+
+    def jacobian(self, V):
+        t = V**(-1.0 / 3.0) + 0.0 * self.a
+        return _stack(np.ones_like(t), t, t**2, t**3)
+
+
+MODELS = {
+    cls.name: cls
+    for cls in (
+        Murnaghan,
+        BirchMurnaghan2,
+        BirchMurnaghan3,
+        BirchMurnaghan4,
+        BirchMurnaghan5,
+        SJEOS,
+    )
+}
 
 
 # ===============================
-# 2nd-order Birch–Murnaghan
+# Function interface
 # ===============================
+#
+# Kept for eval.py / plot.py; these evaluate the classes above.
+
+def murnaghan_energy(V, V0, B0, B0p, E0):
+    """
+    Murnaghan EOS energy.
+    """
+    return Murnaghan(E0, V0, B0, B0p).energy(V)
+
+
+def murnaghan_pressure(V, V0, B0, B0p):
+    """
+    Murnaghan EOS pressure.
+    """
+    return Murnaghan(0.0, V0, B0, B0p).pressure(V)
+
 
 def birch_murnaghan_energy_2nd(V, V0, B0, E0):
     """
     2nd-order Birch–Murnaghan (B0' fixed = 4)
     """
-    return birch_murnaghan_energy_3rd(V, V0, B0, B0p=4.0, E0=E0)
+    return BirchMurnaghan2(E0, V0, B0).energy(V)
 
 
 def birch_murnaghan_pressure_2nd(V, V0, B0):
     """
     2nd-order BM pressure.
     """
-    return birch_murnaghan_pressure_3rd(V, V0, B0, B0p=4.0)
+    return BirchMurnaghan2(0.0, V0, B0).pressure(V)
+
+
+def birch_murnaghan_energy_3rd(V, V0, B0, B0p, E0):
+    """
+    3rd-order Birch–Murnaghan EOS energy.
+    """
+    return BirchMurnaghan3(E0, V0, B0, B0p).energy(V)
 
 
+def birch_murnaghan_pressure_3rd(V, V0, B0, B0p):
+    """
+    3rd-order Birch–Murnaghan EOS pressure.
+    """
+    return BirchMurnaghan3(0.0, V0, B0, B0p).pressure(V)
 
-# ===============================
-# 4th-order Birch–Murnaghan
-# ===============================
 
 def birch_murnaghan_energy_4th(V, V0, B0, B0p, B0pp, E0):
     """
     4th-order BM EOS energy.
-    Based on Taylor expansion of finite strain.
     """
-    f = 0.5 * (_eta(V, V0) - 1.0)
-
-    return E0 + (9.0 * V0 * B0 / 2.0) * (
-        f**2 +
-        (B0p - 4.0)/3.0 * f**3 +
-        ( (B0pp + B0p*(B0p-7.0) + 143.0/9.0) / 8.0 ) * f**4
-    )
+    return BirchMurnaghan4(E0, V0, B0, B0p, B0pp).energy(V)
 
 
 def birch_murnaghan_pressure_4th(V, V0, B0, B0p, B0pp):
     """
     4th-order BM pressure.
     """
-    f = 0.5 * (_eta(V, V0) - 1.0)
-    return 3*B0*f*(1+2*f)**(5.0/2.0) * (
-        1 + (B0p-4)*f + (5/2)*(B0pp + B0p*(B0p-7) + 143/9)*f**2/3
-    )
-
-
+    return BirchMurnaghan4(0.0, V0, B0, B0p, B0pp).pressure(V)
 
-# ===============================
-# 5th-order Birch–Murnaghan
-# ===============================
 
 def birch_murnaghan_energy_5th(V, V0, B0, B0p, B0pp, B0ppp, E0):
     """
     5th-order BM EOS energy.
     """
-    f = 0.5 * (_eta(V, V0) - 1.0)
-
-    return E0 + (9.0*V0*B0/2.0) * (
-        f**2
-        + (B0p-4)/3.0 * f**3
-        + ( (B0pp + B0p*(B0p-7) + 143/9)/8.0 ) * f**4
-        + (B0ppp/48.0)*f**5
-    )
+    return BirchMurnaghan5(E0, V0, B0, B0p, B0pp, B0ppp).energy(V)
 
 
 def birch_murnaghan_pressure_5th(V, V0, B0, B0p, B0pp, B0ppp):
     """
     5th-order BM pressure.
     """
-    f = 0.5 * (_eta(V, V0) - 1.0)
-
-    return 3*B0*f*(1+2*f)**(5.0/2.0) * (
-        1
-        + (B0p-4)*f
-        + (5/2)*(B0pp + B0p*(B0p-7) + 143/9)/3.0 * f**2
-        + (5/3)*B0ppp*f**3
-    )
-
+    return BirchMurnaghan5(0.0, V0, B0, B0p, B0pp, B0ppp).pressure(V)
 
 
-# ===============================
-# SJEOS (Stabilized Jellium)
-# ===============================
-
 def sjeos_energy(V, a, b, c, d):
     """
     Stabilized Jellium EOS energy.
     Parameters are fit coefficients.
     """
-    return (
-        a/V**2 +
-        b/V**(4/3) +
-        c/V**(2/3) +
-        d
-    )
+    return SJEOS(a, b, c, d).energy(V)
 
 
 def sjeos_pressure(V, a, b, c, d):
     """
     SJEOS pressure = −dE/dV
     """
-    return -(
-        -2*a/V**3
-        - (4/3)*b/V**(7/3)
-        - (2/3)*c/V**(5/3)
-    )
-
+    return SJEOS(a, b, c, d).pressure(V)
 
 
 # ===============================
@@ -180,4 +403,3 @@ def birch_energy(V, V0, a0, a1, a2, a3, E0):
         a2*f**3 +
         a3*f**4
     )
-
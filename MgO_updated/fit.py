@@ -0,0 +1,344 @@
+import numpy as np
+
+from eos import MODELS, SJEOS, _BirchMurnaghan
+
+
+# 1 eV/Å^3 in GPa
+GPA_PER_EV_A3 = 160.21766208
+
+
+# ===============================
+# Helpers
+# ===============================
+
+def _as_batch(V, E, weights):
+    """
+    Promote to (n_datasets, n_volumes) arrays. NaN energies mark missing
+    points (ragged datasets) and get zero weight.
+    """
+    V = np.atleast_2d(np.asarray(V, dtype=float))
+    E = np.atleast_2d(np.asarray(E, dtype=float))
+    V, E = np.broadcast_arrays(V, E)
+
+    w = np.ones_like(E) if weights is None else np.broadcast_to(
+        np.atleast_2d(np.asarray(weights, dtype=float)), E.shape
+    ).copy()
+    missing = ~np.isfinite(E) | ~np.isfinite(V)
+    w[missing] = 0.0
+
+    V = np.where(missing, 1.0, V)
+    E = np.where(missing, 0.0, E)
+    return V, E, w
+
+
+def _solve(A, b):
+    """Batched solve that tolerates singular systems."""
+    try:
+        return np.linalg.solve(A, b[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return np.einsum("...ij,...j->...i", np.linalg.pinv(A), b)
+
+
+# ===============================
+# Initial guess
+# ===============================
+
+def initial_guess(V, E, weights=None):
+    """
+    E0, V0, B0 (eV/Å^3) and B0' from a cubic fit of E against V^(-2/3),
+    the same starting point ase.eos uses. Vectorized over datasets.
+    """
+    V, E, w = _as_batch(V, E, weights)
+    x = V**(-2.0 / 3.0)
+
+    A = np.stack([np.ones_like(x), x, x**2, x**3], axis=-1)
+    Aw = A * w[..., None]
+    c = _solve(np.einsum("mni,mnj->mij", Aw, A), np.einsum("mni,mn->mi", Aw, E))
+
+    # dE/dx = c1 + 2 c2 x + 3 c3 x^2 = 0, keep the root with E_xx > 0
+    c0, c1, c2, c3 = c.T
+    disc = np.sqrt(np.maximum(4 * c2**2 - 12 * c1 * c3, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roots = np.stack([(-2 * c2 + disc) / (6 * c3),
+                          (-2 * c2 - disc) / (6 * c3)])
+        curv = 2 * c2 + 6 * c3 * roots
+        x0 = np.where(curv[0] > 0, roots[0], roots[1])
+
+    # fall back to the lowest sampled point if the cubic has no minimum
+    Emask = np.where(w > 0, E, np.inf)
+    i_min = np.argmin(Emask, axis=1)
+    Vmin = V[np.arange(len(V)), i_min]
+    bad = ~np.isfinite(x0) | (x0 <= 0)
+    x0 = np.where(bad, Vmin**(-2.0 / 3.0), x0)
+
+    V0 = x0**(-1.5)
+    E0 = c0 + c1 * x0 + c2 * x0**2 + c3 * x0**3
+    Exx = 2 * c2 + 6 * c3 * x0
+    B0 = V0 * Exx * (4.0 / 9.0) * V0**(-10.0 / 3.0)
+    B0 = np.where(np.isfinite(B0) & (B0 > 0), B0, 0.5)
+
+    return {"E0": E0, "V0": V0, "B0": B0, "B0p": np.full_like(V0, 4.0)}
+
+
+def guess_params(name, guess):
+    """Starting parameter array (n_datasets, n_params) for model `name`."""
+    g = dict(guess)
+    B0, Bp = g["B0"], g["B0p"]
+
+    # B0'' implied by BM3 (a4 = 0), B0''' implied by BM4 (a5 = 0)
+    g.setdefault("B0pp", -(Bp * (Bp - 7.0) + 143.0 / 9.0) / B0)
+    if "B0ppp" not in g:
+        Bpp = g["B0pp"]
+        a5 = (9.0 / 5.0 * B0 * Bp * Bpp - 24.0 / 5.0 * B0 * Bpp
+              + 9.0 / 20.0 * Bp**3 - 24.0 / 5.0 * Bp**2
+              + 187.0 / 10.0 * Bp - 472.0 / 15.0)
+        g["B0ppp"] = -a5 / (9.0 / 20.0 * B0**2)
+
+    cls = MODELS[name]
+    return np.stack([np.asarray(g[p], dtype=float) for p in cls.param_names],
+                    axis=-1)
+
+
+# ===============================
+# Least squares
+# ===============================
+
+def _linear_fit(cls, V, E, w):
+    J = cls(*np.zeros(len(cls.param_names))).jacobian(V)
+    Jw = J * w[..., None]
+    A = np.einsum("mni,mnj->mij", Jw, J)
+    return _solve(A, np.einsum("mni,mn->mi", Jw, E))
+
+
+def _bm_start(cls, V, E, w, p, factors=np.linspace(0.85, 1.15, 61)):
+    """
+    Starting point for a Birch–Murnaghan fit. At fixed V0 the energy
+    E0 + C2 f^2 + ... + Ck f^k is linear in its coefficients, so each
+    trial V0 around p's costs one linear solve; the best one is mapped
+    back to (E0, V0, B0, B0', ...). Kept per dataset only where it
+    beats p. Without it LM crawls along the flat, correlated B0pp, B0ppp
+    directions of bm4/bm5.
+    """
+    k = len(cls.param_names) - 1
+    V0 = p[:, 1:2] * factors                                          # (m, K)
+    f = 0.5 * ((V0[:, :, None] / V[:, None, :])**(2.0 / 3.0) - 1.0)
+    A = np.stack([np.ones_like(f)] + [f**j for j in range(2, k + 1)], axis=-1)
+    Aw = A * w[:, None, :, None]
+    c = _solve(np.einsum("mkni,mknj->mkij", Aw, A),
+               np.einsum("mkni,mn->mki", Aw, E))
+    r = np.einsum("mkni,mki->mkn", A, c) - E[:, None, :]
+    cost = np.sum(w[:, None, :] * r**2, axis=-1)
+    cost = np.where(np.isfinite(cost), cost, np.inf)
+    best = np.argmin(cost, axis=1)
+    rows = np.arange(len(p))
+    V0, c, cost = V0[rows, best], c[rows, best], cost[rows, best]
+
+    # invert the coefficients of eos._BirchMurnaghan
+    with np.errstate(all="ignore"):
+        B0 = c[:, 1] / (4.5 * V0)
+        a = c[:, 2:] / c[:, 1:2]
+        g = {"E0": c[:, 0], "V0": V0, "B0": B0}
+        if k >= 3:
+            Bp = g["B0p"] = a[:, 0] + 4.0
+        if k >= 4:
+            Bpp = g["B0pp"] = (a[:, 1] / 0.75 - Bp * (Bp - 7.0) - 143.0 / 9.0) / B0
+        if k >= 5:
+            rest = (9.0 / 5.0 * B0 * Bp * Bpp - 24.0 / 5.0 * B0 * Bpp
+                    + 9.0 / 20.0 * Bp**3 - 24.0 / 5.0 * Bp**2
+                    + 187.0 / 10.0 * Bp - 472.0 / 15.0)
+            g["B0ppp"] = (a[:, 2] - rest) / (9.0 / 20.0 * B0**2)
+        p_new = np.stack([g[name] for name in cls.param_names], axis=-1)
+        r_old = cls.from_array(p[:, None, :]).energy(V) - E
+    cost_old = np.sum(w * r_old**2, axis=1)
+
+    better = np.isfinite(p_new).all(axis=1) & (B0 > 0) & ~(cost_old <= cost)
+    return np.where(better[:, None], p_new, p)
+
+
+def _levenberg_marquardt(cls, V, E, w, p, max_iter, tol, xtol):
+    """
+    Batched Levenberg–Marquardt: every dataset takes its own damped
+    Gauss–Newton step each iteration, using the analytic Jacobian.
+
+    A dataset converges when an accepted step changes the cost by less
+    than `tol` relative, or any step is below `xtol` relative to the
+    parameters. It fails (stops, not converged) when the damping blows
+    up without either, or when the start already overflows. Returns (p, cost, J, n_iter, converged).
+    """
+    sw = np.sqrt(w)
+
+    def residuals(p):
+        with np.errstate(all="ignore"):
+            r = (cls.from_array(p[:, None, :]).energy(V) - E) * sw
+            cost = np.sum(r**2, axis=1)
+        return r, np.where(np.isfinite(cost), cost, np.inf)
+
+    r, cost = residuals(p)
+    lam = np.full(len(p), 1e-3)
+    converged = np.zeros(len(p), dtype=bool)
+    # a start whose energies overflow has nowhere to go
+    failed = ~np.isfinite(cost)
+    n_iter = np.zeros(len(p), dtype=int)
+
+    for _ in range(max_iter):
+        active = ~(converged | failed)
+        if not active.any():
+            break
+
+        with np.errstate(all="ignore"):
+            J = cls.from_array(p[:, None, :]).jacobian(V) * sw[..., None]
+            A = np.einsum("mni,mnj->mij", J, J)
+            g = np.einsum("mni,mn->mi", J, r)
+            D = np.einsum("mii->mi", A)
+            step = _solve(A + lam[:, None, None] * D[:, :, None] * np.eye(p.shape[1]),
+                          -g)
+        step[~active] = 0.0
+        p_new = p + step
+        r_new, cost_new = residuals(p_new)
+
+        accept = active & np.isfinite(cost_new) & (cost_new <= cost)
+        with np.errstate(invalid="ignore"):
+            rel = np.abs(cost - cost_new) / np.maximum(cost, 1e-300)
+            small = np.max(np.abs(step) / np.maximum(np.abs(p), 1e-12), axis=1)
+
+        p[accept] = p_new[accept]
+        r[accept] = r_new[accept]
+        cost = np.where(accept, cost_new, cost)
+        lam = np.where(accept, lam / 10.0, np.where(active, lam * 10.0, lam))
+        n_iter[active] += 1
+
+        converged |= active & ((accept & (rel < tol)) | (small < xtol))
+        failed |= active & ~converged & (lam > 1e12)
+
+    with np.errstate(all="ignore"):
+        J = cls.from_array(p[:, None, :]).jacobian(V) * sw[..., None]
+    return p, cost, J, n_iter, converged
+
+
+def fit(name, V, E, p0=None, weights=None, max_iter=500, tol=1e-10, xtol=1e-8):
+    """
+    Least-squares fit of EOS `name` to E(V).
+
+    `tol` is the relative cost change and `xtol` the relative step size
+    at which a fit counts as converged.
+
+    V and E may be 1D (one dataset) or 2D (n_datasets, n_volumes); all
+    datasets are fitted together. Returns (eos, info) where eos holds the
+    fitted parameters (B0 in eV/Å^3) and info has the residual rms,
+    parameter covariance, iteration count and convergence flag.
+    """
+    single = np.ndim(E) == 1
+    cls = MODELS[name]
+    V, E, w = _as_batch(V, E, weights)
+
+    if issubclass(cls, SJEOS):
+        p = _linear_fit(cls, V, E, w)
+        p, cost, J, n_iter, done = _levenberg_marquardt(cls, V, E, w, p, 1, tol, xtol)
+        done[:] = True
+    else:
+        if p0 is None:
+            p0 = guess_params(name, initial_guess(V, E, w))
+        p = np.array(np.broadcast_to(p0, (len(V), len(cls.param_names))),
+                     dtype=float)
+        if issubclass(cls, _BirchMurnaghan):
+            p = _bm_start(cls, V, E, w, p)
+        p, cost, J, n_iter, done = _levenberg_marquardt(
+            cls, V, E, w, p, max_iter, tol, xtol
+        )
+
+    # a diverged fit (non-finite parameters) has no covariance
+    ok = (np.isfinite(p).all(axis=1) & np.isfinite(J).all(axis=(1, 2))
+          & np.isfinite(cost))
+    done = done & ok
+
+    n = np.sum(w > 0, axis=1)
+    k = p.shape[1]
+    dof = np.maximum(n - k, 1)
+    cov = np.full((len(p), k, k), np.nan)
+    if ok.any():
+        A = np.einsum("mni,mnj->mij", J[ok], J[ok])
+        cov[ok] = np.linalg.pinv(A) * (cost[ok] / dof[ok])[:, None, None]
+
+    info = {
+        "rms": np.sqrt(cost / np.maximum(n, 1)),
+        "cov": cov,
+        "n_iter": n_iter,
+        "converged": done,
+    }
+    if single:
+        p = p[0]
+        info = {key: val[0] for key, val in info.items()}
+    return cls.from_array(p), info
+
+
+# model -> the model whose fit it starts from in fit_models
+WARM_START = {"bm3": "bm2", "bm4": "bm3", "bm5": "bm4", "murnaghan": "bm3"}
+WARM_START_ORDER = ["bm2", "bm3", "bm4", "bm5", "murnaghan"]
+
+
+def fit_models(V, E, models=("bm2", "bm3", "bm4", "bm5", "murnaghan", "sjeos"),
+               weights=None, **kwargs):
+    """
+    Fit several EOS models to the same data. The initial guess is computed
+    once and shared; each Birch–Murnaghan order starts from the previous
+    order's solution where that fit converged (from the shared guess
+    elsewhere), whatever order `models` lists them in. Returns
+    {name: (eos, info)} in the order of `models`.
+    """
+    guess = initial_guess(V, E, weights)
+    rank = {m: i for i, m in enumerate(WARM_START_ORDER)}
+    out = {}
+    for name in sorted(models, key=lambda m: rank.get(m, len(rank))):
+        p0 = None
+        if name != "sjeos":
+            p0 = guess_params(name, guess)
+            prev = WARM_START.get(name)
+            if prev in out:
+                eos, info = out[prev]
+                g = dict(guess)
+                g.update({p: np.ravel(getattr(eos, p)) for p in eos.param_names})
+                warm = guess_params(name, g)
+                use = np.ravel(info["converged"]) & np.isfinite(warm).all(axis=1)
+                p0 = np.where(use[:, None], warm, p0)
+        out[name] = fit(name, V, E, p0=p0, weights=weights, **kwargs)
+    return {name: out[name] for name in models}
+
+
+# ===============================
+# Reporting
+# ===============================
+
+def sjeos_minimum(eos):
+    """V0, E0 and B0 of a fitted SJEOS from its coefficients."""
+    # dE/dt = b + 2 c t + 3 d t^2 = 0, minimum has d2E/dt2 > 0
+    b, c, d = eos.b, eos.c, eos.d
+    disc = np.sqrt(np.maximum(c**2 - 3 * b * d, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (-c + disc) / (3 * d)
+        t2 = (-c - disc) / (3 * d)
+    t0 = np.where(2 * c + 6 * d * t1 > 0, t1, t2)
+    V0 = t0**-3.0
+    return V0, eos.energy(V0), eos.bulk_modulus(V0)
+
+
+def summarize(eos):
+    """v0, e0, B0 in GPa and higher derivatives of a fitted EOS."""
+    if isinstance(eos, SJEOS):
+        v0, e0, B0 = sjeos_minimum(eos)
+        Bp = eos.dBdP(v0)
+    else:
+        v0, e0, B0 = eos.V0, eos.E0, eos.B0
+        Bp = getattr(eos, "B0p", np.full_like(B0, 4.0))
+
+    row = {
+        "v0": v0,
+        "e0": e0,
+        "Bulk_Modulus_GPa": B0 * GPA_PER_EV_A3,
+        "B0p": Bp,
+    }
+    if hasattr(eos, "B0pp"):
+        row["B0pp_per_GPa"] = eos.B0pp / GPA_PER_EV_A3
+    if hasattr(eos, "B0ppp"):
+        row["B0ppp_per_GPa2"] = eos.B0ppp / GPA_PER_EV_A3**2
+    # 0-d arrays from a single fit become plain scalars
+    return {k: np.asarray(v)[()] for k, v in row.items()}
@@ -39,3 +39,42 @@ def log_likelihood_gaussian(
 
     return logL
 
+
+
+# ===============================
+# Vectorized forms
+# ===============================
+#
+# All of these take chi2-like sums S = sum(residual^2) and point
+# counts N as arrays, so any number of (calculator, EOS, reference)
+# combinations are scored at once.
+
+def log_likelihood_gaussian_sum(S, N, sigma):
+    """
+    Same as log_likelihood_gaussian, from the summed squared
+    residuals S. S, N and sigma broadcast against each other.
+    """
+    return -0.5 * S / sigma**2 - N * np.log(sigma * np.sqrt(2.0 * np.pi))
+
+
+def profile_log_likelihood(S, N):
+    """
+    Gaussian log-likelihood maximized over sigma, at
+    sigma_hat^2 = S / N:
+
+        logL = -N/2 * (1 + log(2 pi S / N))
+    """
+    return -0.5 * N * (1.0 + np.log(2.0 * np.pi * S / N))
+
+
+def marginal_log_likelihood(S, N):
+    """
+    Gaussian likelihood integrated over sigma with the scale-invariant
+    prior p(sigma) ~ 1/sigma:
+
+        log Z = -N/2 log(2 pi) + log Gamma(N/2) - log 2 - N/2 log(S/2)
+    """
+    from scipy.special import gammaln
+
+    return (-0.5 * N * np.log(2.0 * np.pi) + gammaln(0.5 * N)
+            - np.log(2.0) - 0.5 * N * np.log(0.5 * S))
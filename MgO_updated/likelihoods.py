@@ -1,77 +1,50 @@
-import pandas as pd
+import sys
 import numpy as np
 
-from likelihood import log_likelihood_gaussian
-from eval import evaluate_eos
+from references import ReferenceStore
+from results import eos_outputs
+from scoring import score_files_store, ranking
 
 
-mlip_calculation = "out/chgnet.csv"
-reference_file = "mgo.csv"
-
-# NOTE: 0.02 eV (20 meV) is a reasonable starting value.
-# You can tighten later if needed.
-sigma = 2e-2   # eV
-
-model = "bm3"  # here choose a model for EoS from evaluate_eos: currently bm2, bm3, murnaghan
-
-
-df = pd.read_csv(mlip_calculation)
-
-# get Birch–Murnaghan fit parameters
-bm = df[(df["Type"] == "EOS") & (df["Model"] == "birchmurnaghan")].iloc[0]
-GPA_TO_EV_A3 = 6.241509e-3
-params = dict(
-    V0=bm["v0"],
-    B0=bm["Bulk_Modulus_GPa"] * GPA_TO_EV_A3, # this converts GPa to E/A3
-    B0p=4.0,
-    E0=bm["e0"],
-)
-
-
-# === define model volume grid (range around V0) ===
-V_model = np.linspace(bm["v0"] * 0.9, bm["v0"] * 1.1, 400)
-
-# evaluate model EOS energy
-E_model = evaluate_eos(model, V_model, params)
+# all calculator outputs in out/ unless files are given on the command line;
+# the other calculate.py modes' outputs are not MgO E-V scans
+mlip_calculations = sys.argv[1:] or eos_outputs("out")
 
+# every MgO reference in references.csv, evaluated on the calculators' volumes
+store = ReferenceStore.load()
+material = "MgO"
 
+# NOTE: 0.02 eV (20 meV) is a reasonable starting value.
+# The profiled / marginal scores below do not depend on it.
+sigmas = np.array([5e-3, 1e-2, 2e-2, 5e-2])   # eV
 
-# === load reference EOS data ===
-df_ref = pd.read_csv(reference_file)
-
-V_ref = df_ref["Volume"].values
-E_ref = df_ref["Energy"].values
-
-
-print("Before normalization:")
-print("Model energy   min/max =", np.min(E_model), np.max(E_model))
-print("Reference      min/max =", np.min(E_ref), np.max(E_ref))
-
-# === NORMALIZE ENERGIES TO THEIR MINIMA ===
-# This removes arbitrary energy offsets and ensures
-# likelihood measures EOS shape differences only.
-E_model = E_model - np.min(E_model)
-E_ref   = E_ref   - np.min(E_ref)
-
+models = ["murnaghan", "bm2", "bm3", "bm4", "bm5", "sjeos"]
 
-print("After normalization:")
-print("Model energy   min/max =", np.min(E_model), np.max(E_model))
-print("Reference      min/max =", np.min(E_ref), np.max(E_ref))
 
-# === compute log-likelihood ===
-logL = log_likelihood_gaussian(
-    V_ref,
-    E_ref,
-    V_model,
-    E_model,
-    sigma=sigma
+# one call: every calculator x EOS model x sigma x reference
+scores = score_files_store(
+    mlip_calculations,
+    store,
+    material=material,
+    models=models,
+    sigmas=sigmas,
 )
 
-
-
-print(f"MLIP file: {mlip_calculation}")
-print(f"Reference: {reference_file}")
-print(f"EOS model: {model}")
-print(f"Assumed sigma: {sigma} eV")
-print(f"Log-likelihood: {logL:.6f}")
-
+print(f"MLIP files: {', '.join(scores['calculators'])}")
+print(f"References: {', '.join(scores['references'])}")
+print(f"Sigmas: {sigmas} eV")
+print()
+
+# log-likelihood at each sigma, BM3, first reference
+m = models.index("bm3")
+print("Log-likelihood (bm3) per sigma:")
+for i, name in enumerate(scores["calculators"]):
+    vals = "  ".join(f"{x:14.3f}" for x in scores["logL"][i, m, :, 0])
+    print(f"  {name:<10s} {vals}")
+print()
+
+# sigma integrated out, per EOS model
+for model in models:
+    print(f"Ranking, EOS model {model} (sigma marginalized):")
+    print(ranking(scores, "logL_marginal", model=model).to_string(index=False))
+    print()
@@ -0,0 +1,260 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+from references import ReferenceStore
+from results import read_table, results_name, eos_outputs
+
+
+QUANTITIES = {
+    # quantity: (raw column, unit)
+    "energy": ("Energy", "eV"),
+    "pressure": ("Pressure", "GPa"),
+}
+
+
+# ===============================
+# Streaming accumulator
+# ===============================
+
+class Metrics:
+    """
+    MAE, RMSE, max error and bias of pred - ref, accumulated chunk by
+    chunk so the data never has to be in memory at once.
+
+    `shape` is the leading shape of the accumulators, e.g.
+    (n_calculators, n_references); each update() adds residuals of
+    shape shape[at] + (n_points,). NaNs (missing points) are skipped.
+    With `bins`, residuals are also binned by `x` (e.g. volume) into a
+    per-bin profile of count, mean and rms.
+    """
+
+    def __init__(self, shape=(), bins=None):
+        self.shape = tuple(int(s) for s in np.atleast_1d(shape))
+        self.n = np.zeros(self.shape, dtype=np.int64)
+        self.seen = np.zeros(self.shape, dtype=np.int64)
+        self.sum = np.zeros(self.shape)
+        self.sum_abs = np.zeros(self.shape)
+        self.sum_sq = np.zeros(self.shape)
+        self.max_abs = np.full(self.shape, -np.inf)
+        self.argmax = np.full(self.shape, -1, dtype=np.int64)
+
+        self.bins = None if bins is None else np.asarray(bins, dtype=float)
+        nb = 0 if bins is None else len(self.bins) - 1
+        self.p_n = np.zeros(self.shape + (nb,), dtype=np.int64)
+        self.p_sum = np.zeros(self.shape + (nb,))
+        self.p_sq = np.zeros(self.shape + (nb,))
+
+    def _flat(self, at):
+        return np.arange(self.n.size).reshape(self.shape)[at].ravel()
+
+    def update(self, pred, ref, x=None, at=()):
+        """Add one chunk of predictions against references."""
+        idx = self._flat(at)
+        r = np.asarray(pred, dtype=float) - np.asarray(ref, dtype=float)
+        r = np.broadcast_to(r, self.n[at].shape + r.shape[-1:]).reshape(len(idx), -1)
+        ok = np.isfinite(r)
+        a = np.where(ok, np.abs(r), 0.0)
+
+        n, seen = self.n.reshape(-1), self.seen.reshape(-1)
+        n[idx] += ok.sum(axis=1)
+        self.sum.reshape(-1)[idx] += np.where(ok, r, 0.0).sum(axis=1)
+        self.sum_abs.reshape(-1)[idx] += a.sum(axis=1)
+        self.sum_sq.reshape(-1)[idx] += (a**2).sum(axis=1)
+
+        j = a.argmax(axis=1)
+        worst = np.where(ok.any(axis=1), a[np.arange(len(idx)), j], -np.inf)
+        max_abs, argmax = self.max_abs.reshape(-1), self.argmax.reshape(-1)
+        better = worst > max_abs[idx]
+        max_abs[idx[better]] = worst[better]
+        argmax[idx[better]] = seen[idx[better]] + j[better]
+        seen[idx] += r.shape[1]
+
+        if self.bins is not None and x is not None:
+            self._bin(idx, r, ok, np.broadcast_to(x, r.shape))
+
+    def _bin(self, idx, r, ok, x):
+        nb = len(self.bins) - 1
+        b = np.digitize(x, self.bins) - 1
+        valid = ok & (b >= 0) & (b < nb)
+        flat = (idx[:, None] * nb + b)[valid]
+        size = self.n.size * nb
+        self.p_n.reshape(-1)[:] += np.bincount(flat, minlength=size)
+        self.p_sum.reshape(-1)[:] += np.bincount(flat, r[valid], minlength=size)
+        self.p_sq.reshape(-1)[:] += np.bincount(flat, r[valid]**2, minlength=size)
+
+    def merge(self, other):
+        """Combine with an accumulator over other data (e.g. another worker)."""
+        better = other.max_abs > self.max_abs
+        self.max_abs = np.where(better, other.max_abs, self.max_abs)
+        self.argmax = np.where(better, self.seen + other.argmax, self.argmax)
+        for name in ("n", "seen", "sum", "sum_abs", "sum_sq", "p_n", "p_sum", "p_sq"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def result(self):
+        """{metric: array of self.shape}; argmax counts points in update order."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return {
+                "n": self.n,
+                "mae": self.sum_abs / self.n,
+                "rmse": np.sqrt(self.sum_sq / self.n),
+                "max_error": np.where(self.n > 0, self.max_abs, np.nan),
+                "bias": self.sum / self.n,
+                "argmax": self.argmax,
+            }
+
+    def profile(self):
+        """Per-bin count, mean and rms residual, shape self.shape + (n_bins,)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return {
+                "centers": 0.5 * (self.bins[1:] + self.bins[:-1]),
+                "n": self.p_n,
+                "mean": self.p_sum / self.p_n,
+                "rms": np.sqrt(self.p_sq / self.p_n),
+            }
+
+
+def chunks(*arrays, size=65536):
+    """Slices of `size` points along the last axis (works on memory-maps)."""
+    n = np.shape(arrays[0])[-1]
+    for i in range(0, n, size):
+        yield tuple(np.asarray(a[..., i:i + size]) for a in arrays)
+
+
+def stream(pred, ref, x=None, bins=None, size=65536):
+    """
+    Metrics of stacked arrays, pred (..., n_points) against ref
+    broadcastable to it, read `size` points at a time.
+    """
+    shape = np.broadcast_shapes(np.shape(pred), np.shape(ref))[:-1]
+    m = Metrics(shape, bins)
+    arrays = (pred, ref) if x is None else (pred, ref, x)
+    for chunk in chunks(*arrays, size=size):
+        m.update(*chunk)
+    return m
+
+
+# ===============================
+# Calculator outputs vs references
+# ===============================
+
+def _align(E, align):
+    """Remove the arbitrary energy zero of a curve."""
+    if align == "min":
+        return E - np.nanmin(E, axis=-1, keepdims=True)
+    if align == "mean":
+        return E - np.nanmean(E, axis=-1, keepdims=True)
+    return E
+
+
+def curve_metrics(paths, store, rows, quantities=("energy", "pressure"),
+                  bins=None, align="min", size=65536):
+    """
+    Errors of each calculator output against each selected reference,
+    at the volumes the calculator was run at.
+
+    Outputs are read one at a time (.cols memory-mapped) and streamed in
+    `size`-point chunks; the references are evaluated per chunk. Energies
+    are compared after `align` ("min": both curves relative to their
+    lowest point, "mean", or "none"); pressures need the stress column.
+    Returns ({quantity: Metrics of shape (n_paths, n_refs)}, names).
+    """
+    rows = np.atleast_1d(rows)
+    acc = {q: Metrics((len(paths), len(rows)), bins) for q in quantities}
+    names = []
+    for c, path in enumerate(paths):
+        names.append(results_name(path))
+        raw = read_table(path, "raw")
+        V = np.asarray(raw["Volume"], dtype=float)
+        for q in quantities:
+            col = QUANTITIES[q][0]
+            if col not in raw:
+                continue
+            pred = np.asarray(raw[col], dtype=float)
+            if q == "energy" and align != "none":
+                # the energy zero needs the whole curve, not a chunk
+                ref = _align(store.energies(rows, V), align)
+                acc[q].update(_align(pred, align), ref, V, at=c)
+                continue
+            for Vc, Pc in chunks(V, pred, size=size):
+                acc[q].update(Pc, store.pressures(rows, Vc) if q == "pressure"
+                              else store.energies(rows, Vc), Vc, at=c)
+    return acc, names
+
+
+def metrics_table(acc, names, references):
+    """One row per calculator x reference x quantity with data."""
+    out = []
+    for q, m in acc.items():
+        res = m.result()
+        for c, name in enumerate(names):
+            for r, ref in enumerate(references):
+                if res["n"][c, r] == 0:
+                    continue
+                out.append({
+                    "calculator": name,
+                    "reference": ref,
+                    "quantity": q,
+                    "unit": QUANTITIES[q][1],
+                    **{k: res[k][c, r] for k in ("n", "mae", "rmse", "max_error", "bias")},
+                })
+    return pd.DataFrame(out)
+
+
+def profile_table(acc, names, references):
+    """Per-volume residual profiles in long format."""
+    out = []
+    for q, m in acc.items():
+        if m.bins is None:
+            continue
+        prof = m.profile()
+        for c, name in enumerate(names):
+            for r, ref in enumerate(references):
+                keep = prof["n"][c, r] > 0
+                out.append(pd.DataFrame({
+                    "calculator": name,
+                    "reference": ref,
+                    "quantity": q,
+                    "Volume": prof["centers"][keep],
+                    "n": prof["n"][c, r][keep],
+                    "mean": prof["mean"][c, r][keep],
+                    "rms": prof["rms"][c, r][keep],
+                }))
+    return pd.concat(out, ignore_index=True) if out else pd.DataFrame()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="MAE, RMSE and max error of calculator outputs against references."
+    )
+    parser.add_argument("files", nargs="*", help="<conda>.csv or <conda>.cols (default out/*.csv)")
+    parser.add_argument("--material", default="MgO")
+    parser.add_argument("--source", default=None)
+    parser.add_argument("--method", default=None)
+    parser.add_argument("--align", default="min", choices=["min", "mean", "none"])
+    parser.add_argument("--bins", type=int, default=0,
+                        help="volume bins for the residual profile")
+    parser.add_argument("--out", default=None, help="CSV for the metrics table")
+    parser.add_argument("--profile-out", default=None, help="CSV for the residual profiles")
+    args = parser.parse_args()
+
+    files = args.files or eos_outputs("out")
+    store = ReferenceStore.load()
+    rows = store.select(args.material, args.source, args.method)
+    if len(rows) == 0:
+        raise SystemExit(f"no references for {args.material}/{args.source}/{args.method}")
+
+    bins = None
+    if args.bins:
+        V = np.concatenate([np.asarray(read_table(f, "raw", ["Volume"])["Volume"], dtype=float)
+                            for f in files])
+        bins = np.linspace(np.nanmin(V), np.nanmax(V) * (1 + 1e-12), args.bins + 1)
+
+    acc, names = curve_metrics(files, store, rows, bins=bins, align=args.align)
+    table = metrics_table(acc, names, store.names(rows))
+    print(table.to_string(index=False))
+    if args.out:
+        table.to_csv(args.out, index=False)
+    if args.profile_out and bins is not None:
+        profile_table(acc, names, store.names(rows)).to_csv(args.profile_out, index=False)
@@ -0,0 +1,216 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from ase import units
+
+from batch import batched_properties
+from eos import MODELS
+from fit import fit, GPA_PER_EV_A3
+from profiling import stage
+
+
+# hbar * sqrt(eV / (Å^2 amu)) in eV: phonon energy from a force-constant eigenvalue
+HBAR_OMEGA = units._hbar * np.sqrt(units._e / (1e-20 * units._amu)) / units._e
+
+DEFAULT_TEMPERATURES = np.arange(0.0, 1501.0, 25.0)
+
+
+# ===============================
+# Finite displacements
+# ===============================
+
+def displaced_supercells(prim, repeat=3, delta=0.01):
+    """
+    prim repeated `repeat` times along each axis, with each atom of the
+    first tile moved by +-delta Å along x, y, z: 6 * len(prim) cells,
+    ordered (atom, direction, sign).
+    """
+    sc = prim.repeat(repeat)
+    cells = []
+    for b in range(len(prim)):
+        for a in range(3):
+            for sign in (1.0, -1.0):
+                atoms = sc.copy()
+                atoms.positions[b, a] += sign * delta
+                cells.append(atoms)
+    return sc, cells
+
+
+def force_constants(forces, n_prim, delta=0.01):
+    """
+    Force constants Phi[b, a, j, c] = d^2E / du_ba du_jc from central
+    differences, for atom b of the first tile and every supercell atom j,
+    with the acoustic sum rule imposed on the self term.
+    """
+    F = np.asarray(forces, dtype=float).reshape(n_prim, 3, 2, -1, 3)
+    phi = -(F[:, :, 0] - F[:, :, 1]) / (2 * delta)
+    drift = phi.sum(axis=2)
+    for b in range(n_prim):
+        phi[b, :, b] -= drift[b]
+    return phi
+
+
+def _forces_segment(structures, conda, batch_size, max_atoms, calc=None):
+    calc = calc if calc is not None else _worker_calc
+    return batched_properties(calc, structures, conda, batch_size,
+                              properties=("forces",), max_atoms=max_atoms)["forces"]
+
+
+_worker_calc = None
+
+
+def _init_worker(calc_factory):
+    # each worker loads its model once
+    global _worker_calc
+    _worker_calc = calc_factory()
+
+
+def displaced_forces(structures, conda, calc=None, calc_factory=None, workers=1,
+                     batch_size=16, max_atoms=None):
+    """
+    Forces on every displaced supercell through batched_properties:
+    batched for the backends in batch.BATCHED_PROPERTIES, one calculator
+    call per supercell otherwise (other ASE calculators, the TorchScript
+    SevenNet export). The cost is 6 * len(prim) supercells of
+    len(prim) * repeat**3 atoms per volume either way. With workers > 1 the list is split into contiguous segments, each run
+    in a worker process with its own calculator from `calc_factory`
+    (must be picklable), as in relax.relaxed_energies.
+    """
+    if workers <= 1 or len(structures) < 2:
+        if calc is None:
+            calc = calc_factory()
+        return _forces_segment(structures, conda, batch_size, max_atoms, calc)
+
+    segments = np.array_split(np.arange(len(structures)), min(workers, len(structures)))
+    with ProcessPoolExecutor(max_workers=len(segments), initializer=_init_worker,
+                             initargs=(calc_factory,)) as pool:
+        jobs = [pool.submit(_forces_segment, [structures[i] for i in seg], conda,
+                            batch_size, max_atoms)
+                for seg in segments]
+        return [f for job in jobs for f in job.result()]
+
+
+# ===============================
+# Phonon frequencies
+# ===============================
+
+def commensurate_qpoints(repeat):
+    """The repeat^3 q-points (fractional) at which the supercell is exact."""
+    k = np.arange(repeat) / repeat
+    return np.stack(np.meshgrid(k, k, k, indexing="ij"), axis=-1).reshape(-1, 3)
+
+
+def phonon_energies(prim, phi, repeat):
+    """
+    Phonon energies hbar*omega in eV, shape (n_q, 3 * len(prim)), on the
+    commensurate q-mesh. Unstable modes come out negative
+    (-hbar*sqrt(|omega^2|)).
+    """
+    nb = len(prim)
+    tiles = repeat**3
+    # atom j of the supercell is basis atom j % nb in tile j // nb
+    shift = (prim.repeat(repeat).get_scaled_positions(wrap=False)[::nb] * repeat
+             - prim.get_scaled_positions(wrap=False)[0])
+    q = commensurate_qpoints(repeat)
+    phase = np.exp(2j * np.pi * q @ np.round(shift).T)                # (q, tiles)
+
+    phi = phi.reshape(nb, 3, tiles, nb, 3)
+    D = np.einsum("qt,batcd->qbacd", phase, phi).reshape(len(q), 3 * nb, 3 * nb)
+    m = np.repeat(prim.get_masses(), 3)
+    D = D / np.sqrt(m[:, None] * m[None, :])
+    D = 0.5 * (D + np.conj(np.swapaxes(D, 1, 2)))
+
+    w2 = np.linalg.eigvalsh(D)
+    return np.sign(w2) * np.sqrt(np.abs(w2)) * HBAR_OMEGA
+
+
+# ===============================
+# Quasi-harmonic thermodynamics
+# ===============================
+
+def vibrational_free_energy(energies, temperatures, tol=1e-4):
+    """
+    Harmonic F_vib(T) in eV per primitive cell from phonon energies
+    (..., n_q, n_modes): zero-point plus thermal part, averaged over q.
+    Modes below `tol` eV (the acoustic modes at Gamma) are left out;
+    returns (..., n_T).
+    """
+    e = np.asarray(energies, dtype=float)[..., None]
+    T = np.asarray(temperatures, dtype=float)
+    kT = units.kB * T
+    real = e > tol
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+        x = np.where(real, e, 1.0) / np.where(kT > 0, kT, 1.0)
+        thermal = np.where(kT > 0, kT * np.log1p(-np.exp(-x)), 0.0)
+    f = np.where(real, 0.5 * e + thermal, 0.0)
+    nq = e.shape[-3]
+    return f.sum(axis=(-3, -2)) / nq
+
+
+def stable(energies, tol=1e-4):
+    """False where any mode is imaginary beyond `tol` eV."""
+    return np.all(np.asarray(energies) > -tol, axis=(-2, -1))
+
+
+def quasi_harmonic(V, E_static, energies, temperatures=DEFAULT_TEMPERATURES,
+                   model="bm3", tol=1e-4):
+    """
+    F(V, T) = E_static(V) + F_vib(V, T), fitted with one batched EOS fit
+    over all temperatures. Dynamically unstable volumes are dropped; with
+    fewer stable volumes than the model has parameters nothing is fitted
+    and every curve is NaN.
+
+    Returns (F, curves): F is (n_T, n_V) in eV, curves is a dict of
+    per-temperature arrays V0, F0, B0_GPa, B0p, the volumetric thermal
+    expansion alpha (1/K), and In_range, False where V0 lies outside the
+    stable volumes sampled (an extrapolated minimum).
+    """
+    V = np.asarray(V, dtype=float)
+    T = np.asarray(temperatures, dtype=float)
+    F_vib = vibrational_free_energy(energies, T, tol)               # (V, T)
+    F = (np.asarray(E_static)[:, None] + F_vib).T                   # (T, V)
+    ok = stable(energies, tol)
+
+    nan = np.full(len(T), np.nan)
+    curves = {"Temperature": T, "V0": nan, "F0": nan, "B0_GPa": nan, "B0p": nan,
+              "alpha": nan, "rms": nan, "converged": np.zeros(len(T), dtype=bool),
+              "In_range": np.zeros(len(T), dtype=bool)}
+    if ok.sum() < len(MODELS[model].param_names):
+        return F, curves
+
+    F_fit = np.where(ok[None, :], F, np.nan)
+    eos, info = fit(model, np.broadcast_to(V, F.shape), F_fit)
+    V0 = np.asarray(eos.V0)
+    curves.update({
+        "V0": V0,
+        "F0": np.asarray(eos.E0),
+        "B0_GPa": np.asarray(eos.B0) * GPA_PER_EV_A3,
+        "B0p": np.asarray(getattr(eos, "B0p", np.full_like(V0, 4.0))),
+        "alpha": np.gradient(V0, T) / V0 if len(T) > 1 else np.full_like(V0, np.nan),
+        "rms": info["rms"],
+        "converged": info["converged"],
+        "In_range": (V0 >= V[ok].min()) & (V0 <= V[ok].max()),
+    })
+    return F, curves
+
+
+def phonon_scan(prims, conda, calc=None, calc_factory=None, repeat=3, delta=0.01,
+                workers=1, batch_size=16, max_atoms=None):
+    """
+    Phonon energies (n_structures, n_q, n_modes) of each primitive cell
+    in `prims`: the displaced supercells of all volumes go through
+    displaced_forces() together, optionally over several processes.
+    """
+    cells = []
+    for prim in prims:
+        cells += displaced_supercells(prim, repeat, delta)[1]
+    n = 6 * len(prims[0])
+
+    with stage("phonon forces", len(cells)):
+        forces = displaced_forces(cells, conda, calc, calc_factory, workers,
+                                  batch_size, max_atoms)
+    with stage("phonon solve", len(prims)):
+        return np.stack([
+            phonon_energies(prim, force_constants(forces[i * n:(i + 1) * n],
+                                                  len(prim), delta), repeat)
+            for i, prim in enumerate(prims)
+        ])
@@ -1,27 +1,11 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import sys
 import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from results import read_table, results_name
 
-from eos import (
-    murnaghan_pressure,
-    birch_murnaghan_pressure_2nd,
-    birch_murnaghan_pressure_3rd,
-    birch_murnaghan_pressure_4th,
-    birch_murnaghan_pressure_5th,
-    sjeos_pressure,
-)
-
-
-EOS_FAMILIES = {
-    "murnaghan": murnaghan_pressure,
-    "bm2": birch_murnaghan_pressure_2nd,
-    "bm3": birch_murnaghan_pressure_3rd,
-    "bm4": birch_murnaghan_pressure_4th,
-    "bm5": birch_murnaghan_pressure_5th,
-    "sjeos": sjeos_pressure,
-}
+
+EOS_FAMILIES = ["murnaghan", "bm2", "bm3", "bm4", "bm5", "sjeos"]
 
 BM_ONLY = ["bm2", "bm3", "bm4", "bm5"]
 
@@ -48,161 +32,169 @@ COLORS = [
 # LOAD FILES
 ############################################
 
-files = sys.argv[1:]
-if len(files) == 0:
-    raise ValueError("Provide CSV files as arguments.")
-
-
-datasets = {}
-for f in files:
-    df = pd.read_csv(f)
-    name = os.path.splitext(os.path.basename(f))[0]
-    datasets[name] = df
-
-
-############################################
-# FIT EOS PARAMETERS PER MLIP
-############################################
-
-def get_eos_params(df, model_name):
-    eos = df[(df["Type"] == "EOS") & (df["Model"] == model_name)]
-    if len(eos) == 0:
+def load(files):
+    """
+    Only the columns the figures use; .cols tables are memory-mapped.
+    The P-V curves are the pv table calculate.py already evaluated,
+    nothing is refitted or re-evaluated here.
+    """
+    datasets = {}
+    for f in files:
+        datasets[results_name(f)] = {
+            "raw": read_table(f, "raw", ["Volume", "Energy", "Pressure"]),
+            "pv": read_table(f, "pv", ["Model", "Volume", "Pressure"]),
+        }
+    return datasets
+
+
+def direct_pressure(df):
+    raw = df["raw"]
+    if "Pressure" not in raw or raw["Pressure"].isna().all():
         return None
-    row = eos.iloc[0]
-    return row
+    return raw
 
 
 ############################################
-# ====== PLOT RAW ENERGY–VOLUME ===========
+# FIGURES
 ############################################
 
-plt.figure(figsize=(6, 4))
-
-for color, (name, df) in zip(COLORS, datasets.items()):
-    raw = df[df["Type"] == "Raw"]
-    plt.plot(raw["Volume"], raw["Energy"], "o-", label=name, color=color, markersize=3)
-
-plt.xlabel("Volume (Å$^3$)")
-plt.ylabel("Energy (eV)")
-plt.title("MgO Energy–Volume Curve with ... Fit")
-plt.legend()
-plt.tight_layout()
-plt.show()
-
-
-############################################
-# CREATE VOLUME GRID
-############################################
-
-all_vols = np.concatenate([
-    df[df["Type"] == "Raw"]["Volume"].values
-    for df in datasets.values()
-])
-
-vgrid = np.linspace(all_vols.min(), all_vols.max(), 400)
-
-
-############################################
-# ====== PLOT 1: MLIP vs EOS ===============
-############################################
-
-plt.figure(figsize=(7, 5))
-
-for color, (name, df) in zip(COLORS, datasets.items()):
-
-    # raw PV not plotted, only fits
-    for eos_name, eos_func in EOS_FAMILIES.items():
-
-        params = get_eos_params(df, eos_name if eos_name != "bm2" else "birchmurnaghan")
-
-        if params is None:
-            continue
-
-        V0 = params["v0"]
-        B0 = params["Bulk_Modulus_GPa"]
-        B0p = 4.0  # if missing
-
-        if eos_name == "murnaghan":
-            P = eos_func(vgrid, V0, B0, 4.0)
-
-        elif eos_name == "bm2":
-            P = eos_func(vgrid, V0, B0)
-
-        elif eos_name == "bm3":
-            P = eos_func(vgrid, V0, B0, 4.0)
-
-        elif eos_name == "bm4":
-            P = eos_func(vgrid, V0, B0, 4.0, 0.0)
-
-        elif eos_name == "bm5":
-            P = eos_func(vgrid, V0, B0, 4.0, 0.0, 0.0)
-
-        elif eos_name == "sjeos":
-            # simple coefficients, placeholder
-            P = eos_func(vgrid, 1, 1, 1, 0)
-
-        else:
-            continue
-
-        plt.plot(
-            vgrid,
-            P,
-            linestyle=LINESTYLES[eos_name],
-            color=color,
-            alpha=0.9,
-            label=f"{name}-{eos_name}"
-        )
-
-plt.xlabel("Volume")
-plt.ylabel("Pressure")
-plt.title("Pressure–Volume: MLIPs + EOS Models")
-plt.legend(fontsize=8, ncols=2)
-plt.tight_layout()
-plt.show()
+def plot_ev(datasets, ax):
+    for color, (name, df) in zip(COLORS, datasets.items()):
+        raw = df["raw"]
+        ax.plot(raw["Volume"], raw["Energy"], "o-", label=name, color=color, markersize=3)
+
+    ax.set_xlabel("Volume (Å$^3$)")
+    ax.set_ylabel("Energy (eV)")
+    ax.set_title("MgO Energy–Volume Curve")
+    ax.legend()
+
+
+def _pv_curves(datasets, ax, models, label_points):
+    # fitted curves from the pv table, points are the direct pressures
+    # -trace(stress)/3 from the same forward pass as the energies
+    for color, (name, df) in zip(COLORS, datasets.items()):
+        pv = df["pv"]
+        for eos_name in models:
+            curve = pv[pv["Model"] == eos_name]
+            if len(curve) == 0:
+                continue
+            ax.plot(
+                curve["Volume"],
+                curve["Pressure"],
+                linestyle=LINESTYLES[eos_name],
+                color=color,
+                alpha=0.9,
+                label=f"{name}-{eos_name}"
+            )
+
+        raw = direct_pressure(df)
+        if raw is not None:
+            ax.plot(raw["Volume"], raw["Pressure"], "o", color=color, markersize=3,
+                    label=f"{name} stress" if label_points else None)
+
+    ax.set_xlabel("Volume (Å$^3$)")
+    ax.set_ylabel("Pressure (GPa)")
+    ax.legend(fontsize=8, ncols=2)
+
+
+def plot_pv(datasets, ax):
+    _pv_curves(datasets, ax, EOS_FAMILIES, label_points=True)
+    ax.set_title("Pressure–Volume: MLIPs + EOS Models")
+
+
+def plot_bm_orders(datasets, ax):
+    _pv_curves(datasets, ax, BM_ONLY, label_points=False)
+    ax.set_title("Pressure–Volume: Birch–Murnaghan Orders")
+
+
+FIGURES = {
+    "ev": (plot_ev, (6, 4)),
+    "pv": (plot_pv, (7, 5)),
+    "bm_orders": (plot_bm_orders, (7, 5)),
+}
 
 
 ############################################
-# ====== PLOT 2: BM ORDER COMPARISON ======
+# RENDER
 ############################################
 
-plt.figure(figsize=(7, 5))
-
-for color, (name, df) in zip(COLORS, datasets.items()):
-
-    params = get_eos_params(df, "birchmurnaghan")
-    if params is None:
-        continue
-
-    V0 = params["v0"]
-    B0 = params["Bulk_Modulus_GPa"]
-
-    for bm in BM_ONLY:
-        func = EOS_FAMILIES[bm]
-
-        if bm == "bm2":
-            P = func(vgrid, V0, B0)
-
-        elif bm == "bm3":
-            P = func(vgrid, V0, B0, 4.0)
-
-        elif bm == "bm4":
-            P = func(vgrid, V0, B0, 4.0, 0.0)
-
-        elif bm == "bm5":
-            P = func(vgrid, V0, B0, 4.0, 0.0, 0.0)
-
-        plt.plot(
-            vgrid,
-            P,
-            linestyle=LINESTYLES[bm],
-            color=color,
-            label=f"{name}-{bm}"
-        )
-
-plt.xlabel("Volume")
-plt.ylabel("Pressure")
-plt.title("Pressure–Volume: Birch–Murnaghan Orders")
-plt.legend(fontsize=8, ncols=2)
-plt.tight_layout()
-plt.show()
-
+def render(figure, files, out, formats=("png",), dpi=150, prefix=""):
+    """
+    Draw one figure headlessly and save it in each format. Runs in a
+    worker process, so it loads its own data and uses the Agg backend.
+    Returns the written paths.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    func, size = FIGURES[figure]
+    fig, ax = plt.subplots(figsize=size)
+    func(load(files), ax)
+    fig.tight_layout()
+
+    paths = []
+    for fmt in formats:
+        path = os.path.join(out, f"{prefix}{figure}.{fmt}")
+        fig.savefig(path, dpi=dpi)
+        paths.append(path)
+    plt.close(fig)
+    return paths
+
+
+def report(files, out="figures", figures=tuple(FIGURES), formats=("png",),
+           workers=None, dpi=150, per_calculator=False):
+    """
+    Every figure rendered in parallel worker processes: the comparison
+    of all `files`, plus one set per calculator (<name>_<figure>.<fmt>)
+    with `per_calculator`.
+    """
+    os.makedirs(out, exist_ok=True)
+    tasks = [(fig, files, "") for fig in figures]
+    if per_calculator:
+        tasks += [(fig, [f], f"{results_name(f)}_") for f in files for fig in figures]
+
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(render, fig, group, out, formats, dpi, prefix)
+                for fig, group, prefix in tasks]
+        return [path for job in jobs for path in job.result()]
+
+
+def show(files, figures=tuple(FIGURES)):
+    """The old interactive mode: one window per figure."""
+    import matplotlib.pyplot as plt
+
+    datasets = load(files)
+    for figure in figures:
+        func, size = FIGURES[figure]
+        fig, ax = plt.subplots(figsize=size)
+        func(datasets, ax)
+        fig.tight_layout()
+    plt.show()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="E-V, P-V and BM-order figures from calculate.py outputs."
+    )
+    parser.add_argument("files", nargs="+", help="<conda>.csv or <conda>.cols")
+    parser.add_argument("--out", default="figures", help="output directory")
+    parser.add_argument("--format", nargs="+", default=["png"],
+                        choices=["png", "svg", "pdf"])
+    parser.add_argument("--figures", nargs="+", default=list(FIGURES),
+                        choices=list(FIGURES))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--per-calculator", action="store_true",
+                        help="also one set of figures per input file")
+    parser.add_argument("--show", action="store_true",
+                        help="open interactive windows instead of writing files")
+    args = parser.parse_args()
+
+    if args.show:
+        show(args.files, args.figures)
+    else:
+        for path in report(args.files, args.out, args.figures, args.format,
+                           args.workers, args.dpi, args.per_calculator):
+            print(path)
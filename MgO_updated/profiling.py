@@ -0,0 +1,118 @@
+import sys
+import json
+import time
+import resource
+import cProfile
+import pstats
+from contextlib import contextmanager
+
+
+# ===============================
+# Stage timers
+# ===============================
+
+class Timers:
+    """
+    Wall time, call count and item count per named stage.
+
+    Stages may nest (e.g. "forward" inside "evaluate"); each is timed on
+    its own, so nested times are also included in the outer stage.
+    """
+
+    def __init__(self):
+        self.stats = {}
+
+    def _entry(self, name):
+        return self.stats.setdefault(name, {"calls": 0, "seconds": 0.0, "items": 0})
+
+    @contextmanager
+    def stage(self, name, items=0):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self._entry(name)
+            entry["calls"] += 1
+            entry["seconds"] += time.perf_counter() - t0
+            entry["items"] += items
+
+    def count(self, name, n=1):
+        """Add to a stage's item count without timing anything."""
+        self._entry(name)["items"] += n
+
+    def reset(self):
+        self.stats = {}
+
+    def records(self):
+        """One dict per stage, slowest first."""
+        rows = [{"stage": name, **entry} for name, entry in self.stats.items()]
+        for row in rows:
+            row["seconds_per_item"] = row["seconds"] / row["items"] if row["items"] else None
+        return sorted(rows, key=lambda r: -r["seconds"])
+
+    def report(self):
+        lines = [f"{'stage':<14s} {'calls':>6s} {'items':>7s} {'time (s)':>10s} {'ms/item':>9s}"]
+        for r in self.records():
+            per = f"{1e3 * r['seconds_per_item']:9.3f}" if r["items"] else f"{'-':>9s}"
+            lines.append(f"{r['stage']:<14s} {r['calls']:6d} {r['items']:7d} "
+                         f"{r['seconds']:10.3f} {per}")
+        return "\n".join(lines)
+
+
+# shared by calculate.py and batch.py so backend-internal stages
+# (graph building, forward pass) land in the same run record
+TIMERS = Timers()
+stage = TIMERS.stage
+count = TIMERS.count
+
+
+def write_timings(path, timers=TIMERS, **info):
+    """Per-run timing record as JSON: `info` plus one entry per stage."""
+    with open(path, "w") as fh:
+        json.dump({**info, "stages": timers.records()}, fh, indent=2)
+
+
+# ===============================
+# Memory
+# ===============================
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return rss / 1024**2 if sys.platform == "darwin" else rss / 1024
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux), else the peak."""
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+    except OSError:
+        return peak_rss_mb()
+    return pages * resource.getpagesize() / 1024**2
+
+
+# ===============================
+# Profiler hook
+# ===============================
+
+@contextmanager
+def profiled(path=None, top=25):
+    """
+    Run the block under cProfile and dump the stats to `path` (readable
+    by pstats, snakeviz or gprof2dot). Does nothing without a path, so
+    sampling profilers such as `py-spy record -- python calculate.py ...`
+    see the unmodified call stack.
+    """
+    if path is None:
+        yield
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        prof.dump_stats(path)
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(top)
@@ -0,0 +1,203 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from eos import MODELS
+from fit import fit, GPA_PER_EV_A3
+
+
+# index file next to this module; "data" paths in it are relative to it
+REFERENCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "references.csv")
+
+INDEX = ("material", "source", "method")
+
+# index columns holding EOS parameters, in the units people quote them in,
+# and the factor taking each to the eV/Å^3 units of eos.py
+PARAMETERS = {
+    "E0": ("E0", 1.0),
+    "V0": ("V0", 1.0),
+    "B0_GPa": ("B0", 1 / GPA_PER_EV_A3),
+    "B0p": ("B0p", 1.0),
+    "B0pp_per_GPa": ("B0pp", GPA_PER_EV_A3),
+    "B0ppp_per_GPa2": ("B0ppp", GPA_PER_EV_A3**2),
+}
+
+COLUMNS = [*INDEX, "model", *PARAMETERS, "data", "note"]
+
+
+# ===============================
+# Store
+# ===============================
+
+class ReferenceStore:
+    """
+    Literature, DFT and experimental equations of state, per material.
+
+    Each row of the index is one reference: either a parameter set
+    (V0, B0, ... for a Murnaghan or Birch–Murnaghan model) or a file of
+    Volume/Energy points, which is fitted with the row's model the first
+    time it is used. Both end up as one parameter row, so any selection
+    evaluates on any volume grid with one vectorized call per EOS model.
+
+    Volumes and energies are per primitive cell (one formula unit),
+    like the calculator outputs. A missing E0 is taken as 0; scoring
+    compares curves relative to their minimum anyway.
+    """
+
+    def __init__(self, index, root="."):
+        index = index.reindex(columns=COLUMNS)
+        index[list(INDEX)] = index[list(INDEX)].fillna("")
+        index["model"] = index["model"].fillna("bm3")
+        dup = index.duplicated(list(INDEX))
+        if dup.any():
+            raise ValueError(f"duplicate references: {index[dup][list(INDEX)].values.tolist()}")
+        self.index = index.reset_index(drop=True)
+        self.root = root
+        self._lookup = {tuple(r): i for i, r in enumerate(self.index[list(INDEX)].values)}
+        self._params = {}
+
+    @classmethod
+    def load(cls, path=REFERENCES):
+        return cls(pd.read_csv(path), root=os.path.dirname(os.path.abspath(path)))
+
+    def save(self, path=REFERENCES):
+        self.index.to_csv(path, index=False)
+
+    def __len__(self):
+        return len(self.index)
+
+    def names(self, rows):
+        return ["/".join(r) for r in self.index.loc[rows, list(INDEX)].values]
+
+    def add(self, material, source, method, model="bm3", data=None, note="", **params):
+        """
+        Add (or replace) one reference. `params` use the index column
+        names, e.g. V0=18.7, B0_GPa=160, B0p=4.1; or give `data`, a CSV
+        with Volume/Energy columns, relative to the store's directory.
+        """
+        unknown = set(params) - set(PARAMETERS)
+        if unknown:
+            raise ValueError(f"unknown parameters {sorted(unknown)}")
+        if data is None and "V0" not in params:
+            raise ValueError("a reference needs EOS parameters or a data file")
+        row = {"material": material, "source": source, "method": method,
+               "model": model, "data": data, "note": note, **params}
+        key = (material, source, method)
+        if key in self._lookup:
+            i = self._lookup[key]
+            self.index.loc[i, COLUMNS] = [row.get(c, np.nan) for c in COLUMNS]
+            self._params.pop(i, None)
+        else:
+            i = len(self.index)
+            self.index.loc[i] = [row.get(c, np.nan) for c in COLUMNS]
+            self._lookup[key] = i
+        return i
+
+    # ---------- lookup ----------
+
+    def select(self, material=None, source=None, method=None):
+        """
+        Row numbers of the matching references. Each argument is a value
+        or a list of values; None matches everything.
+        """
+        mask = np.ones(len(self.index), dtype=bool)
+        for col, want in zip(INDEX, (material, source, method)):
+            if want is None:
+                continue
+            want = [want] if isinstance(want, str) else list(want)
+            mask &= self.index[col].isin(want).values
+        return np.flatnonzero(mask)
+
+    def get(self, material, source, method):
+        return self._lookup[(material, source, method)]
+
+    # ---------- evaluation ----------
+
+    def params(self, i):
+        """(model, parameter row in eos.py units) of reference `i`."""
+        if i not in self._params:
+            row = self.index.loc[i]
+            cls = MODELS[row["model"]]
+            if "E0" not in cls.param_names:
+                raise ValueError(f"{row['model']}: references need a model with E0, V0, B0")
+            if isinstance(row["data"], str) and row["data"]:
+                V, E = self.points(i)
+                eos, _ = fit(row["model"], V, E)
+                p = eos.params
+            else:
+                values = {name: row[col] * f for col, (name, f) in PARAMETERS.items()}
+                values["E0"] = 0.0 if np.isnan(values["E0"]) else values["E0"]
+                p = np.array([values[n] for n in cls.param_names], dtype=float)
+                if np.isnan(p).any():
+                    raise ValueError(f"{self.names([i])[0]}: incomplete {row['model']} parameters")
+            self._params[i] = (row["model"], p)
+        return self._params[i]
+
+    def points(self, i):
+        """Volume/Energy points of a data reference."""
+        df = pd.read_csv(os.path.join(self.root, self.index.loc[i, "data"]))
+        return df["Volume"].values.astype(float), df["Energy"].values.astype(float)
+
+    def energies(self, rows, V):
+        """
+        Reference energies on the volume grid `V`, shape (len(rows),
+        n_volumes). V is 1D (one grid for all) or (len(rows), n_volumes).
+        References sharing an EOS model are evaluated in one call.
+        """
+        rows = np.atleast_1d(rows)
+        V = np.asarray(V, dtype=float)
+        V = np.broadcast_to(V, (len(rows),) + V.shape[-1:])
+        out = np.empty(V.shape)
+
+        groups = {}
+        for j, i in enumerate(rows):
+            model, p = self.params(i)
+            groups.setdefault(model, ([], []))
+            groups[model][0].append(j)
+            groups[model][1].append(p)
+        for model, (js, ps) in groups.items():
+            curve = MODELS[model].from_array(np.array(ps)[:, None, :])
+            out[js] = curve.energy(V[js])
+        return out
+
+    def pressures(self, rows, V):
+        """Reference pressures in GPa on `V`, shaped like energies()."""
+        rows = np.atleast_1d(rows)
+        V = np.asarray(V, dtype=float)
+        V = np.broadcast_to(V, (len(rows),) + V.shape[-1:])
+        out = np.empty(V.shape)
+        for j, i in enumerate(rows):
+            model, p = self.params(i)
+            out[j] = MODELS[model].from_array(p).pressure(V[j]) * GPA_PER_EV_A3
+        return out
+
+    def minima(self, rows):
+        """E0 of each reference, the minimum of its curve."""
+        return np.array([self.params(i)[1][0] for i in np.atleast_1d(rows)])
+
+    def summary(self, rows=None):
+        """Index rows with fitted parameters filled in for data references."""
+        rows = np.arange(len(self)) if rows is None else np.atleast_1d(rows)
+        df = self.index.loc[rows].copy()
+        for i in rows:
+            model, p = self.params(i)
+            values = dict(zip(MODELS[model].param_names, p))
+            for col, (name, f) in PARAMETERS.items():
+                if name in values:
+                    df.loc[i, col] = values[name] / f
+        return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the reference equations of state.")
+    parser.add_argument("--store", default=REFERENCES)
+    parser.add_argument("--material", default=None)
+    parser.add_argument("--source", default=None)
+    parser.add_argument("--method", default=None)
+    args = parser.parse_args()
+
+    store = ReferenceStore.load(args.store)
+    rows = store.select(args.material, args.source, args.method)
+    cols = [*INDEX, "model", *PARAMETERS]
+    print(store.summary(rows)[cols].to_string(index=False))
@@ -0,0 +1,114 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from ase.constraints import FixSymmetry
+from ase.filters import FrechetCellFilter
+from ase.optimize import FIRE
+
+
+# ===============================
+# Single relaxation
+# ===============================
+
+def scale_to_volume(atoms, volume):
+    """Copy of atoms isotropically scaled to `volume`, fractional coords kept."""
+    atoms = atoms.copy()
+    factor = (volume / atoms.get_volume())**(1.0 / 3.0)
+    atoms.set_cell(atoms.cell * factor, scale_atoms=True)
+    return atoms
+
+
+def relax(atoms, calc, cell=False, symmetry=True, fmax=0.01, steps=200,
+          properties=("energy",)):
+    """
+    Relax at fixed volume: internal positions, plus the cell shape when
+    `cell` is set (FrechetCellFilter with constant_volume). FixSymmetry
+    keeps the starting space group. Returns (energy, relaxed atoms, steps);
+    any other `properties` ("stress", "forces") of the final geometry are
+    left in atoms.info.
+    """
+    atoms = atoms.copy()
+    atoms.calc = calc
+    if symmetry:
+        atoms.set_constraint(FixSymmetry(atoms))
+
+    target = FrechetCellFilter(atoms, constant_volume=True) if cell else atoms
+    opt = FIRE(target, logfile=None)
+    opt.run(fmax=fmax, steps=steps)
+
+    energy = atoms.get_potential_energy()
+    for p in properties:
+        if p != "energy":
+            # the optimizer's last call usually has them already
+            atoms.info[p] = calc.get_property(p, atoms).tolist()
+    atoms.set_constraint()
+    atoms.calc = None
+    return energy, atoms, opt.get_number_of_steps()
+
+
+# ===============================
+# Volume scans
+# ===============================
+
+_worker_calc = None
+
+
+def _init_worker(calc_factory):
+    # each worker loads its model once
+    global _worker_calc
+    _worker_calc = calc_factory()
+
+
+def relax_segment(structures, calc=None, **opts):
+    """
+    Relax a run of neighbouring volumes in order. Each relaxation starts
+    from the previous converged geometry rescaled to the next volume.
+    """
+    calc = calc if calc is not None else _worker_calc
+    out = []
+    prev = None
+    for stru in structures:
+        start = stru
+        if prev is not None and np.array_equal(prev.numbers, stru.numbers):
+            start = scale_to_volume(prev, stru.get_volume())
+        energy, prev, nsteps = relax(start, calc, **opts)
+        out.append((energy, prev, nsteps))
+    return out
+
+
+def relaxed_energies(structures, calc=None, calc_factory=None, workers=1, **opts):
+    """
+    Fixed-volume relaxations of `structures`.
+
+    The volumes are sorted and split into `workers` contiguous segments.
+    Segments run concurrently in worker processes, each with its own
+    calculator from `calc_factory` (must be picklable). Inside a segment
+    every relaxation is warm-started from its neighbour. With workers=1
+    the given `calc` is used in this process.
+
+    Returns (energies, relaxed structures, optimizer steps), in input order.
+    """
+    order = np.argsort([s.get_volume() for s in structures])
+    ordered = [structures[i] for i in order]
+
+    if workers <= 1 or len(structures) < 2:
+        if calc is None:
+            calc = calc_factory()
+        results = relax_segment(ordered, calc, **opts)
+    else:
+        segments = [list(seg) for seg in np.array_split(np.arange(len(ordered)),
+                                                        min(workers, len(ordered)))]
+        with ProcessPoolExecutor(max_workers=len(segments), initializer=_init_worker,
+                                 initargs=(calc_factory,)) as pool:
+            jobs = [pool.submit(relax_segment, [ordered[i] for i in seg], **opts)
+                    for seg in segments]
+            results = [r for job in jobs for r in job.result()]
+
+    energies = np.empty(len(structures))
+    relaxed = [None] * len(structures)
+    nsteps = np.empty(len(structures), dtype=int)
+    for i, (e, atoms, n) in zip(order, results):
+        energies[i] = e
+        relaxed[i] = atoms
+        nsteps[i] = n
+    return energies, relaxed, nsteps
@@ -0,0 +1,211 @@
+import os
+import glob
+import json
+import numpy as np
+import pandas as pd
+
+
+# CSV "Type" value -> table name in the columnar layout
+TABLES = {
+    "Raw": "raw",
+    "EOS": "eos",
+    "Interpolated": "interpolated",
+    "PV": "pv",
+}
+
+COLUMNAR_SUFFIX = ".cols"
+
+# calculate.py modes other than the E-V scan write <conda><suffix>.csv/.cols;
+# a new mode registers its suffix here so eos_outputs() leaves it out
+MODE_SUFFIXES = {
+    "sweep": "_sweep",
+    "supercell": "_supercell",
+    "qha": "_qha",
+    "elastic": "_elastic",
+}
+
+
+# ===============================
+# Layout
+# ===============================
+#
+# <fout>/<conda>.cols/
+#     meta.json                 calculator, model, grid, timings, schema
+#     raw/Volume.npy            one typed .npy per column, so readers
+#     raw/Energy.npy            can memory-map just the columns they use
+#     eos/Model.npy
+#     ...
+
+def results_name(path):
+    """Calculator name for a results path (<conda>.csv or <conda>.cols)."""
+    base = os.path.basename(os.path.normpath(path))
+    for ext in (".csv", COLUMNAR_SUFFIX):
+        if base.endswith(ext):
+            return base[:-len(ext)]
+    return base
+
+
+def is_columnar(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, "meta.json"))
+
+
+# ===============================
+# Writers
+# ===============================
+
+def _column_array(series):
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.to_numpy()
+    # fixed-width unicode so the column stays mmap-able (no pickling)
+    return np.asarray(series.fillna("").astype(str).tolist(), dtype=str)
+
+
+def write_columnar(path, tables, meta=None):
+    """
+    Write {table: DataFrame} as a columnar directory.
+
+    All-empty columns are skipped, so each table keeps only its own schema.
+    """
+    os.makedirs(path, exist_ok=True)
+    schema = {}
+    for table, df in tables.items():
+        tdir = os.path.join(path, table)
+        os.makedirs(tdir, exist_ok=True)
+        df = df.dropna(axis=1, how="all").drop(columns="Type", errors="ignore")
+
+        schema[table] = {}
+        for col in df.columns:
+            arr = _column_array(df[col])
+            np.save(os.path.join(tdir, f"{col}.npy"), arr, allow_pickle=False)
+            schema[table][col] = str(arr.dtype)
+
+    meta = dict(meta or {})
+    meta["tables"] = schema
+    with open(os.path.join(path, "meta.json"), "w") as fh:
+        json.dump(meta, fh, indent=2, default=float)
+
+
+def write_csv(path, tables):
+    """The original single wide CSV, one Type per table."""
+    types = {v: k for k, v in TABLES.items()}
+    out = pd.concat(
+        [df.assign(Type=types.get(table, table)) for table, df in tables.items()],
+        ignore_index=True,
+    )
+    cols = ["Type"] + [c for c in out.columns if c != "Type"]
+    out[cols].to_csv(path, index=False)
+
+
+# ===============================
+# Readers
+# ===============================
+
+def read_meta(path):
+    if not is_columnar(path):
+        return {"calculator": results_name(path)}
+    with open(os.path.join(path, "meta.json")) as fh:
+        return json.load(fh)
+
+
+def read_table(path, table, columns=None):
+    """
+    One table of a results file as a DataFrame.
+
+    Columnar directories are memory-mapped column by column; a CSV is
+    filtered on its Type column (compatibility with older outputs).
+    """
+    if is_columnar(path):
+        schema = read_meta(path)["tables"].get(table, {})
+        names = list(schema) if columns is None else [c for c in columns if c in schema]
+        tdir = os.path.join(path, table)
+        return pd.DataFrame({
+            c: np.load(os.path.join(tdir, f"{c}.npy"), mmap_mode="r")
+            for c in names
+        })
+
+    usecols = None if columns is None else (lambda c: c == "Type" or c in columns)
+    df = pd.read_csv(path, usecols=usecols)
+    types = {v: k for k, v in TABLES.items()}
+    df = df[df["Type"] == types.get(table, table)].drop(columns="Type")
+    return df.dropna(axis=1, how="all").reset_index(drop=True)
+
+
+def mode_name(conda, mode):
+    """Output name of a calculate.py mode, e.g. mace_qha."""
+    return conda + MODE_SUFFIXES[mode]
+
+
+def eos_outputs(fout="out", ext=".csv"):
+    """The E-V scan outputs <conda><ext> in `fout`, without other modes' files."""
+    suffixes = tuple(s + ext for s in MODE_SUFFIXES.values())
+    return sorted(p for p in glob.glob(os.path.join(fout, "*" + ext))
+                  if not p.endswith(suffixes))
+
+
+def find_results(fout, conda):
+    """Prefer the columnar output, fall back to the CSV."""
+    cols = os.path.join(fout, conda + COLUMNAR_SUFFIX)
+    if is_columnar(cols):
+        return cols
+    return os.path.join(fout, f"{conda}.csv")
+
+
+# ===============================
+# Streaming log
+# ===============================
+
+class RecordLog:
+    """
+    Append-only JSON Lines log with one record per evaluated structure.
+
+    Every append is flushed and fsync'ed, so after a crash the log holds
+    everything evaluated so far. With resume=True the existing records
+    are loaded (a truncated last line is ignored); otherwise the log
+    starts empty.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.records = {}
+
+        if resume and os.path.exists(path):
+            with open(path) as fh:
+                for line in fh:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    self.records[rec["key"]] = rec
+
+        self.fh = open(path, "a" if resume else "w")
+        if resume:
+            # drop a partial line left by a crash mid-write
+            self.fh.truncate(self._valid_size())
+
+    def _valid_size(self):
+        size = 0
+        with open(self.path, "rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                size += len(line)
+        return size
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    def __len__(self):
+        return len(self.records)
+
+    def append(self, records):
+        for rec in records:
+            self.fh.write(json.dumps(rec, default=float) + "\n")
+            self.records[rec["key"]] = rec
+        self.fh.flush()
+        os.fsync(self.fh.fileno())
+
+    def close(self):
+        self.fh.close()
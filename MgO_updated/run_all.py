@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from results import find_results
+
+
+CALCULATORS = ["m3gnet", "mace", "sevenn", "mattersim", "orb", "chgnet"]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# every threading runtime torch / numpy may pull in
+THREAD_VARS = [
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+]
+
+
+def worker_env(threads):
+    """Environment for one worker with intra-op threads pinned."""
+    env = dict(os.environ)
+    for var in THREAD_VARS:
+        env[var] = str(threads)
+    return env
+
+
+def worker_command(fout, conda, use_conda_env, extra_args):
+    """
+    Command line for one calculator run.
+
+    With use_conda_env the run goes through `conda run -n <conda>`,
+    since each MLIP usually lives in its own environment.
+    """
+    script = os.path.join(HERE, "calculate.py")
+    if use_conda_env:
+        python = ["conda", "run", "--no-capture-output", "-n", conda, "python"]
+    else:
+        python = [sys.executable]
+    return python + [script, fout, conda] + list(extra_args)
+
+
+def run_one(fout, conda, threads, use_conda_env, extra_args):
+    cmd = worker_command(fout, conda, use_conda_env, extra_args)
+    log = os.path.join(fout, f"{conda}.log")
+
+    t0 = time.perf_counter()
+    with open(log, "w") as fh:
+        try:
+            code = subprocess.run(
+                cmd, cwd=HERE, env=worker_env(threads),
+                stdout=fh, stderr=subprocess.STDOUT,
+            ).returncode
+        except OSError as err:
+            # no conda on PATH, bad interpreter: a failed run, not a crash
+            fh.write(f"could not start {' '.join(cmd)}: {err}\n")
+            code = 127
+    return conda, code, time.perf_counter() - t0
+
+
+def run_all(fout, calculators=CALCULATORS, workers=None, threads=None,
+            use_conda_env=False, extra_args=()):
+    """
+    Run calculate.py for every calculator in a pool of worker processes.
+
+    Each worker gets `threads` intra-op threads; by default the cores are
+    split evenly between the workers. Returns {conda: returncode}.
+    """
+    fout = os.path.abspath(fout)
+    os.makedirs(fout, exist_ok=True)
+
+    ncores = os.cpu_count() or 1
+    if workers is None:
+        workers = len(calculators)
+    workers = max(1, min(workers, len(calculators)))
+    if threads is None:
+        threads = max(1, ncores // workers)
+
+    print(f"{len(calculators)} calculators, {workers} workers x {threads} threads")
+
+    status = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        jobs = [
+            pool.submit(run_one, fout, conda, threads, use_conda_env, extra_args)
+            for conda in calculators
+        ]
+        for job in as_completed(jobs):
+            conda, code, dt = job.result()
+            status[conda] = code
+            state = "ok" if code == 0 else f"FAILED ({code}), see {conda}.log"
+            print(f"  {conda:<10s} {dt:8.1f} s  {state}")
+
+    for conda in calculators:
+        path = find_results(fout, conda)
+        if status[conda] == 0 and not os.path.exists(path):
+            print(f"  {conda}: finished but {path} is missing")
+
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run all MLIP E-V scans in parallel."
+    )
+    parser.add_argument("--out", default="out", help="output directory")
+    parser.add_argument("--calculators", nargs="+", default=CALCULATORS)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="concurrent runs (default: one per calculator)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="threads per worker (default: cores / workers)")
+    parser.add_argument("--conda-env", action="store_true",
+                        help="run each calculator in the conda env of the same name")
+    args, extra = parser.parse_known_args()
+
+    status = run_all(
+        args.out,
+        calculators=args.calculators,
+        workers=args.workers,
+        threads=args.threads,
+        use_conda_env=args.conda_env,
+        extra_args=extra,
+    )
+    sys.exit(0 if all(code == 0 for code in status.values()) else 1)
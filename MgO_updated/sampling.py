@@ -0,0 +1,119 @@
+import numpy as np
+
+from eos import MODELS
+from fit import fit
+
+
+# ===============================
+# Adaptive E-V sampling
+# ===============================
+#
+# Start from a coarse grid, fit the EOS, and add the volumes that most
+# reduce the variance of the target parameters (V0, B0). The variance
+# after adding a point with energy gradient j = dE/dparams follows from the current
+# covariance C by a rank-one (Sherman–Morrison) update:
+#
+#     C' = C - C j j^T C / (s^2 + j^T C j)
+#
+# so every candidate volume is scored in one array operation.
+
+# relative std of each parameter the sampling aims for
+TARGETS = {"V0": 1e-3, "B0": 1e-2}
+
+
+def relative_errors(eos, cov, targets=TARGETS):
+    """std(p) / |p| for the target parameters."""
+    idx = [eos.param_names.index(p) for p in targets]
+    p = eos.params[idx]
+    return np.sqrt(np.diag(cov)[idx]) / np.abs(p)
+
+
+def score_candidates(eos, cov, candidates, sigma, targets=TARGETS):
+    """
+    Variance removed from the targets by adding each candidate, relative
+    to each target's parameter value and tolerance.
+    """
+    idx = [eos.param_names.index(p) for p in targets]
+    scale = 1.0 / (eos.params[idx] * np.array(list(targets.values())))**2
+
+    J = eos.jacobian(candidates)                  # (n_cand, n_params)
+    CJ = J @ cov                                  # (n_cand, n_params)
+    denom = sigma**2 + np.einsum("ci,ci->c", CJ, J)
+    return np.sum(CJ[:, idx]**2 * scale, axis=1) / denom
+
+
+def adaptive_volumes(evaluate, v_lo, v_hi, model="bm3", n_init=5, per_round=2,
+                     targets=TARGETS, max_points=40, sigma_floor=1e-4, n_candidates=400,
+                     min_spacing=None, verbose=True):
+    """
+    Sample E(V) on [v_lo, v_hi] until the relative std of every
+    parameter in `targets` ({name: tolerance}, by default V0 to 0.1 %
+    and B0 to 1 %) of the `model` fit is below its tolerance.
+
+    `evaluate(volumes)` returns one energy per volume. Returns the sampled
+    volumes and energies (sorted by volume) and the final (eos, info);
+    info["stop"] says why sampling ended: "targets reached", "max
+    points" (the budget ran out first) or "no candidates" (every volume
+    left is closer than `min_spacing` to a sampled one), and
+    info["rel_err"] holds the final relative std per target.
+    `sigma_floor` (eV) is the smallest per-point error assumed, so the
+    noise of the data bounds what any number of points can reach.
+    """
+    if min_spacing is None:
+        min_spacing = 0.25 * (v_hi - v_lo) / max_points
+    candidates = np.linspace(v_lo, v_hi, n_candidates)
+    tol = np.array(list(targets.values()))
+
+    V = np.linspace(v_lo, v_hi, n_init)
+    E = np.asarray(evaluate(V), dtype=float)
+    n_params = len(MODELS[model].param_names)
+
+    while True:
+        eos, info = fit(model, V, E)
+
+        # residual scatter, floored so that a near-exact fit through a
+        # handful of points does not claim a tiny uncertainty
+        dof = max(len(V) - n_params, 1)
+        sigma = max(info["rms"] * np.sqrt(len(V) / dof), sigma_floor)
+        J = eos.jacobian(V)
+        cov = sigma**2 * np.linalg.pinv(J.T @ J)
+
+        err = relative_errors(eos, cov, targets)
+        if verbose:
+            print(f"  {len(V):3d} points  rel. std " +
+                  "  ".join(f"{p} {e:.1e}" for p, e in zip(targets, err)))
+
+        stop = None
+        if len(V) >= n_params + 2 and np.all(err < tol):
+            stop = "targets reached"
+        elif len(V) >= max_points:
+            stop = "max points"
+        else:
+            new = []
+            for _ in range(min(per_round, max_points - len(V))):
+                score = score_candidates(eos, cov, candidates, sigma, targets)
+                taken = np.concatenate([V, new])
+                near = np.min(np.abs(candidates[:, None] - taken[None, :]), axis=1)
+                score[near < min_spacing] = -np.inf
+                best = np.argmax(score)
+                if not np.isfinite(score[best]):
+                    break
+
+                # condition on the chosen point before picking the next one
+                j = eos.jacobian(candidates[best:best + 1])[0]
+                Cj = cov @ j
+                cov = cov - np.outer(Cj, Cj) / (sigma**2 + j @ Cj)
+                new.append(candidates[best])
+            if not new:
+                stop = "no candidates"
+        if stop is not None:
+            break
+
+        V = np.concatenate([V, new])
+        E = np.concatenate([E, np.asarray(evaluate(np.array(new)), dtype=float)])
+
+    info = dict(info, stop=stop, rel_err=dict(zip(targets, err)))
+    if verbose:
+        print(f"  stopped after {len(V)} points: {stop}")
+    order = np.argsort(V)
+    return V[order], E[order], (eos, info)
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+
+from eos import MODELS
+from fit import fit, sjeos_minimum
+from results import read_table, results_name
+from likelihood import (
+    log_likelihood_gaussian_sum,
+    profile_log_likelihood,
+    marginal_log_likelihood,
+)
+
+
+SCORE_MODELS = ("murnaghan", "bm2", "bm3", "bm4", "bm5", "sjeos")
+
+
+# ===============================
+# Loading
+# ===============================
+
+def _pad(columns):
+    """Stack 1D arrays of different length into a NaN-padded 2D array."""
+    n = max(len(c) for c in columns)
+    out = np.full((len(columns), n), np.nan)
+    for i, c in enumerate(columns):
+        out[i, :len(c)] = c
+    return out
+
+
+def load_raw(paths):
+    """
+    Raw E(V) of every calculator output (.csv or .cols) as padded
+    (n_calculators, n_volumes) arrays. Returns (names, V, E).
+    """
+    names, Vs, Es = [], [], []
+    for path in paths:
+        raw = read_table(path, "raw", ["Volume", "Energy"])
+        names.append(results_name(path))
+        Vs.append(np.asarray(raw["Volume"], dtype=float))
+        Es.append(np.asarray(raw["Energy"], dtype=float))
+    return names, _pad(Vs), _pad(Es)
+
+
+def load_references(paths):
+    """{name: (V, E)} from reference CSVs with Volume/Energy columns."""
+    refs = {}
+    for path in paths:
+        df = pd.read_csv(path)
+        refs[results_name(path)] = (df["Volume"].values, df["Energy"].values)
+    return refs
+
+
+# ===============================
+# Scoring
+# ===============================
+
+def score(V, E, references, models=SCORE_MODELS, sigmas=(0.02,),
+          calculators=None, normalize=True):
+    """
+    Gaussian log-likelihood of every calculator x EOS model x sigma x
+    reference in one pass.
+
+    V, E are (n_calculators, n_volumes) raw MLIP data (NaN padded); each
+    EOS is fitted to all calculators in one batched call and evaluated
+    directly on each reference grid. With `normalize`, both curves are
+    shifted to their minimum (E0 for the EOS, the lowest reference
+    point), as in likelihoods.py.
+
+    Returns a dict with
+        logL           (calc, model, sigma, ref)  at the given sigmas
+        logL_profile   (calc, model, ref)         sigma maximized out
+        logL_marginal  (calc, model, ref)         sigma integrated out
+        sigma_hat      (calc, model, ref)         sqrt(S / N)
+    plus the axis labels.
+    """
+    ref_names = list(references)
+    V_ref = _pad([np.asarray(references[r][0], dtype=float) for r in ref_names])
+    E_ref = _pad([np.asarray(references[r][1], dtype=float) for r in ref_names])
+    if normalize:
+        E_ref = E_ref - np.nanmin(E_ref, axis=1, keepdims=True)
+    return score_arrays(V, E, V_ref, E_ref, ref_names, models, sigmas,
+                        calculators, normalize)
+
+
+def score_arrays(V, E, V_ref, E_ref, ref_names, models=SCORE_MODELS,
+                 sigmas=(0.02,), calculators=None, normalize=True):
+    """
+    score() on references given as (n_ref, n_points) arrays, NaN padded.
+    E_ref is compared as is; `normalize` only shifts the fitted EOS
+    curves to their minimum.
+    """
+    V = np.atleast_2d(V)
+    E = np.atleast_2d(E)
+    sigmas = np.asarray(sigmas, dtype=float)
+    V_ref = np.atleast_2d(V_ref)
+    E_ref = np.atleast_2d(E_ref)
+    mask = np.isfinite(E_ref)
+    N = mask.sum(axis=1)                                  # (ref,)
+
+    # (calc, model, ref) summed squared residuals
+    S = np.empty((len(V), len(models), len(ref_names)))
+    for m, name in enumerate(models):
+        eos, _ = fit(name, V, E)
+        cls = MODELS[name]
+        params = eos.params if eos.params.ndim == 2 else eos.params[None]
+        curve = cls.from_array(params[:, None, None, :])  # (calc, 1, 1)
+
+        with np.errstate(invalid="ignore"):
+            E_model = curve.energy(np.where(mask, V_ref, 1.0)[None])
+            if normalize:
+                E_model = E_model - _minimum(cls, params)[:, None, None]
+        r = np.where(mask[None], E_model - E_ref[None], 0.0)
+        S[:, m, :] = np.sum(r**2, axis=-1)
+
+    logL = log_likelihood_gaussian_sum(
+        S[:, :, None, :], N[None, None, None, :], sigmas[None, None, :, None]
+    )
+
+    return {
+        "logL": logL,
+        "logL_profile": profile_log_likelihood(S, N),
+        "logL_marginal": marginal_log_likelihood(S, N),
+        "sigma_hat": np.sqrt(S / N),
+        "calculators": list(calculators) if calculators is not None
+        else [str(i) for i in range(len(V))],
+        "models": list(models),
+        "sigmas": sigmas,
+        "references": list(ref_names),
+    }
+
+
+def _minimum(cls, params):
+    """Energy at the EOS minimum for each parameter row."""
+    eos = cls.from_array(params)
+    if hasattr(eos, "E0"):
+        return eos.E0
+    return sjeos_minimum(eos)[1]
+
+
+def score_files(paths, reference_paths, **kwargs):
+    """Load calculator outputs and references once, then score()."""
+    names, V, E = load_raw(paths)
+    refs = load_references(reference_paths)
+    return score(V, E, refs, calculators=names, **kwargs)
+
+
+def score_store(V, E, store, rows, grid=None, normalize=True, **kwargs):
+    """
+    score() against references of a ReferenceStore: `rows` from
+    store.select(), evaluated on `grid` (default: every volume any
+    calculator was run at) in one array call, no CSV per reference.
+    With `normalize` each reference is shifted by its E0.
+    """
+    if grid is None:
+        grid = np.unique(np.asarray(V)[np.isfinite(V)])
+    grid = np.asarray(grid, dtype=float)
+    E_ref = store.energies(rows, grid)
+    if normalize:
+        E_ref = E_ref - store.minima(rows)[:, None]
+    V_ref = np.broadcast_to(grid, E_ref.shape)
+    return score_arrays(V, E, V_ref, E_ref, store.names(rows),
+                        normalize=normalize, **kwargs)
+
+
+def score_files_store(paths, store, material="MgO", source=None, method=None,
+                      grid=None, **kwargs):
+    """Load calculator outputs once and score them against a store selection."""
+    names, V, E = load_raw(paths)
+    rows = store.select(material, source, method)
+    if len(rows) == 0:
+        raise ValueError(f"no references for {material}/{source}/{method}")
+    return score_store(V, E, store, rows, grid, calculators=names, **kwargs)
+
+
+def ranking(scores, key="logL_marginal", model="bm3", reference=None):
+    """Calculators ordered best-first for one EOS model and reference."""
+    m = scores["models"].index(model)
+    r = 0 if reference is None else scores["references"].index(reference)
+    vals = scores[key][:, m, r]
+    order = np.argsort(vals)[::-1]
+    return pd.DataFrame({
+        "calculator": [scores["calculators"][i] for i in order],
+        key: vals[order],
+        "sigma_hat": scores["sigma_hat"][order, m, r],
+    })
@@ -0,0 +1,177 @@
+import json
+import time
+import argparse
+import threading
+import urllib.request
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+from ase import Atoms
+
+from batch import batched_properties
+
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+
+# ===============================
+# Wire format
+# ===============================
+
+def atoms_to_dict(atoms):
+    return {
+        "numbers": atoms.numbers.tolist(),
+        "positions": atoms.get_positions().tolist(),
+        "cell": np.asarray(atoms.cell).tolist(),
+        "pbc": atoms.pbc.tolist(),
+    }
+
+
+def dict_to_atoms(d):
+    return Atoms(
+        numbers=d["numbers"],
+        positions=d["positions"],
+        cell=d["cell"],
+        pbc=d["pbc"],
+    )
+
+
+# ===============================
+# Server
+# ===============================
+
+class ModelPool:
+    """Calculators loaded on first use and then kept in memory."""
+
+    def __init__(self, batch_size=16):
+        self.batch_size = batch_size
+        self.calculators = {}
+        self.load_times = {}
+        self.lock = threading.Lock()
+
+    def get(self, conda):
+        if conda not in self.calculators:
+            from calculate import get_calculator
+
+            t0 = time.perf_counter()
+            calc = get_calculator(conda)
+            self.calculators[conda] = calc
+            self.load_times[conda] = time.perf_counter() - t0
+        return self.calculators[conda]
+
+    def evaluate(self, conda, structures, properties=("energy",)):
+        # models are not thread safe, so requests are served one at a time
+        with self.lock:
+            calc = self.get(conda)
+            out = batched_properties(
+                calc, structures, conda, self.batch_size, properties
+            )
+            return {
+                p: [np.asarray(v).tolist() for v in values]
+                for p, values in out.items()
+            }
+
+
+class Handler(BaseHTTPRequestHandler):
+    pool = None
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/status":
+            self._reply(404, {"error": f"no route {self.path}"})
+            return
+        self._reply(200, {
+            "loaded": sorted(self.pool.calculators),
+            "load_times": self.pool.load_times,
+        })
+
+    def do_POST(self):
+        if self.path != "/evaluate":
+            self._reply(404, {"error": f"no route {self.path}"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        req = json.loads(self.rfile.read(length))
+        try:
+            structures = [dict_to_atoms(d) for d in req["structures"]]
+            out = self.pool.evaluate(
+                req["calculator"],
+                structures,
+                req.get("properties", ["energy"]),
+            )
+        except Exception as err:
+            self._reply(500, {"error": f"{type(err).__name__}: {err}"})
+            return
+        self._reply(200, out)
+
+
+def serve(host="127.0.0.1", port=8765, preload=(), batch_size=16):
+    pool = ModelPool(batch_size=batch_size)
+    for conda in preload:
+        pool.get(conda)
+        print(f"loaded {conda} in {pool.load_times[conda]:.1f} s")
+
+    Handler.pool = pool
+    httpd = HTTPServer((host, port), Handler)
+    print(f"serving on http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+# ===============================
+# Client
+# ===============================
+
+def remote_evaluate(url, conda, structures, properties=("energy",), timeout=600):
+    """
+    Send structures to a running server and return
+    {property: numpy array}, one entry per structure ("forces" is a
+    list of (natoms, 3) arrays).
+    """
+    payload = json.dumps({
+        "calculator": conda,
+        "structures": [atoms_to_dict(a) for a in structures],
+        "properties": list(properties),
+    }).encode()
+
+    req = urllib.request.Request(
+        url.rstrip("/") + "/evaluate",
+        data=payload,
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            out = json.loads(resp.read())
+    except urllib.error.HTTPError as err:
+        raise RuntimeError(json.loads(err.read()).get("error", str(err)))
+
+    return {
+        k: [np.asarray(f, dtype=float) for f in v] if k == "forces"
+        else np.asarray(v, dtype=float)
+        for k, v in out.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Keep MLIP calculators loaded and serve energies over HTTP."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--preload", nargs="*", default=[],
+                        help="calculators to load before serving")
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.preload, args.batch_size)
@@ -0,0 +1,56 @@
+import os
+import numpy as np
+from ase.io import iread
+
+from relax import scale_to_volume
+
+
+# volume / reference volume for each structure's E-V grid
+DEFAULT_FRACTIONS = np.linspace(0.85, 1.15, 13)
+
+
+# ===============================
+# Sources
+# ===============================
+#
+# Every source is read lazily and yields (name, Atoms) pairs, so a
+# directory or database of hundreds of crystals is never held in
+# memory at once.
+
+def _iter_file(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for i, atoms in enumerate(iread(path, index=":")):
+        name = atoms.info.get("name") or (stem if i == 0 else f"{stem}-{i}")
+        yield name, atoms
+
+
+def _iter_db(path):
+    from ase.db import connect
+
+    for row in connect(path).select():
+        name = row.get("name") or f"{row.formula}-{row.id}"
+        yield name, row.toatoms()
+
+
+def iter_structures(source):
+    """
+    (name, Atoms) pairs from an ASE-readable file (all frames), an ASE
+    database (.db), or a directory of such files.
+    """
+    if os.path.isdir(source):
+        for fname in sorted(os.listdir(source)):
+            path = os.path.join(source, fname)
+            if os.path.isfile(path) and not fname.startswith("."):
+                yield from iter_structures(path)
+        return
+
+    if source.endswith(".db"):
+        yield from _iter_db(source)
+    else:
+        yield from _iter_file(source)
+
+
+def volume_grid(atoms, fractions=DEFAULT_FRACTIONS):
+    """Copies of atoms scaled to fractions x the reference cell volume."""
+    v_ref = atoms.get_volume()
+    return [scale_to_volume(atoms, f * v_ref) for f in fractions]
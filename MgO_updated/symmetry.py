@@ -0,0 +1,128 @@
+import hashlib
+import numpy as np
+from ase.stress import full_3x3_to_voigt_6_stress, voigt_6_to_full_3x3_stress
+
+from cache import structure_hash
+from profiling import stage, count
+
+
+# ===============================
+# Canonical form
+# ===============================
+
+def _min_translation(types, pos, decimals):
+    """
+    Fractional positions shifted so that one atom of the first species
+    sits at the origin, taking the lexicographically smallest choice.
+    Removes spglib's freedom in picking among equivalent origins.
+    """
+    best = None
+    for shift in pos[types == types.min()]:
+        p = np.round(np.mod(pos - shift, 1.0), decimals) % 1.0 + 0.0
+        order = np.lexsort((p[:, 2], p[:, 1], p[:, 0], types))
+        key = p[order].tobytes()
+        if best is None or key < best[0]:
+            best = (key, types[order])
+    return best
+
+
+def canonical_key(atoms, symprec=1e-5, decimals=5, memo=None):
+    """
+    (key, atoms in the canonical cell, rotation) for a periodic
+    structure, where rotation takes Cartesian vectors of `atoms` into
+    the orientation of the canonical cell.
+
+    The key comes from spglib's standardized (idealized) cell, whose
+    lattice and origin are rounded to `decimals` Å: rotated, translated,
+    re-ordered or supercell copies of one crystal get the same key; so
+    do volumes closer than 10**-decimals Å in lattice parameter.
+    Without spglib (or for non-periodic structures) this is the plain
+    structure_hash.
+
+    spglib costs milliseconds per cell, so with a `memo` dict the result
+    is also stored under the exact structure_hash of `atoms`, and a
+    structure seen before is answered from there without spglib.
+    """
+    exact = None
+    if memo is not None:
+        exact = (structure_hash(atoms), symprec, decimals)
+        if exact in memo:
+            count("canonical_hits")
+            return memo[exact]
+
+    out = _spglib_key(atoms, symprec, decimals)
+    if memo is not None:
+        memo[exact] = out
+    return out
+
+
+def _spglib_key(atoms, symprec, decimals):
+    try:
+        from ase.spacegroup.symmetrize import check_symmetry
+        if not atoms.pbc.all():
+            raise ValueError("not periodic")
+        # one spglib call: std_lattice / std_positions are already idealized
+        ds = check_symmetry(atoms, symprec)
+    except (ImportError, ValueError, RuntimeError, TypeError):
+        return structure_hash(atoms, decimals), len(atoms), np.eye(3)
+
+    types = np.asarray(ds.std_types, dtype=np.int64)
+    lattice = np.round(np.asarray(ds.std_lattice, dtype=float), decimals) + 0.0
+    positions, types = _min_translation(types, np.asarray(ds.std_positions), decimals)
+
+    h = hashlib.sha256()
+    h.update(np.int64(ds.number).tobytes())
+    h.update(lattice.tobytes())
+    h.update(types.tobytes())
+    h.update(positions)
+    return h.hexdigest(), len(types), np.asarray(ds.std_rotation_matrix, dtype=float)
+
+
+# ===============================
+# Deduplicated evaluation
+# ===============================
+
+def dedup_properties(structures, evaluate, memo=None, symprec=1e-5, decimals=5,
+                     properties=("energy",), keys=None):
+    """
+    {property: values} for `structures`, calling `evaluate` (which
+    returns such a dict) once per distinct crystal.
+
+    Structures are grouped by canonical_key; the first of each group not
+    already in `memo` is evaluated and its energy per atom is fanned
+    back out to every member, scaled by its atom count. Stress is
+    rotated through the canonical orientation into each member's frame.
+    Forces would need an atom mapping and are not shared. Pass the same
+    `memo` across calls to reuse results over a whole sweep, and the same
+    `keys` (canonical_key's memo) to skip spglib for structures seen before.
+    """
+    if "forces" in properties:
+        raise ValueError("forces cannot be shared between equivalent structures")
+    memo = {} if memo is None else memo
+    with stage("canonicalize", len(structures)):
+        canon = [canonical_key(s, symprec, decimals, keys) for s in structures]
+
+    todo = {}
+    for i, (key, _, _) in enumerate(canon):
+        if key not in memo and key not in todo:
+            todo[key] = i
+    count("dedup_saved", len(structures) - len(todo))
+
+    if todo:
+        reps = list(todo.values())
+        new = evaluate([structures[i] for i in reps])
+        for j, (key, i) in enumerate(todo.items()):
+            entry = {"energy": new["energy"][j] / len(structures[i])}
+            if "stress" in properties:
+                R = canon[i][2]
+                entry["stress"] = R @ voigt_6_to_full_3x3_stress(new["stress"][j]) @ R.T
+            memo[key] = entry
+
+    out = {"energy": np.array([memo[key]["energy"] * len(s)
+                               for (key, _, _), s in zip(canon, structures)])}
+    if "stress" in properties:
+        out["stress"] = np.array([
+            full_3x3_to_voigt_6_stress(R.T @ memo[key]["stress"] @ R)
+            for key, _, R in canon
+        ])
+    return out
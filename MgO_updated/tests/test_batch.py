@@ -0,0 +1,71 @@
+import importlib.util
+
+import numpy as np
+import pytest
+from ase.build import bulk
+from ase.calculators.emt import EMT
+
+from batch import batched_energies, batched_properties
+from calculators import REGISTRY, load_calculator
+
+
+IMPORTS = {
+    "m3gnet": "matgl",
+    "mace": "mace",
+    "sevenn": "sevenn",
+    "mattersim": "mattersim",
+    "orb": "orb_models",
+    "chgnet": "chgnet",
+}
+
+
+def structures(symbol="MgO", crystal="rocksalt", a=4.21):
+    """Strained, rattled cells of two sizes, so stress and forces are non-trivial."""
+    rng = np.random.default_rng(0)
+    out = []
+    for i, f in enumerate(np.linspace(0.96, 1.04, 4)):
+        atoms = bulk(symbol, crystal, a=a * f, cubic=True)
+        if i % 2:
+            atoms = atoms.repeat((2, 1, 1))
+        atoms.set_cell(atoms.cell @ (np.eye(3) + 0.01 * rng.normal(size=(3, 3))),
+                       scale_atoms=True)
+        atoms.rattle(0.02, seed=i)
+        out.append(atoms)
+    return out
+
+
+def direct(calc, atoms_list):
+    energies, stresses, forces = [], [], []
+    for atoms in atoms_list:
+        atoms = atoms.copy()
+        atoms.calc = calc
+        energies.append(atoms.get_potential_energy())
+        stresses.append(atoms.get_stress())
+        forces.append(atoms.get_forces())
+    return np.array(energies), np.array(stresses), forces
+
+
+def check(calc, conda, atoms_list, tol):
+    E, S, F = direct(calc, atoms_list)
+    # energy-only runs (--no-stress, supercell, QHA) take the same path
+    np.testing.assert_allclose(
+        batched_energies(calc, [a.copy() for a in atoms_list], conda, batch_size=3),
+        E, atol=tol * 10)
+    out = batched_properties(calc, [a.copy() for a in atoms_list], conda, batch_size=3,
+                             properties=("energy", "stress", "forces"))
+    np.testing.assert_allclose(out["energy"], E, atol=tol * 10)
+    np.testing.assert_allclose(out["stress"], S, atol=tol)
+    for f, ref in zip(out["forces"], F):
+        np.testing.assert_allclose(f, ref, atol=tol * 10)
+
+
+def test_serial_fallback_matches_calculator():
+    check(EMT(), None, structures("Cu", "fcc", 3.6), 1e-10)
+
+
+@pytest.mark.parametrize("conda", sorted(REGISTRY))
+def test_batched_stress_matches_calculator(conda):
+    if importlib.util.find_spec(IMPORTS[conda]) is None:
+        pytest.skip(f"{REGISTRY[conda]['package']} not installed")
+    # float32 models: batched and single-structure kernels differ in summation order
+    check(load_calculator(conda), conda, structures(), 1e-4)
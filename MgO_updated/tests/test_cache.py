@@ -0,0 +1,49 @@
+import numpy as np
+from ase.build import bulk
+
+from cache import ResultCache
+
+
+def cells(n):
+    return [bulk("Cu", "fcc", a=3.5 + 0.01 * i) for i in range(n)]
+
+
+def fake_energies(strus):
+    return np.array([a.get_volume() for a in strus])
+
+
+def test_hits_misses_and_values(tmp_path):
+    cache = ResultCache(str(tmp_path / "c.sqlite"))
+    strus = cells(5)
+    first = cache.energies(strus[:3], fake_energies, "emt", "m", "float64")
+    again = cache.energies(strus, fake_energies, "emt", "m", "float64")
+    np.testing.assert_allclose(again, fake_energies(strus))
+    np.testing.assert_allclose(first, again[:3])
+    assert (cache.hits, cache.misses) == (3, 5)
+
+
+def test_one_commit_and_batched_touch_per_call(tmp_path):
+    cache = ResultCache(str(tmp_path / "c.sqlite"))
+    strus = cells(1200)
+    cache.energies(strus, fake_energies, "emt", "m", "float64")
+
+    statements = []
+    cache.db.set_trace_callback(statements.append)
+    cache.energies(strus, fake_energies, "emt", "m", "float64")
+    cache.db.set_trace_callback(None)
+
+    assert sum(s.startswith("COMMIT") for s in statements) == 1
+    assert sum(s.startswith("SELECT") for s in statements) == 3   # 500-key chunks
+    assert cache.hits == 1200
+
+
+def test_touched_entries_survive_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / "c.sqlite"), max_entries=3)
+    strus = cells(4)
+    cache.energies(strus[:3], fake_energies, "emt", "m", "float64")
+    cache.energies(strus[:1], fake_energies, "emt", "m", "float64")   # touch 0
+    cache.energies(strus[3:], fake_energies, "emt", "m", "float64")   # evicts 1
+    assert len(cache) == 3
+    cache.hits = cache.misses = 0
+    cache.energies([strus[0], strus[2], strus[3]], fake_energies, "emt", "m", "float64")
+    assert cache.misses == 0
@@ -0,0 +1,54 @@
+import numpy as np
+from ase.build import bulk
+from ase.calculators.emt import EMT
+
+from elastic import born_stable, cubic_constants, fit_stiffness, strain_matrix, strained_cells
+from fit import fit, GPA_PER_EV_A3
+
+
+def energy(atoms):
+    atoms = atoms.copy()
+    atoms.calc = EMT()
+    return atoms.get_potential_energy()
+
+
+def stress(atoms):
+    atoms = atoms.copy()
+    atoms.calc = EMT()
+    return atoms.get_stress()
+
+
+def equilibrium_cu():
+    a = np.linspace(3.5, 3.7, 11)
+    E = [energy(bulk("Cu", "fcc", a=x, cubic=True)) for x in a]
+    eos, _ = fit("bm3", a**3, E)
+    return bulk("Cu", "fcc", a=float(eos.V0)**(1 / 3), cubic=True), eos
+
+
+def test_cubic_constants_of_emt_copper():
+    cu, eos = equilibrium_cu()
+    strains = np.linspace(-0.005, 0.005, 5)
+    C, err = fit_stiffness([stress(c) for c in strained_cells(cu, strains)], strains)
+    c = cubic_constants(C, err)
+
+    # cubic symmetry: equivalent entries agree, the rest vanish
+    for name in ("C11", "C12", "C44"):
+        assert c[name][2] < 0.5
+    shear = C[3:, 3:]
+    assert np.abs(C[:3, 3:]).max() < 0.5
+    assert np.abs(shear - np.diag(np.diag(shear))).max() < 0.5
+    # B from C11, C12 against the bulk modulus of the E(V) fit
+    np.testing.assert_allclose(c["B"][0], float(eos.B0) * GPA_PER_EV_A3, rtol=0.01)
+
+    # C44 against the energy of a pure shear, E = E0 + V/2 C44 gamma^2
+    gammas = np.linspace(-0.01, 0.01, 5)
+    E = []
+    for g in gammas:
+        s = cu.copy()
+        s.set_cell(cu.cell @ (np.eye(3) + strain_matrix(3, g)), scale_atoms=True)
+        E.append(energy(s))
+    curv = np.polyfit(gammas, E, 2)[0] * 2
+    np.testing.assert_allclose(c["C44"][0], curv / cu.get_volume() * GPA_PER_EV_A3, rtol=0.02)
+
+    assert born_stable(c["C11"][0], c["C12"][0], c["C44"][0])
+    assert not born_stable(100.0, 120.0, 50.0)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from eos import MODELS
+
+
+PARAMS = {
+    "murnaghan": [-11.9, 19.2, 1.0, 4.1],
+    "bm2": [-11.9, 19.2, 1.0],
+    "bm3": [-11.9, 19.2, 1.0, 4.1],
+    "bm4": [-11.9, 19.2, 1.0, 4.3, -4.0],
+    "bm5": [-11.9, 19.2, 1.0, 4.3, -4.0, 5.0],
+    "sjeos": [-5.0, 60.0, -150.0, 120.0],
+}
+V = np.linspace(16.0, 23.0, 9)
+H = 1e-4
+
+
+def d(f, x, h):
+    return (f(x + h) - f(x - h)) / (2 * h)
+
+
+@pytest.mark.parametrize("name", sorted(MODELS))
+def test_derivatives_match_finite_differences(name):
+    eos = MODELS[name](*PARAMS[name])
+    np.testing.assert_allclose(eos.pressure(V), -d(eos.energy, V, H), rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(eos.bulk_modulus(V), -V * d(eos.pressure, V, H),
+                               rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(eos.dBdP(V), d(eos.bulk_modulus, V, H) / d(eos.pressure, V, H),
+                               rtol=1e-5, atol=1e-7)
+
+
+@pytest.mark.parametrize("name", sorted(MODELS))
+def test_jacobian_matches_finite_differences(name):
+    cls = MODELS[name]
+    p = np.array(PARAMS[name], dtype=float)
+    J = cls(*p).jacobian(V)
+    assert J.shape == (len(V), len(p))
+    for i in range(len(p)):
+        h = 1e-6 * max(abs(p[i]), 1.0)
+        up, down = p.copy(), p.copy()
+        up[i] += h
+        down[i] -= h
+        fd = (cls(*up).energy(V) - cls(*down).energy(V)) / (2 * h)
+        np.testing.assert_allclose(J[:, i], fd, rtol=1e-6, atol=1e-8)
+
+
+def test_batched_parameters_broadcast():
+    p = np.array([PARAMS["bm3"], [-11.0, 18.0, 1.1, 4.5]])
+    batch = MODELS["bm3"].from_array(p[:, None, :]).energy(V)
+    for row, E in zip(p, batch):
+        np.testing.assert_allclose(E, MODELS["bm3"](*row).energy(V))
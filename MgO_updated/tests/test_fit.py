@@ -0,0 +1,66 @@
+import numpy as np
+
+from eos import MODELS
+from fit import fit, fit_models
+
+
+V = np.linspace(15.0, 23.0, 31)
+
+
+def test_bm5_converges_on_noisy_data():
+    E = MODELS["bm3"](-10.0, 18.7, 1.0, 4.2).energy(V)
+    E = E + np.random.default_rng(0).normal(0.0, 5e-3, len(V))
+    out = fit_models(V, E)
+    for name, (eos, info) in out.items():
+        assert info["converged"], name
+    assert out["bm5"][1]["n_iter"] < 100
+
+
+def test_recovers_bm4_parameters():
+    true = MODELS["bm4"](-10.0, 18.7, 1.0, 4.5, -5.0)
+    eos, info = fit("bm4", V, true.energy(V))
+    assert info["converged"]
+    np.testing.assert_allclose(eos.params, true.params, rtol=1e-6)
+
+
+def test_only_active_datasets_change():
+    E = MODELS["bm3"](-10.0, 18.7, 1.0, 4.2).energy(V)
+    batch = np.stack([E, E + 0.02 * np.sin(V)])
+    eos, info = fit("bm3", V, batch)
+    single, _ = fit("bm3", V, E)
+    assert info["converged"].all()
+    np.testing.assert_allclose(eos.params[0], single.params, rtol=1e-8)
+
+
+def lennard_jones_scan():
+    from ase.build import bulk
+    from ase.calculators.lj import LennardJones
+
+    from volumes import volumes_m3gnet
+
+    V = np.asarray(volumes_m3gnet, dtype=float)
+    E = []
+    for v in V:
+        atoms = bulk("MgO", "rocksalt", a=(4 * v)**(1 / 3))
+        atoms.calc = LennardJones(sigma=2.0, rc=6.0)
+        E.append(atoms.get_potential_energy())
+    return V, np.array(E)
+
+
+def test_divergent_fit_is_reported_not_raised():
+    V, E = lennard_jones_scan()
+    for p0 in ([-10.3, 21.0, 0.07, 604.0], [np.nan, 21.0, 0.5, 4.0]):
+        eos, info = fit("murnaghan", V, E, p0=p0)
+        assert not info["converged"]
+        assert np.isnan(info["cov"]).all()
+
+
+def test_warm_start_skips_unconverged_fits():
+    V, E = lennard_jones_scan()
+    out = fit_models(V, E)
+    shuffled = fit_models(V, E, models=["bm3", "murnaghan", "sjeos", "bm2", "bm4", "bm5"])
+    assert list(shuffled) == ["bm3", "murnaghan", "sjeos", "bm2", "bm4", "bm5"]
+    assert not out["bm3"][1]["converged"]
+    for name in ("bm4", "bm5", "murnaghan"):
+        assert out[name][1]["converged"], name
+        np.testing.assert_allclose(shuffled[name][0].params, out[name][0].params)
@@ -0,0 +1,53 @@
+import numpy as np
+
+from metrics import Metrics, stream
+
+
+rng = np.random.default_rng(0)
+PRED = rng.normal(size=(2, 3, 500))
+REF = rng.normal(size=(3, 500))
+X = np.linspace(0.0, 1.0, 500)
+PRED[0, 1, 17] = np.nan
+
+
+def reference_metrics(pred, ref):
+    r = pred - ref
+    ok = np.isfinite(r)
+    a = np.abs(np.where(ok, r, 0.0))
+    n = ok.sum(axis=-1)
+    return {
+        "n": n,
+        "mae": a.sum(axis=-1) / n,
+        "rmse": np.sqrt((a**2).sum(axis=-1) / n),
+        "max_error": a.max(axis=-1),
+        "bias": np.where(ok, r, 0.0).sum(axis=-1) / n,
+        "argmax": a.argmax(axis=-1),
+    }
+
+
+def test_streamed_chunks_match_one_pass():
+    res = stream(PRED, REF, size=37).result()
+    for key, val in reference_metrics(PRED, REF).items():
+        np.testing.assert_allclose(res[key], val, err_msg=key)
+
+
+def test_merge_matches_single_pass():
+    bins = np.linspace(0.0, 1.0, 6)
+    whole = stream(PRED, REF, X, bins=bins)
+    left = stream(PRED[..., :230], REF[..., :230], X[:230], bins=bins)
+    right = stream(PRED[..., 230:], REF[..., 230:], X[230:], bins=bins)
+    merged = left.merge(right)
+
+    a, b = whole.result(), merged.result()
+    for key in a:
+        np.testing.assert_allclose(b[key], a[key], err_msg=key)
+    for key in ("n", "mean", "rms"):
+        np.testing.assert_allclose(merged.profile()[key], whole.profile()[key], err_msg=key)
+
+
+def test_update_at_one_cell():
+    m = Metrics((2, 3))
+    m.update(PRED[1, 2], REF[2], at=(1, 2))
+    res = m.result()
+    assert res["n"][1, 2] == 500 and res["n"].sum() == 500
+    np.testing.assert_allclose(res["mae"][1, 2], np.mean(np.abs(PRED[1, 2] - REF[2])))
@@ -0,0 +1,24 @@
+import numpy as np
+
+from phonons import quasi_harmonic
+
+
+V = np.linspace(10.0, 13.0, 7)
+
+
+def modes(scale):
+    """Phonon energies (V, q, mode) that soften as the volume grows."""
+    return np.ones((len(V), 8, 6)) * scale * (11.5 / V)[:, None, None]**6
+
+
+def test_all_unstable_gives_nan():
+    _, curves = quasi_harmonic(V, (V - 11.5)**2, -modes(0.01), [0.0, 300.0])
+    assert np.isnan(curves["V0"]).all()
+    assert np.isnan(curves["B0_GPa"]).all()
+    assert not curves["In_range"].any()
+
+
+def test_extrapolated_minimum_is_flagged():
+    _, curves = quasi_harmonic(V, 0.05 * (V - 11.5)**2, modes(0.02), [0.0, 300.0, 3000.0])
+    assert curves["In_range"][:2].all()
+    assert curves["V0"][2] > V.max() and not curves["In_range"][2]
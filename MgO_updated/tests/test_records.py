@@ -0,0 +1,34 @@
+import json
+
+from results import RecordLog
+
+
+def test_resume_after_truncated_last_line(tmp_path):
+    path = str(tmp_path / "toy.jsonl")
+    log = RecordLog(path)
+    log.append([{"key": "a", "energy": -1.0}, {"key": "b", "energy": -2.0}])
+    log.close()
+    with open(path, "a") as fh:
+        fh.write('{"key": "c", "ener')              # killed mid-write
+
+    log = RecordLog(path, resume=True)
+    assert len(log) == 2 and "a" in log and "c" not in log
+    log.append([{"key": "c", "energy": -3.0}])
+    log.close()
+
+    with open(path) as fh:
+        lines = [json.loads(line) for line in fh]
+    assert [rec["key"] for rec in lines] == ["a", "b", "c"]
+    log = RecordLog(path, resume=True)
+    assert log["c"]["energy"] == -3.0
+    log.close()
+
+
+def test_fresh_log_starts_empty(tmp_path):
+    path = str(tmp_path / "toy.jsonl")
+    log = RecordLog(path)
+    log.append([{"key": "a"}])
+    log.close()
+    log = RecordLog(path)
+    assert len(log) == 0
+    log.close()
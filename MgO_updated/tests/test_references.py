@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eos import MODELS
+from fit import GPA_PER_EV_A3
+from references import ReferenceStore
+
+
+V = np.linspace(16.0, 23.0, 15)
+CURVE = MODELS["bm3"](-11.9, 19.2, 160.0 / GPA_PER_EV_A3, 4.1)
+
+
+@pytest.fixture
+def store(tmp_path):
+    pd.DataFrame({"Volume": V, "Energy": CURVE.energy(V)}).to_csv(tmp_path / "pts.csv", index=False)
+    store = ReferenceStore(pd.DataFrame(), root=str(tmp_path))
+    store.add("MgO", "paper", "exp", V0=18.7, B0_GPa=160.0, B0p=4.1)
+    store.add("MgO", "paper", "dft", model="murnaghan", V0=19.0, B0_GPa=150.0, B0p=4.0)
+    store.add("MgO", "own", "dft", data="pts.csv")
+    store.add("CaO", "paper", "exp", V0=27.8, B0_GPa=112.0, B0p=4.2)
+    return store
+
+
+def test_select(store):
+    assert store.select().tolist() == [0, 1, 2, 3]
+    assert store.select("MgO").tolist() == [0, 1, 2]
+    assert store.select("MgO", method="dft").tolist() == [1, 2]
+    assert store.select(source=["own", "paper"], method="exp").tolist() == [0, 3]
+    assert store.select("MgO", "nowhere").tolist() == []
+    assert store.names(store.select("CaO")) == ["CaO/paper/exp"]
+    assert store.get("MgO", "own", "dft") == 2
+
+
+def test_add_replaces_and_rejects_duplicates(store):
+    store.params(0)
+    assert store.add("MgO", "paper", "exp", V0=18.8, B0_GPa=160.0, B0p=4.1) == 0
+    assert len(store) == 4
+    np.testing.assert_allclose(store.params(0)[1][1], 18.8)
+    with pytest.raises(ValueError):
+        ReferenceStore(pd.concat([store.index, store.index.iloc[:1]]))
+
+
+def test_data_references_are_fitted_and_evaluated(store, tmp_path):
+    model, p = store.params(2)
+    np.testing.assert_allclose(p, CURVE.params, rtol=1e-6)
+    E = store.energies(store.select("MgO"), V)
+    assert E.shape == (3, len(V))
+    np.testing.assert_allclose(E[2], CURVE.energy(V), atol=1e-8)
+    np.testing.assert_allclose(E[1], MODELS["murnaghan"](*store.params(1)[1]).energy(V))
+
+    store.save(str(tmp_path / "index.csv"))
+    again = ReferenceStore.load(str(tmp_path / "index.csv"))
+    np.testing.assert_allclose(again.energies([0, 1, 2, 3], V), store.energies([0, 1, 2, 3], V))
@@ -0,0 +1,30 @@
+import numpy as np
+from ase.build import bulk
+from ase.calculators.emt import EMT
+
+from relax import relax, relax_segment
+
+
+def rattled_cells():
+    """The same rattled Cu cell at four volumes, ordered by volume."""
+    out = []
+    for a in (3.56, 3.60, 3.64, 3.68):
+        atoms = bulk("Cu", "fcc", a=a, cubic=True)
+        atoms.rattle(0.05, seed=3)
+        out.append(atoms)
+    return out
+
+
+def test_segment_warm_starts_from_the_previous_volume():
+    cells = rattled_cells()
+    warm = relax_segment(cells, EMT(), symmetry=False, fmax=1e-3)
+    cold = [relax(a, EMT(), symmetry=False, fmax=1e-3) for a in cells]
+
+    for (e_w, atoms, _), (e_c, _, _), start in zip(warm, cold, cells):
+        np.testing.assert_allclose(e_w, e_c, atol=1e-5)
+        np.testing.assert_allclose(atoms.get_volume(), start.get_volume())
+    # only the first relaxation starts from the rattled geometry
+    steps_w = [n for _, _, n in warm]
+    steps_c = [n for _, _, n in cold]
+    assert steps_w[0] == steps_c[0]
+    assert sum(steps_w[1:]) < sum(steps_c[1:]) / 2
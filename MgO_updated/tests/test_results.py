@@ -0,0 +1,7 @@
+from results import MODE_SUFFIXES, eos_outputs, mode_name
+
+
+def test_eos_outputs_skip_every_mode(tmp_path):
+    for name in ["mace", "orb"] + [mode_name("mace", m) for m in MODE_SUFFIXES]:
+        (tmp_path / f"{name}.csv").write_text("Type,Volume,Energy\n")
+    assert eos_outputs(str(tmp_path)) == [str(tmp_path / "mace.csv"), str(tmp_path / "orb.csv")]
@@ -0,0 +1,9 @@
+import run_all
+
+
+def test_unstartable_worker_is_a_failed_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_all, "worker_command",
+                        lambda fout, conda, env, extra: ["/nonexistent/python"])
+    status = run_all.run_all(str(tmp_path), calculators=["mace", "orb"])
+    assert status == {"mace": 127, "orb": 127}
+    assert "could not start" in (tmp_path / "mace.log").read_text()
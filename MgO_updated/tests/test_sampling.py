@@ -0,0 +1,26 @@
+import numpy as np
+
+from eos import MODELS
+from sampling import adaptive_volumes
+
+
+CURVE = MODELS["bm3"](-11.9, 19.2, 1.0, 4.1)
+
+
+def noisy(sigma, seed=0):
+    rng = np.random.default_rng(seed)
+    return lambda V: CURVE.energy(V) + rng.normal(0.0, sigma, len(V))
+
+
+def test_stops_when_targets_reached():
+    V, E, (eos, info) = adaptive_volumes(noisy(1e-3), 15.0, 23.0, verbose=False)
+    assert info["stop"] == "targets reached"
+    assert info["rel_err"]["V0"] < 1e-3 and info["rel_err"]["B0"] < 1e-2
+    assert len(V) < 40
+
+
+def test_reports_exhausted_budget():
+    V, E, (eos, info) = adaptive_volumes(noisy(5e-2), 15.0, 23.0, max_points=12,
+                                         targets={"B0": 1e-4}, verbose=False)
+    assert info["stop"] == "max points"
+    assert len(V) == 12 and info["rel_err"]["B0"] > 1e-4
@@ -0,0 +1,40 @@
+import numpy as np
+from scipy.integrate import quad
+
+from eos import MODELS
+from likelihood import (
+    log_likelihood_gaussian_sum,
+    marginal_log_likelihood,
+    profile_log_likelihood,
+)
+from scoring import score
+
+
+def test_profile_is_the_maximum_over_sigma():
+    S, N = 0.37, 12
+    sigmas = np.geomspace(1e-3, 10.0, 20001)
+    best = log_likelihood_gaussian_sum(S, N, sigmas).max()
+    np.testing.assert_allclose(profile_log_likelihood(S, N), best, rtol=1e-6)
+
+
+def test_marginal_integrates_sigma_out():
+    S, N = 0.37, 12
+    z, _ = quad(lambda s: np.exp(log_likelihood_gaussian_sum(S, N, s)) / s,
+                0.0, np.inf, limit=200)
+    np.testing.assert_allclose(marginal_log_likelihood(S, N), np.log(z), rtol=1e-8)
+    assert marginal_log_likelihood(S, N) < profile_log_likelihood(S, N)
+
+
+def test_score_ranks_the_matching_calculator_first():
+    V = np.linspace(15.0, 23.0, 25)
+    ref = MODELS["bm3"](0.0, 19.2, 1.0, 4.1)
+    good = ref.energy(V) + np.random.default_rng(0).normal(0.0, 1e-3, len(V))
+    bad = MODELS["bm3"](0.0, 18.5, 0.8, 4.5).energy(V)
+    out = score(np.stack([V, V]), np.stack([good, bad]), {"ref": (V, ref.energy(V))},
+                models=("bm3",), sigmas=(0.01, 0.02))
+    assert out["logL"].shape == (2, 1, 2, 1)
+    assert out["logL_marginal"][0, 0, 0] > out["logL_marginal"][1, 0, 0]
+    # the profile equals the fixed-sigma likelihood at sigma_hat
+    S = out["sigma_hat"]**2 * len(V)
+    np.testing.assert_allclose(
+        out["logL_profile"], log_likelihood_gaussian_sum(S, len(V), out["sigma_hat"]))
@@ -0,0 +1,42 @@
+import numpy as np
+from ase.build import bulk
+from ase.db import connect
+from ase.io import write
+
+from structures import iter_structures, volume_grid
+
+
+def crystals():
+    return [bulk("Cu", "fcc", a=3.6), bulk("MgO", "rocksalt", a=4.2), bulk("Si", "diamond", a=5.43)]
+
+
+def test_database(tmp_path):
+    path = str(tmp_path / "set.db")
+    with connect(path) as db:
+        db.write(crystals()[0], name="copper")
+        db.write(crystals()[1])
+    out = list(iter_structures(path))
+    assert [name for name, _ in out] == ["copper", "MgO-2"]
+    assert out[1][1].get_chemical_formula() == "MgO"
+
+
+def test_directory(tmp_path):
+    cu, mgo, si = crystals()
+    write(str(tmp_path / "b_oxide.xyz"), mgo)
+    write(str(tmp_path / "a_metals.xyz"), [cu, si])
+    (tmp_path / ".hidden.xyz").write_text("not a structure")
+    (tmp_path / "sub").mkdir()
+    write(str(tmp_path / "sub" / "c.cif"), si)
+
+    out = list(iter_structures(str(tmp_path)))
+    # files only, in name order; hidden files and subdirectories are skipped
+    assert [name for name, _ in out] == ["a_metals", "a_metals-1", "b_oxide"]
+    np.testing.assert_allclose(out[2][1].get_volume(), mgo.get_volume())
+
+
+def test_volume_grid_scales_isotropically():
+    atoms = crystals()[1]
+    grid = volume_grid(atoms, [0.9, 1.0, 1.1])
+    np.testing.assert_allclose([a.get_volume() for a in grid],
+                               np.array([0.9, 1.0, 1.1]) * atoms.get_volume())
+    np.testing.assert_allclose(grid[0].get_scaled_positions(), atoms.get_scaled_positions())
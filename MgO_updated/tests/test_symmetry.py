@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from ase.build import bulk
+
+pytest.importorskip("spglib")
+
+from symmetry import canonical_key, dedup_properties
+
+
+def equivalents():
+    base = bulk("MgO", "rocksalt", a=4.2)
+    rotated = base.copy()
+    rotated.rotate(33, "x", rotate_cell=True)
+    shifted = base.copy()
+    shifted.translate([0.3, 0.1, 0.2])
+    shifted.wrap()
+    cubic = bulk("MgO", "rocksalt", a=4.2, cubic=True)
+    return [base, rotated, shifted, cubic, cubic.repeat(2), cubic[[4, 1, 6, 3, 0, 5, 2, 7]]]
+
+
+def test_equivalent_structures_share_a_key():
+    keys = {canonical_key(a)[0] for a in equivalents()}
+    assert len(keys) == 1
+    assert canonical_key(bulk("MgO", "rocksalt", a=4.2001))[0] not in keys
+
+
+def test_memo_skips_spglib_for_repeats(monkeypatch):
+    import symmetry
+
+    memo = {}
+    first = canonical_key(equivalents()[1], memo=memo)
+    monkeypatch.setattr(symmetry, "_spglib_key", lambda *a: pytest.fail("spglib called"))
+    again = canonical_key(equivalents()[1], memo=memo)
+    assert again[0] == first[0]
+    np.testing.assert_array_equal(again[2], first[2])
+
+
+def test_dedup_rotates_stress():
+    from ase.calculators.emt import EMT
+
+    cu = bulk("Cu", "fcc", a=3.6)
+    cu.set_cell(cu.cell @ np.diag([1.01, 1.0, 0.99]), scale_atoms=True)
+    rotated = cu.copy()
+    rotated.rotate(40, "z", rotate_cell=True)
+    structures = [cu, rotated, cu.repeat(2)]
+
+    def evaluate(strus):
+        out = {"energy": [], "stress": []}
+        for a in strus:
+            a = a.copy()
+            a.calc = EMT()
+            out["energy"].append(a.get_potential_energy())
+            out["stress"].append(a.get_stress())
+        return out
+
+    calls = []
+    shared = dedup_properties(structures, lambda s: calls.append(len(s)) or evaluate(s),
+                              properties=("energy", "stress"), keys={})
+    direct = evaluate(structures)
+    assert calls == [1]
+    np.testing.assert_allclose(shared["energy"], direct["energy"], rtol=1e-8)
+    np.testing.assert_allclose(shared["stress"], direct["stress"], atol=1e-8)
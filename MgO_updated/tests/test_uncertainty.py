@@ -0,0 +1,31 @@
+import numpy as np
+
+from eos import MODELS
+from uncertainty import bootstrap, mcmc, summarize_samples
+
+
+V = np.linspace(15.0, 23.0, 21)
+E = MODELS["bm3"](-11.9, 19.2, 1.0, 4.1).energy(V) \
+    + np.random.default_rng(0).normal(0.0, 2e-3, len(V))
+
+
+def test_mcmc_tunes_acceptance_during_burn_in():
+    samples, rate = mcmc(V, E, n_chains=16, n_steps=1200, burn=600, seed=1)
+    assert samples.shape == (16 * 600, 4)
+    assert 0.15 < rate < 0.5
+    np.testing.assert_allclose(np.median(samples[:, 1]), 19.2, atol=0.05)
+
+
+def test_bootstrap_flags_each_resample():
+    params, converged = bootstrap(V, E, n_boot=200)
+    assert params.shape == (len(converged), 4) and converged.dtype == bool
+    assert converged.mean() > 0.9
+
+
+def test_summary_has_robust_spread():
+    x = np.zeros((1000, 4))
+    x[:, 3] = 4.0 + np.random.default_rng(2).standard_normal(1000) * 0.1
+    x[:5, 3] = 1e5                                 # a few runaway fits
+    row = summarize_samples(x, "bm3", "bootstrap")[3]
+    assert row["std"] > 1e3
+    np.testing.assert_allclose(row["mad"], 0.1, rtol=0.15)
@@ -0,0 +1,243 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from eos import MODELS
+from fit import fit, GPA_PER_EV_A3
+from likelihood import log_likelihood_gaussian_sum
+from results import read_table, results_name
+
+
+# ===============================
+# Bootstrap
+# ===============================
+
+def bootstrap(V, E, model="bm3", n_boot=2000, seed=0):
+    """
+    Resample the volume points with replacement and refit.
+
+    A resample is expressed as integer weights on the original points,
+    so all n_boot fits run as one batched fit() call. Resamples with too
+    few distinct volumes to fix the model are dropped. Returns the
+    parameter samples (n_resamples, n_params) and the fit's converged
+    flag for each; filtering on it is left to the caller, since the
+    resamples that fail to converge are not a random subset.
+    """
+    V = np.asarray(V, dtype=float)
+    E = np.asarray(E, dtype=float)
+    n = len(V)
+    k = len(MODELS[model].param_names)
+    rng = np.random.default_rng(seed)
+
+    idx = rng.integers(0, n, size=(n_boot, n))
+    counts = np.zeros((n_boot, n))
+    np.add.at(counts, (np.arange(n_boot)[:, None], idx), 1.0)
+    counts = counts[np.count_nonzero(counts, axis=1) > k]
+
+    p0 = fit(model, V, E)[0].params
+    shape = (len(counts), n)
+    eos, info = fit(model, np.broadcast_to(V, shape), np.broadcast_to(E, shape),
+                    p0=p0, weights=counts)
+    return eos.params, info["converged"]
+
+
+# ===============================
+# MCMC
+# ===============================
+
+def log_posterior(model, params, V, E, sigma):
+    """
+    Gaussian log-likelihood (likelihood.py) of each parameter row under
+    a flat prior with V0, B0 > 0. params is (n_chains, n_params).
+    """
+    cls = MODELS[model]
+    with np.errstate(all="ignore"):
+        r = cls.from_array(params[:, None, :]).energy(V[None, :]) - E[None, :]
+    S = np.sum(r**2, axis=1)
+    logp = log_likelihood_gaussian_sum(S, len(V), sigma)
+
+    names = cls.param_names
+    for p in ("V0", "B0"):
+        if p in names:
+            logp = np.where(params[:, names.index(p)] > 0, logp, -np.inf)
+    return np.where(np.isfinite(logp), logp, -np.inf)
+
+
+def mcmc(V, E, model="bm3", n_chains=32, n_steps=4000, burn=1000, sigma=None,
+         seed=0, adapt_every=100, target=0.3):
+    """
+    Random-walk Metropolis over the EOS parameters, all chains advanced
+    together so each step is one vectorized likelihood evaluation.
+
+    The walk starts from the least-squares covariance (sigma defaults to
+    the fit residual rms), which can be badly conditioned. During
+    burn-in the step size is rescaled every `adapt_every` steps toward an
+    acceptance of `target`, and from halfway through burn-in the proposal
+    shape is the covariance of the chains themselves. Returns the
+    post-burn-in samples (n_chains * (n_steps - burn), n_params) and
+    their acceptance rate.
+    """
+    V = np.asarray(V, dtype=float)
+    E = np.asarray(E, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    eos, info = fit(model, V, E)
+    if sigma is None:
+        sigma = max(float(info["rms"]), 1e-6)
+    k = len(eos.param_names)
+
+    def cholesky(cov):
+        cov = 0.5 * (cov + cov.T)
+        return np.linalg.cholesky(cov + 1e-12 * np.trace(cov) / k * np.eye(k))
+
+    # least-squares covariance at this sigma, scaled for a k-dim walk
+    J = eos.jacobian(V)
+    L = cholesky(sigma**2 * np.linalg.pinv(J.T @ J))
+    scale = 2.38 / np.sqrt(k)
+
+    x = eos.params + scale * rng.standard_normal((n_chains, k)) @ L.T
+    logp = log_posterior(model, x, V, E, sigma)
+
+    samples, history = [], []
+    accepted = window = 0
+    for step in range(n_steps):
+        prop = x + scale * rng.standard_normal((n_chains, k)) @ L.T
+        logp_prop = log_posterior(model, prop, V, E, sigma)
+        # chains still at -inf move to any finite proposal
+        cur = np.isfinite(logp)
+        log_ratio = np.where(np.isfinite(logp_prop), np.inf, -np.inf)
+        log_ratio[cur] = logp_prop[cur] - logp[cur]
+        accept = np.log(rng.random(n_chains)) < log_ratio
+        x[accept] = prop[accept]
+        logp[accept] = logp_prop[accept]
+
+        if step >= burn:
+            samples.append(x.copy())
+            accepted += accept.sum()
+            continue
+
+        history.append(x.copy())
+        window += accept.sum()
+        if (step + 1) % adapt_every == 0:
+            rate = window / (n_chains * adapt_every)
+            window = 0
+            scale *= np.exp(2.0 * (rate - target))
+            if step + 1 >= burn // 2:
+                # shape from the later half of the burn-in so far
+                recent = np.concatenate(history[len(history) // 2:])
+                try:
+                    L = cholesky(np.cov(recent, rowvar=False))
+                except np.linalg.LinAlgError:
+                    pass
+
+    rate = accepted / max(n_chains * (n_steps - burn), 1)
+    return np.concatenate(samples), rate
+
+
+# ===============================
+# Per-calculator posteriors
+# ===============================
+
+def summarize_samples(samples, model, method):
+    """
+    Mean, std, 2.5/50/97.5 percentiles and the scaled median absolute
+    deviation per parameter (B0 in GPa). For skewed or heavy-tailed
+    samples (a poorly constrained B0') quote p50 and mad, not mean/std.
+    """
+    rows = []
+    for i, p in enumerate(MODELS[model].param_names):
+        x = samples[:, i]
+        if p == "B0":
+            x = x * GPA_PER_EV_A3
+        q = np.percentile(x, [2.5, 50.0, 97.5])
+        rows.append({
+            "method": method,
+            "parameter": p,
+            "mean": x.mean(),
+            "std": x.std(ddof=1),
+            "p2.5": q[0],
+            "p50": q[1],
+            "p97.5": q[2],
+            # 1.4826 * MAD is the std of a normal distribution
+            "mad": 1.4826 * np.median(np.abs(x - q[1])),
+            "n": len(x),
+        })
+    return rows
+
+
+def posterior(path, model="bm3", n_boot=2000, run_mcmc=False, n_chains=32,
+              n_steps=4000, burn=1000, sigma=None, seed=0, converged_only=True):
+    """
+    Bootstrap (and optionally MCMC) summary for one calculator output.
+    Unconverged bootstrap fits sit far out in parameter space and would
+    dominate the mean and std, so they are dropped unless
+    `converged_only` is False; either way their number is printed and
+    recorded in n_unconverged.
+    """
+    raw = read_table(path, "raw", ["Volume", "Energy"])
+    V, E = raw["Volume"].to_numpy(float), raw["Energy"].to_numpy(float)
+    name = results_name(path)
+
+    samples, converged = bootstrap(V, E, model, n_boot, seed)
+    n_bad = int((~converged).sum())
+    if n_bad:
+        action = "dropped" if converged_only else "kept"
+        print(f"{name}: {n_bad} of {len(converged)} bootstrap fits did not converge ({action})")
+    if converged_only:
+        samples = samples[converged]
+    rows = summarize_samples(samples, model, "bootstrap")
+    for row in rows:
+        row["n_unconverged"] = n_bad
+    if run_mcmc:
+        samples, rate = mcmc(V, E, model, n_chains, n_steps, burn, sigma=sigma, seed=seed)
+        print(f"{name}: MCMC acceptance {rate:.2f}")
+        rows += summarize_samples(samples, model, "mcmc")
+
+    df = pd.DataFrame(rows)
+    df["n_unconverged"] = df["n_unconverged"].astype("Int64")
+    df.insert(0, "calculator", name)
+    df.insert(1, "model", model)
+    return df
+
+
+def posteriors(paths, workers=None, **kwargs):
+    """posterior() for every calculator output, one process each."""
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(posterior, path, **kwargs) for path in paths]
+        return pd.concat([job.result() for job in jobs], ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bootstrap / MCMC uncertainty of EOS parameters per calculator."
+    )
+    parser.add_argument("files", nargs="+", help="<conda>.csv or <conda>.cols")
+    parser.add_argument("--model", default="bm3", choices=sorted(MODELS))
+    parser.add_argument("--n-boot", type=int, default=2000)
+    parser.add_argument("--mcmc", action="store_true")
+    parser.add_argument("--chains", type=int, default=32)
+    parser.add_argument("--steps", type=int, default=4000)
+    parser.add_argument("--burn", type=int, default=1000,
+                        help="burn-in steps per chain, used to tune the proposal")
+    parser.add_argument("--sigma", type=float, default=None,
+                        help="energy noise in eV (default: fit residual rms)")
+    parser.add_argument("--converged-only", action=argparse.BooleanOptionalAction,
+                        default=True,
+                        help="drop bootstrap resamples whose fit did not converge")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="write the summary CSV here")
+    args = parser.parse_args()
+    if args.mcmc and not 0 <= args.burn < args.steps:
+        parser.error("--burn must be at least 0 and below --steps")
+
+    df = posteriors(
+        args.files, workers=args.workers, model=args.model, n_boot=args.n_boot,
+        run_mcmc=args.mcmc, n_chains=args.chains, n_steps=args.steps, burn=args.burn,
+        sigma=args.sigma, converged_only=args.converged_only,
+    )
+    print(df.to_string(index=False))
+    if args.out:
+        df.to_csv(args.out, index=False)